@@ -0,0 +1,64 @@
+"""
+Measure what building the dashboard's chat agent per message costs.
+
+Run from final_notebooks:
+
+    python -m benchmarks.agent_benchmark [--token hf_...]
+
+"before" builds the adviser tool, prompt, LLM client and executor for every
+message, as the dashboard used to; "after" reuses the agent cached by
+`chat_agent.get_agent_executor`. That construction time is added to the
+first-token latency of every chat turn. With a token, the time to the first
+streamed output of a real turn is measured as well (this calls the LLM).
+"""
+import argparse
+import time
+import numpy as np
+from chat_agent import DEFAULT_MODEL, build_agent_executor, get_agent_executor, map_context
+
+WIDGET_VALUE = {"view_state": {"extent": [50.0, 0.0, 78.0, 25.0]}, "clicked": {"coordinate": [65.0, 15.0]}}
+
+
+def median_ms(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+
+def first_output_ms(get_executor, question: str) -> float:
+    """
+    Time from receiving a message to the first streamed output of the agent.
+    """
+    start = time.perf_counter()
+    executor = get_executor()
+    for _ in executor.stream({"input": question, **map_context(WIDGET_VALUE)}):
+        return 1000 * (time.perf_counter() - start)
+    return float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--token", default=None, help="HuggingFace token; without it only construction is timed")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--question", default="Which variables describe ocean color?")
+    args = parser.parse_args()
+    token = args.token or "hf_benchmark"
+
+    build = lambda: build_agent_executor(token, args.model, verbose=False)
+    cached = lambda: get_agent_executor(token, args.model, verbose=False)
+    build()  # imports and first client setup happen once per process either way
+    print(f"agent setup per message, before: {median_ms(build, args.repeat):8.2f} ms")
+    cached()
+    print(f"agent setup per message, after:  {median_ms(cached, args.repeat):8.4f} ms")
+
+    if args.token:
+        print(f"first output, before: {first_output_ms(build, args.question):8.0f} ms")
+        print(f"first output, after:  {first_output_ms(cached, args.question):8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Compare the NumPy brute-force retriever with Chroma on the code-example corpus.
+
+Run from final_notebooks:
+
+    python -m benchmarks.retriever_benchmark --backend tfidf
+
+Both stores hold the same vectors (embedded once, up front), so the timings
+are those of the stores themselves: building the index, reopening it from
+disk, and answering single and batched top-k queries by vector.
+
+With --calibrate, prints the best example score of on-topic and off-topic
+queries instead, to choose the backend's `MIN_RELEVANCE` threshold:
+
+    python -m benchmarks.retriever_benchmark --backend tfidf --calibrate
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+from functions import hf_config
+from functions.db_creation import _example_documents
+from functions.embeddings import MIN_RELEVANCE, get_embeddings
+from functions.retriever import NumpyVectorStore
+
+QUERIES = [
+    "plot sea surface temperature anomalies without the seasonal cycle",
+    "map of the arctic ocean",
+    "rolling mean of a time series",
+    "band-pass filter of wind speed",
+    "wind magnitude map from u and v components",
+    "monthly climatology of chlorophyll",
+]
+
+# Requests no code example should be retrieved for
+OFF_TOPIC_QUERIES = [
+    "stock market prices tomorrow",
+    "recipe for chocolate cake",
+    "translate this sentence to french",
+    "who won the football match",
+    "install python on windows",
+    "write a poem about the sea",
+]
+
+
+class PrecomputedEmbeddings:
+    """
+    Serves embeddings computed beforehand, so that no store pays for embedding.
+    """
+
+    def __init__(self, embeddings, texts):
+        self.model_id = embeddings.model_id
+        self.vectors = dict(zip(texts, embeddings.embed_documents(texts)))
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def timeit(func, repeat: int) -> float:
+    """
+    Median wall time of `func()` in milliseconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+
+def calibrate(store: NumpyVectorStore, embeddings, threshold: float):
+    """
+    Print the best score of every on- and off-topic query, and which ones `threshold` keeps.
+    """
+    print(f"{'best':>7}  {'kept':<5} query")
+    best = {}
+    for label, queries in (("on-topic", QUERIES), ("off-topic", OFF_TOPIC_QUERIES)):
+        hits = store.search_by_vectors(np.asarray(embeddings.embed_documents(queries)), 1)
+        best[label] = [score for (_, score), in hits]
+        print(f"# {label}")
+        for query, score in zip(queries, best[label]):
+            print(f"{score:>7.3f}  {'yes' if score >= threshold else 'no':<5} {query}")
+    print(
+        f"on-topic {min(best['on-topic']):.3f}-{max(best['on-topic']):.3f}, "
+        f"off-topic {min(best['off-topic']):.3f}-{max(best['off-topic']):.3f}, threshold {threshold}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default="tfidf", help="Embedding backend, see functions/embeddings.py")
+    parser.add_argument("--token", default=None, help="HuggingFace token, for the hf-endpoint backend")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--calibrate", action="store_true", help="Print query scores against MIN_RELEVANCE instead of timings")
+    args = parser.parse_args()
+    if args.token:
+        hf_config.set_hf_token(args.token)
+
+    docs = _example_documents()
+    texts = [doc.page_content for doc in docs.values()]
+    embeddings = PrecomputedEmbeddings(get_embeddings(args.backend, corpus=texts), texts + QUERIES + OFF_TOPIC_QUERIES)
+    if args.calibrate:
+        calibrate(NumpyVectorStore.from_documents(docs, embeddings), embeddings, MIN_RELEVANCE[args.backend])
+        return
+    query_vectors = np.asarray(embeddings.embed_documents(QUERIES), dtype=np.float32)
+    print(f"{len(docs)} documents, {len(QUERIES)} queries, dim {query_vectors.shape[1]}, k={args.k}")
+
+    workdir = tempfile.mkdtemp()
+    results = {}
+    try:
+        path = f"{workdir}/numpy/examples"
+        results["numpy"] = {
+            "build": timeit(lambda: NumpyVectorStore.from_documents(docs, embeddings).save(path), 5),
+            "open": timeit(lambda: NumpyVectorStore.load(path, embeddings), 20),
+        }
+        store = NumpyVectorStore.load(path, embeddings)
+        results["numpy"]["query"] = timeit(lambda: store.search_by_vectors(query_vectors[0], args.k), args.repeat)
+        results["numpy"]["batch"] = timeit(lambda: store.search_by_vectors(query_vectors, args.k), args.repeat)
+        numpy_top = [[doc.metadata["source"] for doc, _ in hits] for hits in store.search_by_vectors(query_vectors, args.k)]
+
+        try:
+            import chromadb  # noqa: F401  (langchain's Chroma imports it lazily)
+            from langchain_community.vectorstores import Chroma
+        except ImportError:
+            Chroma = None
+        if Chroma is not None:
+            counter = iter(range(10**6))
+
+            def build_chroma():
+                Chroma.from_documents(
+                    list(docs.values()), embeddings, ids=list(docs),
+                    persist_directory=f"{workdir}/chroma{next(counter)}",
+                )
+
+            chroma_dir = f"{workdir}/chroma"
+            Chroma.from_documents(list(docs.values()), embeddings, ids=list(docs), persist_directory=chroma_dir)
+            chroma = Chroma(persist_directory=chroma_dir, embedding_function=embeddings)
+            results["chroma"] = {
+                "build": timeit(build_chroma, 5),
+                "open": timeit(lambda: Chroma(persist_directory=chroma_dir, embedding_function=embeddings), 20),
+                "query": timeit(lambda: chroma.similarity_search_by_vector_with_relevance_scores(query_vectors[0].tolist(), k=args.k), args.repeat),
+                "batch": timeit(lambda: [
+                    chroma.similarity_search_by_vector_with_relevance_scores(q.tolist(), k=args.k) for q in query_vectors
+                ], args.repeat),
+            }
+            chroma_top = [
+                [doc.metadata["source"] for doc, _ in chroma.similarity_search_by_vector_with_relevance_scores(q.tolist(), k=args.k)]
+                for q in query_vectors
+            ]
+            agreement = np.mean([a[0] == b[0] for a, b in zip(numpy_top, chroma_top)])
+        else:
+            print("chromadb is not installed; timing the NumPy store only")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'store':<8}{'build ms':>12}{'open ms':>12}{'query ms':>12}{'batch ms':>12}")
+    for name, timing in results.items():
+        print(f"{name:<8}" + "".join(f"{timing[key]:>12.3f}" for key in ("build", "open", "query", "batch")))
+    if "chroma" in results:
+        print(f"top-1 agreement: {agreement:.0%}")
+        print(f"speedup per query: {results['chroma']['query'] / results['numpy']['query']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
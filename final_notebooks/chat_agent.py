@@ -0,0 +1,137 @@
+import functools
+from typing import AsyncIterator
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_openai import ChatOpenAI
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+
+DEFAULT_MODEL = "openai/gpt-oss-120b:fireworks-ai"
+
+# What the chat shows while a tool runs
+TOOL_LABELS = {
+    "adviser_tool": "Looking up datasets and code examples",
+    "load_climate_data": "Downloading data",
+    "load_climate_data_batch": "Downloading data",
+    "estimate_climate_data_size": "Estimating download size",
+    "compute_statistics": "Computing statistics",
+    "filter_climate_data": "Filtering data",
+    "python_repl": "Running analysis code",
+}
+
+# The map extent and clicked point are prompt variables, filled in per message
+SYSTEM_PROMPT = "You are an expert in climate data analysis, you have adviser tool, which can help you to asnwer user's questions about variables/datasets. If the question about data, use only information from adviser_tool. If the {map_frame} or {point_selected} is not [0,0], answer questions about the data from this selected area. "
+
+
+def build_agent_executor(token: str, model: str = DEFAULT_MODEL, verbose: bool = True):
+    """
+    Build the dashboard's chat agent: adviser tool, prompt, LLM client and executor.
+
+    Everything the agent calls uses `token`, not the global `hf_config` token.
+    """
+    from functions.adviser_tool import create_adviser_tool
+    adviser_tool_llm = create_adviser_tool(token=token)
+    tools = [adviser_tool_llm]
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", SYSTEM_PROMPT),
+            ("user", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ]
+    )
+    llm = ChatOpenAI(
+        base_url="https://router.huggingface.co/v1",
+        api_key=token,
+        model=model
+    )
+
+    # Define the agent
+    agent = create_tool_calling_agent(
+        llm=llm,
+        tools=tools,
+        prompt=prompt,
+    )
+
+    # Create the executor
+    return AgentExecutor(agent=agent, tools=tools, verbose=verbose)
+
+
+@functools.lru_cache(maxsize=8)
+def get_agent_executor(token: str, model: str = DEFAULT_MODEL, verbose: bool = True):
+    """
+    The chat agent for (token, model), built on first use and reused for every message.
+    """
+    return build_agent_executor(token, model, verbose)
+
+
+def map_context(widget_value: dict) -> dict:
+    """
+    Prompt variables of the current map state: view extent and clicked point.
+    """
+    return {
+        "map_frame": widget_value["view_state"]["extent"],
+        "point_selected": widget_value.get("clicked", {}).get("coordinate", [0, 0]),
+    }
+
+
+def answer(question: str, widget_value: dict, token: str, model: str = DEFAULT_MODEL):
+    """
+    Answer one chat message with the cached agent, in the context of the map.
+    """
+    agent_executor = get_agent_executor(token, model)
+    return agent_executor.invoke({"input": question, **map_context(widget_value)})
+
+
+def _render(steps: list, text: str) -> str:
+    lines = [f"_{'✓' if done else '…'} {label}_" for label, done in steps]
+    return "\n\n".join(part for part in ("  \n".join(lines), text) if part)
+
+
+async def render_agent_events(events) -> AsyncIterator[str]:
+    """
+    Turn `astream_events` (v2) of an agent run into chat messages, yielding the
+    whole message so far each time it changes.
+
+    The message lists the tool steps (running or done, see `TOOL_LABELS`),
+    progress reported by tools as custom events with a "message" field (a
+    later event of the same name from the same run replaces the line, e.g.
+    the loader's "download_progress"), and the tokens of the answer as they
+    arrive. Tokens of LLMs called inside a tool (e.g. the adviser's) are not shown.
+    """
+    steps, text, tool_runs, custom_lines = [], "", {}, {}
+    async for event in events:
+        kind = event["event"]
+        inside_tool = any(parent in tool_runs for parent in event.get("parent_ids", []))
+        if kind == "on_tool_start":
+            tool_runs[event["run_id"]] = len(steps)
+            steps.append([TOOL_LABELS.get(event["name"], f"Running {event['name']}"), False])
+        elif kind == "on_tool_end" and event["run_id"] in tool_runs:
+            steps[tool_runs[event["run_id"]]][1] = True
+        elif kind == "on_custom_event" and isinstance(event.get("data"), dict) and "message" in event["data"]:
+            line = (event["name"], event["run_id"])
+            if line not in custom_lines:
+                custom_lines[line] = len(steps)
+                steps.append(None)
+            steps[custom_lines[line]] = [event["data"]["message"], True]
+        elif kind == "on_chat_model_stream" and not inside_tool:
+            content = event["data"]["chunk"].content
+            if not isinstance(content, str) or not content:
+                continue
+            text += content
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # The agent's final answer, in case the LLM did not stream it
+            output = event["data"].get("output")
+            if isinstance(output, dict) and output.get("output") and not text:
+                text = output["output"]
+        else:
+            continue
+        yield _render(steps, text)
+
+
+async def astream_answer(question: str, widget_value: dict, token: str, model: str = DEFAULT_MODEL) -> AsyncIterator[str]:
+    """
+    Like `answer`, but streaming: yields the chat message so far as tool steps
+    start and finish and answer tokens arrive (see `render_agent_events`).
+    """
+    agent_executor = get_agent_executor(token, model)
+    events = agent_executor.astream_events({"input": question, **map_context(widget_value)}, version="v2")
+    async for message in render_agent_events(events):
+        yield message
@@ -1,10 +1,14 @@
 import functions.hf_config as hf_config
 from functions.adviser_tool import create_adviser_tool
-from functions.loader import create_loader_tool
+from functions.loader import create_loader_tool, create_batch_loader_tool
+from functions.sizing import create_size_estimator_tool
+from functions.statistics import create_statistics_tool
+from functions.filters import create_filter_tool
 from functions.python_repl_tool import create_python_repl
 from functions.utils import get_llm, get_prompt
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from functions.db_creation import create_db_examples
+from functions.workers import run_blocking
 
 def load_agent_executor(token: str):
 
@@ -12,11 +16,19 @@ def load_agent_executor(token: str):
     chroma = create_db_examples(token)
     advisor_tool = create_adviser_tool()
     loader_tool = create_loader_tool()
+    batch_loader_tool = create_batch_loader_tool()
+    size_tool = create_size_estimator_tool()
+    statistics_tool = create_statistics_tool()
+    filter_tool = create_filter_tool()
     repl_tool = create_python_repl()
 
     tools = [
         advisor_tool,
         loader_tool,
+        batch_loader_tool,
+        size_tool,
+        statistics_tool,
+        filter_tool,
         repl_tool
     ]
 
@@ -28,4 +40,19 @@ def load_agent_executor(token: str):
         prompt=get_prompt(),
     )
     
-    return AgentExecutor(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True)
\ No newline at end of file
+    return AgentExecutor(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True)
+
+
+async def aload_agent_executor(token: str):
+    # Building may embed new code examples; keep that off the event loop
+    return await run_blocking(load_agent_executor, token)
+
+
+async def ainvoke_agent(agent_executor, question: str, **inputs):
+    """
+    Answer one question without blocking the event loop, so that the sessions
+    of one server interleave: LLM calls are awaited, and the tools' blocking
+    work (downloads, xarray/dask, REPL) runs on the bounded pool of
+    `functions.workers` (see `set_max_workers`).
+    """
+    return await agent_executor.ainvoke({"input": question, **inputs})
@@ -47,13 +47,15 @@ def _(hf_config):
     LANGSMITH_ENDPOINT="https://api.smith.langchain.com"
     LANGSMITH_API_KEY=''
     LANGSMITH_PROJECT="ohw_llm"
-    return
+    return (my_token,)
 
 
 @app.cell
-def _():
-    from db_creation import create_db_examples
-    vector_store_hf = create_db_examples()
+def _(my_token):
+    # Open the code-example index before the first chat message; only new or
+    # edited examples are embedded, and the agent reuses the opened index
+    from functions.db_creation import create_db_examples
+    create_db_examples(my_token)
     return
 
 
@@ -184,53 +186,17 @@ def _():
 
 
 @app.cell
-def _(
-    AgentExecutor,
-    ChatOpenAI,
-    ChatPromptTemplate,
-    MessagesPlaceholder,
-    create_tool_calling_agent,
-    hf_config,
-    mo,
-    widget,
-):
-    def my_model2(messages, widget):
+def _(mo, my_token, widget):
+    async def my_model2(messages, config):
         question = messages[-1].content   
-        my_token = ''
-        hf_config.set_hf_token(my_token)
-
-        map_frame = widget.value["view_state"]["extent"]
-        point_selected = widget.value.get("clicked", {}).get("coordinate", [0, 0])
-
-        from adviser_tool import create_adviser_tool
-        adviser_tool_llm = create_adviser_tool()
-        tools = [adviser_tool_llm]
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", f"You are an expert in climate data analysis, you have adviser tool, which can help you to asnwer user's questions about variables/datasets. If the question about data, use only information from adviser_tool. If the {map_frame} or {point_selected} is not [0,0], answer questions about the data from this selected area. "),
-                ("user", "{input}"),
-                MessagesPlaceholder(variable_name="agent_scratchpad"),
-            ]
-        )
-        llm = ChatOpenAI(
-            base_url="https://router.huggingface.co/v1",
-            api_key=hf_config.get_hf_token(),
-            model="openai/gpt-oss-120b:fireworks-ai"  
-        )
-
-        # Define the agent
-        agent = create_tool_calling_agent(
-            llm=llm,
-            tools=tools,
-            prompt=prompt,
-        )
-
-        # Create the executor
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-        result = agent_executor.invoke({"input": question})
-        return result
-
-    mo.ui.chat(lambda messages: my_model2(messages, widget))
+
+        # The agent is built once per token and model; only the map context changes per message.
+        # Tool steps and answer tokens are shown as they arrive.
+        from chat_agent import astream_answer
+        async for message in astream_answer(question, widget.value, my_token):
+            yield message
+
+    mo.ui.chat(my_model2)
     return
 
 
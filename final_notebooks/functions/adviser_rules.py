@@ -0,0 +1,263 @@
+from __future__ import annotations
+from typing import Optional, Tuple, Dict, Any
+import re
+import pandas as pd
+from .catalog import CatalogIndex, time_overlaps, bbox_intersects, tokenize
+
+# Named regions the dashboard users ask about most, as ((lat_min, lat_max), (lon_min, lon_max))
+REGIONS = {
+    "arabian sea": ((0.0, 25.0), (50.0, 78.0)),
+    "bay of bengal": ((5.0, 23.0), (78.0, 100.0)),
+    "indian ocean": ((-40.0, 30.0), (20.0, 120.0)),
+    "north atlantic": ((0.0, 70.0), (-80.0, 0.0)),
+    "south atlantic": ((-60.0, 0.0), (-70.0, 20.0)),
+    "atlantic": ((-60.0, 70.0), (-80.0, 20.0)),
+    "north pacific": ((0.0, 65.0), (120.0, 260.0)),
+    "south pacific": ((-60.0, 0.0), (150.0, 290.0)),
+    "pacific": ((-60.0, 65.0), (120.0, 290.0)),
+    "southern ocean": ((-90.0, -50.0), (-180.0, 180.0)),
+    "arctic": ((66.0, 90.0), (-180.0, 180.0)),
+    "mediterranean": ((30.0, 46.0), (-6.0, 36.0)),
+}
+_GLOBAL_WORDS = ("global", "globe", "world", "worldwide", "whole earth")
+
+_NUMBER = r"(-?\d+(?:\.\d+)?)"
+_LAT_PAIR = re.compile(rf"lat(?:itude)?s?\s*(?:=|:|from|between)?\s*\[?\s*{_NUMBER}\s*(?:to|-|–|and|,)\s*{_NUMBER}", re.I)
+_LON_PAIR = re.compile(rf"lon(?:gitude)?s?\s*(?:=|:|from|between)?\s*\[?\s*{_NUMBER}\s*(?:to|-|–|and|,)\s*{_NUMBER}", re.I)
+_HEMI = re.compile(r"(\d+(?:\.\d+)?)\s*°?\s*([NSEW])\b", re.I)
+_DATE = r"(\d{4}-\d{2}-\d{2})"
+_DATE_PAIR = re.compile(rf"{_DATE}\s*(?:to|until|through|-|–|and)\s*{_DATE}", re.I)
+_YEAR_PAIR = re.compile(r"\b((?:19|20)\d{2})\s*(?:to|until|through|-|–|and)\s*((?:19|20)\d{2})\b", re.I)
+_YEAR = re.compile(r"\b(?:in|during|for|of)\s+((?:19|20)\d{2})\b", re.I)
+# Any year, also as part of a date
+_ANY_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+# Times relative to today ("last year", "past 10 years") need the LLM to date them
+_RELATIVE_TIME = re.compile(
+    r"\b(?:last|past|previous|next|recent|recently|ago|today|yesterday|current|"
+    r"this\s+(?:year|month|season|decade|week))\b",
+    re.I,
+)
+# Any mention of a coordinate axis
+_COORD_WORD = re.compile(r"\b(?:lat|lon|latitude|longitude)s?\b", re.I)
+# A place introduced by a preposition: "near Sri Lanka", "over Europe", "off the coast of ..."
+_LOCATION_PHRASE = re.compile(r"\b(?:near|over|off|in|around|at|along|across)\s+(?:the\s+)?([a-z][a-z\-]*)", re.I)
+# Words that may follow such a preposition without naming a place
+_NON_PLACE_WORDS = {
+    "the", "a", "an", "in", "near", "over", "off", "around", "at", "along", "across",
+    "and", "or", "of", "for", "during", "from", "to", "between",
+}
+
+
+def parse_bbox(query: str) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+    """
+    Find a lat/lon box in a query: explicit "lat a to b, lon c to d", hemisphere
+    notation like "10N-20N, 60E-70E", or a known region name.
+
+    Returns
+    -------
+    tuple or None
+        ((lat_min, lat_max), (lon_min, lon_max)), or None if no box was found
+    """
+    lat, lon = _LAT_PAIR.search(query), _LON_PAIR.search(query)
+    if lat and lon:
+        lats = sorted(float(v) for v in lat.groups())
+        return (lats[0], lats[1]), (float(lon.group(1)), float(lon.group(2)))
+
+    lats, lons = [], []
+    for value, hemisphere in _HEMI.findall(query):
+        hemisphere = hemisphere.upper()
+        value = float(value)
+        if hemisphere in "NS":
+            lats.append(value if hemisphere == "N" else -value)
+        else:
+            lons.append(value if hemisphere == "E" else -value)
+    if len(lats) == 2 and len(lons) == 2:
+        return (min(lats), max(lats)), (lons[0], lons[1])
+
+    name = _region_name(query)
+    return REGIONS[name] if name else None
+
+
+def _region_name(query: str) -> Optional[str]:
+    text = query.lower()
+    return next((name for name in sorted(REGIONS, key=len, reverse=True) if name in text), None)
+
+
+def _match_time_range(query: str) -> Tuple[Optional[Tuple[str, str]], Optional[re.Match]]:
+    """
+    The time range of a query (see `parse_time_range`) and the match it was read from.
+    """
+    match = _DATE_PAIR.search(query)
+    if match:
+        return (match.group(1), match.group(2)), match
+    match = _YEAR_PAIR.search(query)
+    if match:
+        start, end = sorted(match.groups())
+        return (f"{start}-01-01", f"{end}-12-31"), match
+    match = _YEAR.search(query)
+    if match:
+        return (f"{match.group(1)}-01-01", f"{match.group(1)}-12-31"), match
+    return None, None
+
+
+def parse_time_range(query: str) -> Optional[Tuple[str, str]]:
+    """
+    Find a time range in a query: "2010-01-01 to 2010-06-30", "2010 to 2015" or "in 2010".
+    """
+    return _match_time_range(query)[0]
+
+
+def _has_partial_coordinates(query: str) -> bool:
+    """
+    Whether a query gives coordinates `parse_bbox` cannot turn into a full box,
+    e.g. only a latitude band ("between 10N and 20N") or a single lat/lon pair.
+    """
+    if _LAT_PAIR.search(query) and _LON_PAIR.search(query):
+        return False
+    if _COORD_WORD.search(query):
+        return True
+    hemispheres = [h.upper() for _, h in _HEMI.findall(query)]
+    n_lat = sum(h in "NS" for h in hemispheres)
+    return bool(hemispheres) and (n_lat, len(hemispheres) - n_lat) != (2, 2)
+
+
+def _unknown_place(query: str, known_words: set) -> bool:
+    """
+    Whether a query names a place that is not a known region, e.g. "near Sri
+    Lanka" or "in the Gulf of Mexico"; `known_words` may follow a preposition.
+    """
+    text = query.lower()
+    region = _region_name(query)
+    if region:
+        text = text.replace(region, " ")
+    allowed = _NON_PLACE_WORDS | _ANALYSIS_WORDS | known_words | set(" ".join(_GLOBAL_WORDS).split())
+    return any(word not in allowed for word in _LOCATION_PHRASE.findall(text))
+
+
+def _is_global(query: str) -> bool:
+    text = query.lower()
+    return any(word in text for word in _GLOBAL_WORDS)
+
+
+# Words describing the analysis rather than the quantity
+_ANALYSIS_WORDS = {
+    "mean", "average", "monthly", "daily", "weekly", "yearly", "annual", "seasonal", "trend",
+    "anomaly", "anomalie", "climatology", "time", "series", "timeserie", "max", "maximum",
+    "min", "minimum", "change", "variability", "near", "around", "region", "area",
+}
+
+# Variable names that are also coordinates or ordinary words in a question
+_AMBIGUOUS_NAMES = {"lat", "lon", "time", "mask", "so", "latitude", "longitude"}
+
+
+def _is_identifier(name: str) -> bool:
+    """
+    Whether a variable name is specific enough to settle a query when it appears in it:
+    names like `2m_temperature` or `CHL_cci`, or short acronyms like `sst`, but not
+    plain words like `temperature`.
+    """
+    name = name.lower()
+    if name in _AMBIGUOUS_NAMES:
+        return False
+    return bool(re.search(r"[_\-0-9]", name)) or len(name) <= 4
+
+
+def resolve_query(query: str, catalog: CatalogIndex) -> Optional[Dict[str, Any]]:
+    """
+    Resolve dataset, variables, bbox and time range of a query without an LLM.
+
+    Only unambiguous queries are resolved: every variable must be named
+    exactly (e.g. `sst`, `2m_temperature`), all named variables must come from
+    one dataset, every year or date must be part of the parsed time range, any
+    place must be a known region or a full lat/lon box, times must be absolute,
+    and the time range and bbox (if any) must fit that dataset.
+    Anything else returns None, so the caller can escalate to the LLM.
+    """
+    words = set(re.findall(r"[a-z0-9][a-z0-9_\-]*[a-z0-9]", query.lower()))
+    named, variable_words = {}, set()
+    for word in words:
+        if not _is_identifier(word):
+            continue
+        for dataset, variable in catalog.lookup_variable(word):
+            named.setdefault(dataset.name, []).append(variable.standard_name)
+            variable_words.add(word)
+    if not named:
+        return None
+    # Places, coordinates and times the rules cannot pin down would otherwise
+    # be answered as "global" or "full available"
+    if _RELATIVE_TIME.search(query) or _has_partial_coordinates(query):
+        return None
+    if _unknown_place(query, variable_words):
+        return None
+
+    time_range, match = _match_time_range(query)
+    # A year or date outside the parsed range (e.g. "sst in the north atlantic 2001")
+    # would otherwise be answered as "full available"
+    rest = query if match is None else query[:match.start()] + " " + query[match.end():]
+    if _ANY_YEAR.search(rest):
+        return None
+    bbox = None if _is_global(query) else parse_bbox(query)
+
+    candidates = []
+    for name, variables in named.items():
+        dataset = catalog.dataset(name)
+        if time_range is not None and not time_overlaps(dataset.temporal_bounds, time_range):
+            continue
+        if bbox is not None and not bbox_intersects(dataset.spatial_bounds, bbox[1], bbox[0]):
+            continue
+        candidates.append((dataset, variables))
+    if len(candidates) > 1:
+        # Prefer the dataset whose name/description the query mentions, e.g. "ERA5"
+        tokens = set(tokenize(query))
+        mentioned = [c for c in candidates if tokens & set(tokenize(c[0].name + " " + c[0].description))]
+        best = max(len(c[1]) for c in candidates)
+        candidates = [c for c in (mentioned or candidates) if len(c[1]) == best]
+    if len(candidates) != 1:
+        return None
+
+    dataset, variables = candidates[0]
+    # Other quantities mentioned in words (e.g. "sst and chlorophyll") need the LLM
+    text = query.lower()
+    region = _region_name(query)
+    if region:
+        text = text.replace(region, " ")
+    leftover = {
+        token for token in tokenize(text)
+        if not re.search(r"\d", token) and token not in _ANALYSIS_WORDS | _AMBIGUOUS_NAMES
+    }
+    for name in variables:
+        variable = next(v for v in dataset.variables.variables if v.standard_name == name)
+        leftover -= set(tokenize(f"{variable.standard_name} {variable.description}"))
+    if catalog.variables_matching(leftover, dataset):
+        return None
+
+    if time_range is not None:
+        start, end = pd.Timestamp(time_range[0]), pd.Timestamp(time_range[1])
+        if end < start:
+            return None
+    return {
+        "dataset": dataset,
+        "variables": sorted(set(variables), key=lambda v: query.lower().find(v.lower())),
+        "lat_range": bbox[0] if bbox else None,
+        "lon_range": bbox[1] if bbox else None,
+        "time_range": time_range,
+    }
+
+
+def format_resolution(resolution: Dict[str, Any]) -> str:
+    """
+    Render a `resolve_query` result in the adviser's output schema.
+    """
+    if resolution["lat_range"] is None:
+        bounds = "global"
+    else:
+        lat, lon = resolution["lat_range"], resolution["lon_range"]
+        bounds = f"[{lat[0]:g}, {lat[1]:g}], [{lon[0]:g}, {lon[1]:g}]"
+    time_range = resolution["time_range"]
+    return "\n".join([
+        f"dataset: {resolution['dataset'].name}",
+        f"variable: {', '.join(resolution['variables'])}",
+        f"lat,lon boundaries: {bounds}",
+        f"time range: {f'{time_range[0]} to {time_range[1]}' if time_range else 'full available'}",
+        "suggestions (from description only): none",
+    ])
@@ -1,15 +1,21 @@
-import os, json
+import os
+import asyncio
+import functools
+import threading
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from . import hf_config
-from langchain_huggingface import HuggingFaceEndpointEmbeddings
-from langchain_community.vectorstores import Chroma
+from .catalog import describe_matches, get_catalog
+from .adviser_rules import format_resolution, parse_bbox, parse_time_range, resolve_query
+from .db_creation import create_db_examples
+from .embeddings import MIN_RELEVANCE
+from .workers import run_blocking
 
 SYSTEM_PROMPT = """
-You are an AI assistant that selects the best dataset and variable(s) to match a user's task. Your knowledge is strictly limited to two datasets: **"Indian Ocean grid"** (oceanographic) and **"ERA5 Atmospheric Surface Analysis"** (atmospheric).
+You are an AI assistant that selects the best dataset and variable(s) to match a user's task. Your knowledge is strictly limited to the candidate datasets and variables listed in the task description below, taken from our catalog: **"Indian Ocean grid"** (oceanographic) and **"ERA5 Atmospheric Surface Analysis"** (atmospheric) among others.
 
 [TASK DESCRIPTION]
 {safe_desc}
@@ -29,59 +35,205 @@ suggestions (from description only): <region/coverage if stated; else "none">
 - Suggestions must ONLY come from the user's task description.
 """
 
-def load_safe_desc(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    text = json.dumps(data, ensure_ascii=False, indent=2)
+def load_safe_desc(path: str, query: str = None) -> str:
+    """
+    Catalog entries relevant to `query` as prompt-safe JSON (braces escaped).
+
+    Only the few best matching datasets and variables of the catalog index are
+    included, restricted to datasets covering the region and period the query
+    names (if it names them); if nothing matches, the whole catalog is.
+    """
+    catalog = get_catalog(path)
+    matches = []
+    if query:
+        bbox = parse_bbox(query)
+        matches = catalog.search(
+            query,
+            lat_range=bbox[0] if bbox else None,
+            lon_range=bbox[1] if bbox else None,
+            time_range=parse_time_range(query),
+        )
+    if not matches:
+        matches = catalog.search(None, max_datasets=len(catalog.datasets))
+    text = describe_matches(matches)
     return text.replace("{", "{{").replace("}", "}}")
 
-def get_example_of_visualizations(query: str) -> str:
-    doc_embedder = HuggingFaceEndpointEmbeddings(
-                                        model="Qwen/Qwen3-Embedding-8B",
-                                        task="feature-extraction",
-                                        model_kwargs={"normalize": True},
-                                        huggingfacehub_api_token=hf_config.get_hf_token()
-                                    )
-    vector_store_hf = Chroma(
-        persist_directory="./chroma_db_examples",
-        embedding_function=doc_embedder
-    )
-    results = vector_store_hf.similarity_search_with_score(query, k=1)
-    doc, score = results[0]
-    file_name = doc.metadata['source'].lstrip('./')
+@functools.lru_cache(maxsize=None)
+def _read_example_file(source: str) -> str:
+    file_name = source.lstrip('./')
     full_path = os.path.join('./', file_name)
+    with open(full_path, 'r', encoding='utf-8') as file:
+        return file.read()
 
+def read_example_file(source: str) -> str:
+    """
+    Contents of a `txt_docs/` example, read from disk once per process ("" if
+    unreadable). Failures are not cached, so a file that appears later is read.
+    """
     try:
-        with open(full_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        return _read_example_file(source)
     except Exception:
         return ""
 
-def description_reader(query: str):
-    safe_desc = load_safe_desc("functions/datasets.json")
-    llm = ChatOpenAI(
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text and Python code
+    return len(text) // 4 + 1
+
+def retrieve_examples(query: str, k: int = 3, min_score: float = None, relative_score: float = 0.75, token: str = None):
+    """
+    Code examples relevant to `query`, best first, as (source, score) pairs.
+
+    Of the top `k` matches, only those scoring at least `min_score` (default:
+    `MIN_RELEVANCE` of the configured embedding backend) and at least
+    `relative_score` times the best score are kept, and each example file
+    appears once. An unrelated query gets no example at all. `token` defaults
+    to the global `hf_config.HF_TOKEN`.
+    """
+    # Opened (and synced with code_descriptions.json) once per process
+    vector_store_hf = create_db_examples(token or hf_config.HF_TOKEN)
+    if min_score is None:
+        min_score = MIN_RELEVANCE.get(hf_config.get_embedding_config()["backend"], 0.0)
+    # Fetch a few extra matches in case several point to the same file
+    results = vector_store_hf.similarity_search_with_score(query, k=2 * k)
+    if hf_config.get_embedding_config()["store"] == "chroma":
+        # Chroma returns squared L2 distances; for unit vectors cos = 1 - d / 2
+        results = [(doc, 1 - distance / 2) for doc, distance in results]
+    examples = []
+    for doc, score in results:
+        source = doc.metadata['source']
+        if score < min_score or (examples and score < relative_score * examples[0][1]):
+            break
+        if source not in {s for s, _ in examples}:
+            examples.append((source, score))
+        if len(examples) == k:
+            break
+    return examples
+
+def get_example_of_visualizations(query: str, k: int = 3, max_tokens: int = 700, min_score: float = None, token: str = None) -> str:
+    """
+    The relevant code examples for `query` (see `retrieve_examples`), joined
+    best first while they fit in `max_tokens`; "" if none is relevant.
+    """
+    snippets, used, seen = [], 0, set()
+    for source, score in retrieve_examples(query, k=k, min_score=min_score, token=token):
+        code = read_example_file(source).strip()
+        cost = estimate_tokens(code)
+        # Identical files under different names count once
+        if not code or code in seen or used + cost > max_tokens:
+            continue
+        seen.add(code)
+        used += cost
+        snippets.append(f"# Example: {source.lstrip('./')} (relevance {score:.2f})\n{code}")
+    return "\n\n".join(snippets)
+
+# How adviser queries were answered in this process: by the rule-based
+# fast path or by an LLM round trip
+ADVISER_STATS = {"fast_path": 0, "llm_calls": 0}
+# Sessions run the adviser concurrently on the worker pool
+_STATS_LOCK = threading.Lock()
+
+
+def _count(key: str):
+    with _STATS_LOCK:
+        ADVISER_STATS[key] += 1
+
+
+def reset_adviser_stats():
+    with _STATS_LOCK:
+        for key in ADVISER_STATS:
+            ADVISER_STATS[key] = 0
+
+
+def get_adviser_llm(token: str = None):
+    return ChatOpenAI(
         base_url="https://router.huggingface.co/v1",
-        api_key=hf_config.get_hf_token(),
+        api_key=token or hf_config.get_hf_token(),
         model="openai/gpt-oss-20b:fireworks-ai"
     )
 
+
+def _fast_path(query: str, use_fast_path: bool):
+    if use_fast_path:
+        resolution = resolve_query(query, get_catalog("functions/datasets.json"))
+        if resolution is not None:
+            _count("fast_path")
+            return format_resolution(resolution)
+    return None
+
+
+def _adviser_chain(query: str, llm=None):
+    safe_desc = load_safe_desc("functions/datasets.json", query)
+    if llm is None:
+        llm = get_adviser_llm()
+
     prompt = ChatPromptTemplate.from_messages([
         ("system", SYSTEM_PROMPT.format(safe_desc=safe_desc)),
         ("human", "{question}")
     ])
 
-    chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({"question": query})
-    example = get_example_of_visualizations(query)
+    _count("llm_calls")
+    return prompt | llm | StrOutputParser()
+
+
+def select_dataset(query: str, llm=None, use_fast_path: bool = True) -> str:
+    """
+    Answer the dataset/variable/bbox/time part of an adviser query, in the SYSTEM_PROMPT schema.
+
+    Queries naming their variables exactly are resolved locally (see
+    `adviser_rules.resolve_query`); the rest go to the LLM with the relevant
+    catalog entries. `llm` defaults to `get_adviser_llm()`.
+    """
+    response = _fast_path(query, use_fast_path)
+    if response is not None:
+        return response
+    return _adviser_chain(query, llm).invoke({"question": query})
+
+
+async def aselect_dataset(query: str, llm=None, use_fast_path: bool = True) -> str:
+    """
+    `select_dataset` with a non-blocking LLM call.
+    """
+    response = _fast_path(query, use_fast_path)
+    if response is not None:
+        return response
+    return await _adviser_chain(query, llm).ainvoke({"question": query})
+
+
+def _compose(response: str, example: str) -> str:
+    if not example:
+        return response
     return response + '\n\nYou can use this code to analyse the data:\n\n' + example
 
+
+def description_reader(query: str, llm=None, token: str = None):
+    response = select_dataset(query, llm=llm)
+    example = get_example_of_visualizations(query, token=token)
+    return _compose(response, example)
+
+
+async def adescription_reader(query: str, llm=None, token: str = None):
+    # The LLM call and the example retrieval (embedding, disk) run concurrently
+    response, example = await asyncio.gather(
+        aselect_dataset(query, llm=llm),
+        run_blocking(get_example_of_visualizations, query, token=token),
+    )
+    return _compose(response, example)
+
 class AdviserParams(BaseModel):
     query: str = Field(..., description="User query")
 
-def create_adviser_tool():
+def create_adviser_tool(llm=None, token: str = None):
+    """
+    The adviser as an agent tool. With `token`, the tool's LLM and example
+    retrieval use it instead of the global `hf_config` token, so tools built
+    for different tokens do not interfere.
+    """
+    if llm is None and token is not None:
+        llm = get_adviser_llm(token)
 
     adviser_tool = StructuredTool.from_function(
-        description_reader,
+        functools.partial(description_reader, llm=llm, token=token),
+        coroutine=functools.partial(adescription_reader, llm=llm, token=token),
         name="adviser_tool",
         description="Use this tool to find a suitable dataset and code example",
         args_schema=AdviserParams,
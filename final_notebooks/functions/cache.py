@@ -0,0 +1,417 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, Dict, Any, Iterator
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import pandas as pd
+
+
+### helpers to normalize request parameters into a stable cache key
+
+def _normalize_range(values: Optional[Tuple[float, float]], ndigits: int = 6) -> Optional[Tuple[float, float]]:
+    """
+    Round a (min, max) pair so that 10.0 and 10.000000001 map to the same key.
+    """
+    if values is None:
+        return None
+    return tuple(round(float(v), ndigits) for v in values)
+
+
+# Partial ISO strings and the period pandas' partial-string indexing selects for them
+_PARTIAL_TIMES = [
+    (re.compile(r"\d{4}"), "Y"),
+    (re.compile(r"\d{4}-\d{1,2}"), "M"),
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}"), "D"),
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}[T ]\d{1,2}"), "h"),
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}[T ]\d{1,2}:\d{2}"), "min"),
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}[T ]\d{1,2}:\d{2}:\d{2}"), "s"),
+]
+
+
+def _period_end(t: str) -> pd.Timestamp:
+    """
+    Last instant selected by `sel(time=slice(..., t))`: "2000-01-02" selects
+    the whole day, "2000-01-02T00:00" only the first minute.
+    """
+    text = str(t).strip()
+    for pattern, freq in _PARTIAL_TIMES:
+        if pattern.fullmatch(text):
+            return pd.Period(text, freq=freq).end_time
+    return pd.Timestamp(text)
+
+
+def _time_bounds(time_range: Tuple[str, str]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    First and last instants a (start, end) time range selects.
+    """
+    return pd.Timestamp(time_range[0]), _period_end(time_range[1])
+
+
+def _normalize_time_range(time_range: Optional[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+    """
+    Parse ISO strings so that '2000-1-1' and '2000-01-01' map to the same key.
+
+    The end is expanded to the last instant it selects, so that a date-only
+    end ('2000-01-02', the whole day) and a midnight end ('2000-01-02T00:00')
+    get different keys.
+    """
+    if time_range is None:
+        return None
+    return tuple(t.isoformat() for t in _time_bounds(time_range))
+
+
+def _store_id(store: Any) -> Optional[str]:
+    """
+    Return a string identifying the store, or None if it cannot be identified.
+    """
+    if isinstance(store, str):
+        return store.rstrip("/")
+    root = getattr(store, "root", None)
+    return str(root).rstrip("/") if root is not None else None
+
+
+def normalize_request(
+    store: Any,
+    variable: Optional[Union[str, Dict[str, str]]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    time_range: Optional[Tuple[str, str]] = None,
+    resample_to: Optional[str] = None,
+    output_format: str = "netcdf",
+    reduction: Optional[Dict[str, Any]] = None,
+    resolution: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Normalize the parameters of a `load_climate_data` request.
+
+    Only parameters that change the content of the output are kept; `chunks`
+    and `storage_options` only affect how the data is read.
+
+    Returns
+    -------
+    dict or None
+        The normalized request, or None if the store cannot be identified
+        (e.g. an in-memory mapping) and the request should not be cached.
+    """
+    store_id = _store_id(store)
+    if store_id is None:
+        return None
+    if isinstance(variable, dict):
+        variable = {k: str(variable[k]) for k in sorted(variable)}
+    return {
+        "store": store_id,
+        "variable": variable,
+        "lon_range": _normalize_range(lon_range),
+        "lat_range": _normalize_range(lat_range),
+        "time_range": _normalize_time_range(time_range),
+        "resample_to": resample_to,
+        "output_format": output_format,
+        "reduction": reduction,
+        "resolution": float(resolution) if resolution is not None else None,
+    }
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    Hash a normalized request into a hex digest used as cache key and file name.
+    """
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _infer_lon_frame(lon_range: Tuple[float, float]) -> str:
+    # Same rule as loader._infer_target_lon_frame; kept local to avoid an import cycle
+    return "0-360" if (lon_range[0] >= 0 and lon_range[1] <= 360) else "-180-180"
+
+
+def _spatial_extent(request: Dict[str, Any]) -> Tuple[Optional[str], Optional[Tuple], Optional[Tuple]]:
+    """
+    Describe the spatial extent of the file a request produced.
+
+    The loader only subsets space when both ranges are given, and only reframes
+    longitudes when `lon_range` is given, so the frame and the extent are
+    tracked separately. A None range means the full extent of the store.
+    """
+    lon_range, lat_range = request.get("lon_range"), request.get("lat_range")
+    frame = _infer_lon_frame(lon_range) if lon_range is not None else None
+    if lon_range is None or lat_range is None:
+        return frame, None, None
+    return frame, tuple(lon_range), tuple(lat_range)
+
+
+def _range_contains(outer: Optional[Tuple], inner: Optional[Tuple]) -> bool:
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    return min(outer) <= min(inner) and max(inner) <= max(outer)
+
+
+def _time_contains(outer: Optional[Tuple[str, str]], inner: Optional[Tuple[str, str]]) -> bool:
+    """
+    Whether the `outer` window selects every instant `inner` selects; ends are
+    compared as the periods they select (see `_period_end`), like the cache key.
+    """
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    outer_start, outer_end = _time_bounds(outer)
+    inner_start, inner_end = _time_bounds(inner)
+    return outer_start <= inner_start and inner_end <= outer_end
+
+
+def request_contains(outer: Dict[str, Any], inner: Dict[str, Any]) -> bool:
+    """
+    Check whether the file produced by `outer` holds everything `inner` asks for.
+
+    Both requests must come from `normalize_request`. The output format is
+    ignored, since any cached file can be re-sliced and re-written. Resampled subsets are only
+    reused for spatial narrowing, since resampling a shorter time window can give
+    different values at the edges of the window. Reduced subsets cannot be
+    re-sliced, but an unreduced subset can serve a reduced request.
+    """
+    if outer.get("reduction"):
+        return False
+    if outer["store"] != inner["store"] or outer["variable"] != inner["variable"]:
+        return False
+    if outer["resample_to"] != inner["resample_to"]:
+        return False
+    if outer.get("resolution") != inner.get("resolution"):
+        return False
+    outer_times = tuple(outer["time_range"]) if outer["time_range"] is not None else None
+    inner_times = tuple(inner["time_range"]) if inner["time_range"] is not None else None
+    if inner["resample_to"] and outer_times != inner_times:
+        return False
+    if not _time_contains(outer_times, inner_times):
+        return False
+
+    outer_frame, outer_lon, outer_lat = _spatial_extent(outer)
+    inner_frame, inner_lon, inner_lat = _spatial_extent(inner)
+    if outer_frame != inner_frame:
+        return False
+    return _range_contains(outer_lon, inner_lon) and _range_contains(outer_lat, inner_lat)
+
+
+def _extent_group(request: Dict[str, Any]) -> str:
+    return json.dumps([request["store"], request["variable"]], sort_keys=True)
+
+
+def _path_size(path: str) -> int:
+    """
+    Size in bytes of a file, or of all files below a directory.
+    """
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(root, f))
+            for root, _, files in os.walk(path)
+            for f in files
+        )
+    return os.path.getsize(path)
+
+
+def _remove_path(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+    # Left by an interrupted resumable download (see `loader.download_resumable`)
+    manifest_path = path + ".manifest.json"
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+class SubsetCache:
+    """
+    On-disk cache of subsets written by `load_climate_data`.
+
+    Entries are keyed by the hash of the normalized request and evicted in
+    least-recently-used order once the total size exceeds `max_size_gb`.
+    The index is stored as JSON next to the cached files so that it survives
+    restarts of the notebook or dashboard.
+
+    Besides exact lookups, the cache keeps an extent index grouping entries by
+    store and variable, so that `find_containing` can answer which cached file
+    covers a narrower bbox/time window without scanning unrelated entries.
+    """
+
+    index_name = "index.json"
+
+    def __init__(self, cache_dir: str = os.path.join("temp", "cache"), max_size_gb: float = 5.0):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_gb * 1024**3)
+        self._lock = threading.RLock()
+        # key -> [lock, number of callers holding or waiting for it]
+        self._key_locks: Dict[str, list] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries = self._read_index()
+        self._extents = self._build_extents()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.index_name)
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose files were removed behind our back
+        return {k: e for k, e in entries.items() if os.path.exists(e["path"])}
+
+    def _build_extents(self) -> Dict[str, list]:
+        extents: Dict[str, list] = {}
+        for key, entry in self._entries.items():
+            extents.setdefault(_extent_group(entry["request"]), []).append(key)
+        return extents
+
+    def _write_index(self) -> None:
+        # The directory may have been removed while the process runs
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def path_for(self, key: str, suffix: str = ".nc") -> str:
+        """
+        Location where the file for `key` should be written.
+        """
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    @contextlib.contextmanager
+    def key_lock(self, key: str) -> Iterator[None]:
+        """
+        Hold the lock of `key` while looking it up and writing its file.
+
+        Concurrent identical requests then download once: the others wait for
+        the first one and find its entry when they get the lock.
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached path for `key` and mark it as recently used, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not os.path.exists(entry["path"]):
+                self._drop(key)
+                self._write_index()
+                return None
+            entry["last_access"] = time.time()
+            self._write_index()
+            return entry["path"]
+
+    def find_containing(self, request: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the path of the smallest cached subset that contains `request`, or None.
+        """
+        with self._lock:
+            candidates = [
+                key for key in self._extents.get(_extent_group(request), [])
+                if request_contains(self._entries[key]["request"], request)
+            ]
+            if not candidates:
+                return None
+            key = min(candidates, key=lambda k: self._entries[k]["size"])
+            return self.get(key)
+
+    def put(self, key: str, path: str, request: Dict[str, Any]) -> str:
+        """
+        Register a freshly written file and evict old entries if over budget.
+        """
+        with self._lock:
+            now = time.time()
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = {
+                "path": path,
+                "request": request,
+                "size": _path_size(path),
+                "created": now,
+                "last_access": now,
+            }
+            self._extents.setdefault(_extent_group(request), []).append(key)
+            self._evict(keep=key)
+            self._write_index()
+        return path
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        total = sum(e["size"] for e in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._drop(key)
+            _remove_path(entry["path"])
+            total -= entry["size"]
+
+    def _drop(self, key: str) -> Dict[str, Any]:
+        entry = self._entries.pop(key)
+        group = self._extents.get(_extent_group(entry["request"]), [])
+        if key in group:
+            group.remove(key)
+        return entry
+
+    def clear(self) -> None:
+        """
+        Remove every cached file and reset the index.
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                _remove_path(entry["path"])
+            self._entries = {}
+            self._extents = {}
+            self._write_index()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_SUBSET_CACHE: Optional[SubsetCache] = None
+# Sessions calling the loader concurrently must share one cache (and its key locks)
+_SUBSET_CACHE_LOCK = threading.Lock()
+
+
+def configure_subset_cache(cache_dir: str = os.path.join("temp", "cache"), max_size_gb: float = 5.0) -> SubsetCache:
+    """
+    Replace the process-wide subset cache, e.g. to move it or change its size budget.
+    """
+    global _SUBSET_CACHE
+    with _SUBSET_CACHE_LOCK:
+        _SUBSET_CACHE = SubsetCache(cache_dir=cache_dir, max_size_gb=max_size_gb)
+        return _SUBSET_CACHE
+
+
+def get_subset_cache() -> SubsetCache:
+    """
+    Get the process-wide subset cache, creating it with default settings on first use.
+    """
+    global _SUBSET_CACHE
+    with _SUBSET_CACHE_LOCK:
+        if _SUBSET_CACHE is None:
+            _SUBSET_CACHE = SubsetCache()
+        return _SUBSET_CACHE
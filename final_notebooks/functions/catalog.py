@@ -0,0 +1,247 @@
+from __future__ import annotations
+from typing import Optional, Tuple, Dict, List
+import functools
+import json
+import math
+import re
+import pandas as pd
+from pydantic import BaseModel
+# The catalog schema, shared with the tutorial notebooks
+from llm_working_tutorial.dataset import Dataset, DatasetCollection, SpatialBounds, TemporalBounds, Variable
+
+### index
+
+# Abbreviations users type, expanded to the words used in the catalog
+ALIASES = {
+    "sst": "sea surface temperature",
+    "ssh": "sea surface height",
+    "chl": "chlorophyll",
+    "chla": "chlorophyll",
+    "slp": "sea level pressure",
+    "mld": "mixed layer thickness",
+    "precip": "precipitation",
+    "rain": "precipitation",
+    "salt": "salinity",
+    "t2m": "2 metre temperature",
+}
+
+_STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "in", "into", "is", "of", "on", "or",
+    "over", "per", "the", "to", "with", "me", "show", "plot", "map", "data", "dataset",
+    "what", "how", "between", "during", "please", "can", "you", "i", "want",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens without stopwords, with plural 's' stripped and aliases expanded.
+    """
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower().replace("_", " ")):
+        if word in _STOPWORDS:
+            continue
+        expansion = ALIASES.get(word)
+        if expansion is not None:
+            tokens.extend(expansion.split())
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _lon_intervals(lon_min: float, lon_max: float) -> List[Tuple[float, float]]:
+    """
+    A longitude range as intervals of the 0-360 frame (two if it crosses 0°).
+    """
+    if lon_max - lon_min >= 360:
+        return [(0.0, 360.0)]
+    lo, hi = lon_min % 360, lon_max % 360
+    if hi == 0 and lon_max > lon_min:
+        hi = 360.0
+    if lo <= hi:
+        return [(lo, hi)]
+    return [(lo, 360.0), (0.0, hi)]
+
+
+def bbox_intersects(bounds: SpatialBounds, lon_range: Tuple[float, float], lat_range: Tuple[float, float]) -> bool:
+    """
+    Whether a lon/lat box (in either longitude frame) overlaps a dataset's spatial bounds.
+    """
+    if min(lat_range) > bounds.max_lat or max(lat_range) < bounds.min_lat:
+        return False
+    return any(
+        a <= d and c <= b
+        for a, b in _lon_intervals(bounds.min_lon, bounds.max_lon)
+        for c, d in _lon_intervals(*lon_range)
+    )
+
+
+def _timestamp(value: str) -> pd.Timestamp:
+    if value.strip().lower() in ("present", "now", ""):
+        return pd.Timestamp.now()
+    return pd.Timestamp(value)
+
+
+def time_overlaps(bounds: TemporalBounds, time_range: Tuple[str, str]) -> bool:
+    """
+    Whether a (start, end) range overlaps a dataset's temporal bounds ("present" means today).
+    """
+    return _timestamp(time_range[0]) <= _timestamp(bounds.end_time) and \
+        _timestamp(bounds.start_time) <= _timestamp(time_range[1])
+
+
+class CatalogMatch(BaseModel):
+    """
+    A dataset matching a catalog search, with its most relevant variables.
+    """
+    dataset: Dataset
+    variables: List[Variable]
+    score: float
+
+
+class CatalogIndex:
+    """
+    In-memory index of the dataset catalog.
+
+    Built once from `datasets.json`; variables are indexed by exact name and by
+    the words of their name and description (and of their dataset's name and
+    description), weighted by how rare each word is in the catalog, so that
+    "chlorophyll" outweighs "sea". Searches can also filter datasets by
+    bbox intersection and time overlap.
+    """
+
+    def __init__(self, collection: DatasetCollection):
+        self.collection = collection
+        self._by_name: Dict[str, List[Tuple[int, int]]] = {}
+        self._postings: Dict[str, set] = {}
+        self._dataset_tokens: List[set] = []
+        n_docs = 0
+        for i, dataset in enumerate(collection.datasets):
+            self._dataset_tokens.append(set(tokenize(f"{dataset.name} {dataset.description}")))
+            for j, variable in enumerate(dataset.variables.variables):
+                self._by_name.setdefault(variable.standard_name.lower(), []).append((i, j))
+                for token in set(tokenize(f"{variable.standard_name} {variable.description}")):
+                    self._postings.setdefault(token, set()).add((i, j))
+                n_docs += 1
+        document_frequency: Dict[str, int] = {}
+        for tokens in self._dataset_tokens:
+            for token in tokens:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        for token, postings in self._postings.items():
+            document_frequency[token] = document_frequency.get(token, 0) + len(postings)
+        total = n_docs + len(collection.datasets)
+        self._idf = {token: math.log(1 + total / df) for token, df in document_frequency.items()}
+
+    @classmethod
+    def from_json(cls, path: str) -> "CatalogIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(DatasetCollection.model_validate(json.load(f)))
+
+    @property
+    def datasets(self) -> List[Dataset]:
+        return self.collection.datasets
+
+    def dataset(self, name: str) -> Optional[Dataset]:
+        return next((d for d in self.datasets if d.name == name), None)
+
+    def dataset_for_store(self, path: str) -> Optional[Dataset]:
+        return next((d for d in self.datasets if d.access.path.rstrip("/") == path.rstrip("/")), None)
+
+    def lookup_variable(self, name: str) -> List[Tuple[Dataset, Variable]]:
+        """
+        Datasets holding a variable with exactly this name (case-insensitive).
+        """
+        return [
+            (self.datasets[i], self.datasets[i].variables.variables[j])
+            for i, j in self._by_name.get(name.lower(), [])
+        ]
+
+    def variables_matching(self, tokens: set, dataset: Dataset) -> List[str]:
+        """
+        Names of the variables of `dataset` whose name or description contains any of `tokens`.
+        """
+        i = self.datasets.index(dataset)
+        return sorted({
+            dataset.variables.variables[j].standard_name
+            for token in tokens for k, j in self._postings.get(token, ()) if k == i
+        })
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        *,
+        lon_range: Optional[Tuple[float, float]] = None,
+        lat_range: Optional[Tuple[float, float]] = None,
+        time_range: Optional[Tuple[str, str]] = None,
+        max_datasets: int = 3,
+        max_variables: int = 8,
+    ) -> List[CatalogMatch]:
+        """
+        Rank datasets and their variables for a free-text query.
+
+        Datasets not intersecting `lon_range`/`lat_range` or not overlapping
+        `time_range` are dropped. Without a query, every remaining dataset is
+        returned with all its variables.
+        """
+        allowed = [
+            i for i, dataset in enumerate(self.datasets)
+            if (lon_range is None or lat_range is None or bbox_intersects(dataset.spatial_bounds, lon_range, lat_range))
+            and (time_range is None or time_overlaps(dataset.temporal_bounds, time_range))
+        ]
+        if not query:
+            return [
+                CatalogMatch(dataset=self.datasets[i], variables=self.datasets[i].variables.variables, score=0.0)
+                for i in allowed[:max_datasets]
+            ]
+
+        tokens = set(tokenize(query))
+        words = set(re.findall(r"[a-z0-9_\-]+", query.lower()))
+        matches = []
+        for i in allowed:
+            dataset = self.datasets[i]
+            dataset_score = sum(self._idf.get(t, 0.0) for t in tokens & self._dataset_tokens[i])
+            variable_scores = {}
+            for token in tokens:
+                for k, j in self._postings.get(token, ()):
+                    if k == i:
+                        variable_scores[j] = variable_scores.get(j, 0.0) + self._idf[token]
+            for j, variable in enumerate(dataset.variables.variables):
+                # An exact variable name in the query settles it
+                if variable.standard_name.lower() in words:
+                    variable_scores[j] = variable_scores.get(j, 0.0) + 10.0
+            if not variable_scores and dataset_score == 0:
+                continue
+            ranked = sorted(variable_scores, key=lambda j: -variable_scores[j])[:max_variables]
+            best = variable_scores[ranked[0]] if ranked else 0.0
+            matches.append(CatalogMatch(
+                dataset=dataset,
+                variables=[dataset.variables.variables[j] for j in ranked],
+                score=best + 0.5 * dataset_score,
+            ))
+        matches.sort(key=lambda m: -m.score)
+        return matches[:max_datasets]
+
+
+def describe_matches(matches: List[CatalogMatch]) -> str:
+    """
+    Compact JSON of the matched datasets and variables, for an LLM prompt.
+    """
+    return json.dumps([
+        {
+            "name": m.dataset.name,
+            "description": m.dataset.description,
+            "temporal_bounds": m.dataset.temporal_bounds.model_dump(),
+            "spatial_bounds": m.dataset.spatial_bounds.model_dump(),
+            "store": m.dataset.access.path,
+            "variables": [v.model_dump() for v in m.variables],
+        }
+        for m in matches
+    ], ensure_ascii=False)
+
+
+@functools.lru_cache(maxsize=None)
+def get_catalog(path: str = "functions/datasets.json") -> CatalogIndex:
+    """
+    The catalog index for `path`, loaded and validated once per process.
+    """
+    return CatalogIndex.from_json(path)
@@ -1,11 +1,23 @@
 import os
+import functools
+import hashlib
+import threading
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEndpointEmbeddings
 from . import hf_config
+from .embeddings import get_embeddings
+from .retriever import NumpyVectorStore
 from langchain.schema import Document
 
 import json
 
+PERSIST_DIRECTORY = "./chroma_db_examples"
+NUMPY_INDEX_PATH = "./numpy_db_examples/examples"
+MANIFEST_NAME = "examples_manifest.json"
+
+# Sessions open the store concurrently on the worker pool; it must be
+# built (embedded and written to disk) only once
+_OPEN_LOCK = threading.Lock()
+
 def read_examples(filename: str, token: str = None):
     """
     Reads a JSON file containing code description examples
@@ -17,30 +29,140 @@ def read_examples(filename: str, token: str = None):
 
 examples = read_examples("functions/code_descriptions.json")
 
-def create_db_examples(token: str = None):
+def document_id(doc: dict) -> str:
+    """
+    Content hash of an example, used as its id in the vector store:
+    an edited description gets a new id and is re-embedded.
+    """
+    payload = json.dumps([doc['page_content'], doc['metadata']], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def examples_fingerprint(ids, model: str) -> str:
+    """
+    Fingerprint of an index: the embedding model and the set of example ids.
+    """
+    payload = json.dumps([model, sorted(ids)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def _read_manifest(persist_directory: str) -> dict:
+    try:
+        with open(os.path.join(persist_directory, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_manifest(persist_directory: str, manifest: dict):
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def sync_examples(vector_store, docs: dict):
+    """
+    Make the vector store hold exactly `docs` ({id: Document}).
+
+    Only documents whose id is not in the store yet are embedded; documents
+    that are no longer in `docs` (removed or edited examples, and the
+    duplicates earlier versions appended on every startup) are deleted.
 
-    if not token:
+    Returns
+    -------
+    tuple of int
+        (documents added, documents deleted)
+    """
+    stored = set(vector_store.get(include=[])["ids"])
+    new_ids = [doc_id for doc_id in docs if doc_id not in stored]
+    stale_ids = sorted(stored - set(docs))
+    if stale_ids:
+        vector_store.delete(ids=stale_ids)
+    if new_ids:
+        vector_store.add_documents([docs[doc_id] for doc_id in new_ids], ids=new_ids)
+    return len(new_ids), len(stale_ids)
+
+def create_db_examples(token: str = None, persist_directory: str = None, backend: str = None, model: str = None, store: str = None):
+    """
+    Open the persistent vector store of code examples, embedding only what changed.
+
+    The store is fingerprinted by the embedding model and the content hashes of
+    `code_descriptions.json` (see `examples_fingerprint`); when the fingerprint
+    saved with it matches, the store is reopened without any embedding call.
+    Otherwise new or edited examples are embedded and stale ones removed
+    (everything is re-embedded if the embedding model changed). The store
+    is opened once per process and configuration.
+
+    `store` selects a `retriever.NumpyVectorStore` saved at `NUMPY_INDEX_PATH`
+    ("numpy") or a Chroma store in `PERSIST_DIRECTORY` ("chroma"); both answer
+    `similarity_search_with_score`. `store`, `backend` and `model` default to
+    `hf_config.get_embedding_config()` (see `embeddings.get_embeddings`); the
+    token is only needed by the "hf-endpoint" backend.
+    """
+    config = hf_config.get_embedding_config()
+    backend = backend or config["backend"]
+    store = store or config["store"]
+    if backend != "hf-endpoint":
+        # Only the endpoint needs the token; leave it out of the cache key
+        token = None
+    elif not token:
         token = hf_config.get_hf_token()
+    if persist_directory is None:
+        persist_directory = NUMPY_INDEX_PATH if store == "numpy" else PERSIST_DIRECTORY
+    model = model or (config["model"] if backend == config["backend"] else None)
+    with _OPEN_LOCK:
+        return _open_db_examples(token, persist_directory, backend, model, store)
 
-    doc_embedder = HuggingFaceEndpointEmbeddings(
-                                        model="Qwen/Qwen3-Embedding-8B",
-                                        task="feature-extraction",
-                                        model_kwargs={"normalize": True},
-                                        huggingfacehub_api_token=token)
-    
-    docs = []
+def _example_documents() -> dict:
+    docs = {}
     for doc in examples:
         # use the definition as the content, and keep the term (and letter) as metadata
-        docs.append(
-            Document(
-                page_content=doc['page_content'],
-                metadata=doc['metadata']  
-            )
+        docs[document_id(doc)] = Document(
+            page_content=doc['page_content'],
+            metadata=doc['metadata']
         )
-    vector_store_hf = Chroma.from_documents(
-                                            docs,
-                                            doc_embedder,
-                                            persist_directory="./chroma_db_examples",
-                                        )
+    return docs
+
+@functools.lru_cache(maxsize=None)
+def _open_db_examples(token, persist_directory, backend, model, store):
+    docs = _example_documents()
+    doc_embedder = get_embeddings(
+        backend, model, token=token, corpus=[doc.page_content for doc in docs.values()]
+    )
+    model_id = doc_embedder.model_id
+    fingerprint = examples_fingerprint(docs, model_id)
+
+    if store == "numpy":
+        return _open_numpy_examples(persist_directory, docs, doc_embedder, fingerprint)
+    if store != "chroma":
+        raise ValueError(f"Unknown example store {store!r}, expected 'numpy' or 'chroma'")
+
+    vector_store_hf = Chroma(
+        persist_directory=persist_directory,
+        embedding_function=doc_embedder,
+    )
+    manifest = _read_manifest(persist_directory)
+    if manifest.get("fingerprint") == fingerprint:
+        return vector_store_hf
+
+    if manifest.get("model") != model_id:
+        # Vectors of another model are not comparable; start over
+        vector_store_hf.delete_collection()
+        vector_store_hf = Chroma(
+            persist_directory=persist_directory,
+            embedding_function=doc_embedder,
+        )
+    added, deleted = sync_examples(vector_store_hf, docs)
+    print(f"Example index updated: {added} embedded, {deleted} removed")
     vector_store_hf.persist()
+    _write_manifest(persist_directory, {"model": model_id, "fingerprint": fingerprint, "ids": sorted(docs)})
     return vector_store_hf
+
+def _open_numpy_examples(path: str, docs: dict, doc_embedder, fingerprint: str) -> NumpyVectorStore:
+    saved = NumpyVectorStore.load(path, doc_embedder)
+    if saved is not None and saved.fingerprint == fingerprint:
+        return saved
+    reuse = saved if saved is not None and saved.model == doc_embedder.model_id else None
+    vector_store = NumpyVectorStore.from_documents(docs, doc_embedder, fingerprint, reuse=reuse)
+    vector_store.save(path)
+    removed = len(set(saved.ids) - set(docs)) if saved is not None else 0
+    print(f"Example index updated: {vector_store.n_embedded} embedded, {removed} removed")
+    return vector_store
@@ -0,0 +1,178 @@
+from __future__ import annotations
+from typing import Optional, Dict, List, Iterable
+import hashlib
+import math
+import os
+import zlib
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from . import hf_config
+from .catalog import tokenize
+
+# Default model of each backend
+DEFAULT_MODELS = {
+    "hf-endpoint": "Qwen/Qwen3-Embedding-8B",
+    "sentence-transformers": "sentence-transformers/all-MiniLM-L6-v2",
+    "tfidf": "hashed-tfidf-2048",
+}
+
+# Least cosine similarity of a useful match, per backend: unrelated texts
+# score near 0 with TF-IDF but well above 0 with neural models. Checked with
+# `python -m benchmarks.retriever_benchmark --backend <backend> --calibrate`,
+# which scores on-topic and off-topic requests against the code examples.
+# For "tfidf" the best on-topic scores are 0.108-0.375 and off-topic ones
+# 0-0.108, so 0.12 drops every off-topic request at the cost of the weakest
+# on-topic one. The neural thresholds are starting points for those models'
+# score ranges; recalibrate when switching models.
+# CLIMATE_AGENT_MIN_RELEVANCE overrides the threshold of every backend.
+MIN_RELEVANCE = {
+    "hf-endpoint": 0.4,
+    "sentence-transformers": 0.3,
+    "tfidf": 0.12,
+}
+if "CLIMATE_AGENT_MIN_RELEVANCE" in os.environ:
+    MIN_RELEVANCE = dict.fromkeys(MIN_RELEVANCE, float(os.environ["CLIMATE_AGENT_MIN_RELEVANCE"]))
+
+
+def _features(text: str) -> Dict[int, float]:
+    """
+    Hashed term counts of a text: its tokens (see `catalog.tokenize`) and, at half
+    weight, its token bigrams. crc32 keeps the buckets stable across processes.
+    """
+    tokens = tokenize(text)
+    counts: Dict[int, float] = {}
+    for term, weight in [(t, 1.0) for t in tokens] + [(f"{a} {b}", 0.5) for a, b in zip(tokens, tokens[1:])]:
+        key = zlib.crc32(term.encode("utf-8"))
+        counts[key] = counts.get(key, 0.0) + weight
+    return counts
+
+
+class HashedTfidfEmbeddings(Embeddings):
+    """
+    TF-IDF vectors in a fixed number of hashed dimensions, computed locally on the CPU.
+
+    The inverse document frequencies are taken from `corpus` (the texts being
+    indexed), so words shared by every code description ("code", "packages")
+    count for little and topic words for a lot. Vectors are L2-normalized, so
+    the cosine similarity of a query and a document is their dot product.
+    Enough for a corpus of a few dozen documents, with no model download.
+    """
+
+    def __init__(self, corpus: Iterable[str] = (), dim: int = 2048):
+        self.dim = dim
+        corpus = list(corpus)
+        document_frequency = np.zeros(dim)
+        for text in corpus:
+            buckets = {key % dim for key in _features(text)}
+            document_frequency[list(buckets)] += 1
+        self.idf = np.log((1 + len(corpus)) / (1 + document_frequency)) + 1
+        corpus_hash = hashlib.sha256("\0".join(sorted(corpus)).encode("utf-8")).hexdigest()[:12]
+        self.model_id = f"hashed-tfidf-{dim}-{corpus_hash}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim)
+        for key, count in _features(text).items():
+            # Sublinear term frequency
+            vector[key % self.dim] += 1 + math.log(count) if count >= 1 else count
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Embeddings of another backend, sent `batch_size` documents at a time.
+
+    `model_id` names the backend and model; the example index is
+    fingerprinted with it (see `db_creation.create_db_examples`).
+    """
+
+    def __init__(self, embeddings: Embeddings, model_id: str, batch_size: int = 32):
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + self.batch_size]))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+def get_embeddings(
+    backend: Optional[str] = None,
+    model: Optional[str] = None,
+    token: Optional[str] = None,
+    corpus: Optional[Iterable[str]] = None,
+    batch_size: Optional[int] = None,
+) -> BatchedEmbeddings:
+    """
+    Embedding function for the code-example index.
+
+    Parameters
+    ----------
+    backend : {"hf-endpoint", "sentence-transformers", "tfidf"}, optional
+        "hf-endpoint" calls the HuggingFace inference endpoint; "sentence-transformers"
+        runs a small model on the CPU (needs the `sentence-transformers` package);
+        "tfidf" is `HashedTfidfEmbeddings`, which needs no model nor network.
+        Defaults to `hf_config.get_embedding_config()`
+    model : str, optional
+        Model name; defaults to the configured one, or the backend's default
+    token : str, optional
+        HuggingFace token for "hf-endpoint"; defaults to `hf_config.get_hf_token()`
+    corpus : iterable of str, optional
+        Texts to index, for the IDF weights of "tfidf"
+    batch_size : int, optional
+        Documents per embedding call when building an index
+
+    Returns
+    -------
+    BatchedEmbeddings
+    """
+    config = hf_config.get_embedding_config()
+    backend = backend or config["backend"]
+    if backend not in DEFAULT_MODELS:
+        raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {list(DEFAULT_MODELS)}")
+    if model is None:
+        model = config["model"] if backend == config["backend"] and config["model"] else DEFAULT_MODELS[backend]
+    batch_size = batch_size or config["batch_size"]
+
+    if backend == "hf-endpoint":
+        from langchain_huggingface import HuggingFaceEndpointEmbeddings
+        embeddings = HuggingFaceEndpointEmbeddings(
+            model=model,
+            task="feature-extraction",
+            model_kwargs={"normalize": True},
+            huggingfacehub_api_token=token or hf_config.get_hf_token(),
+        )
+        model_id = model
+    elif backend == "sentence-transformers":
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model,
+                model_kwargs={"device": "cpu"},
+                encode_kwargs={"normalize_embeddings": True, "batch_size": batch_size},
+            )
+        except ImportError as e:
+            raise ImportError(
+                "The 'sentence-transformers' embedding backend needs the sentence-transformers package; "
+                "install it or use the 'tfidf' backend"
+            ) from e
+        model_id = f"sentence-transformers:{model}"
+    else:
+        dim = model.rsplit("-", 1)[-1]
+        embeddings = HashedTfidfEmbeddings(corpus or (), dim=int(dim) if dim.isdigit() else 2048)
+        model_id = embeddings.model_id
+    return BatchedEmbeddings(embeddings, model_id, batch_size)
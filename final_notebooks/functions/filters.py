@@ -0,0 +1,253 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, List, Literal
+import functools
+import os
+import uuid
+import numpy as np
+import pandas as pd
+import xarray as xr
+import scipy.signal as signal
+from pydantic import BaseModel, Field
+from langchain.tools import StructuredTool
+from .workers import make_async
+
+# Outside the subset cache directory (temp/cache), which the cache may clear
+DEFAULT_FILTER_DIR = os.path.join("temp", "filtered")
+
+FilterKind = Literal["low", "high", "band"]
+
+
+@functools.lru_cache(maxsize=64)
+def design_filter(kind: FilterKind, cutoff: Union[float, Tuple[float, float]], order: int = 4, fs: float = 1.0) -> np.ndarray:
+    """
+    Butterworth filter in second-order sections, designed once per (kind, cutoff, order, fs).
+
+    Parameters
+    ----------
+    kind : {"low", "high", "band"}
+        Filter type
+    cutoff : float or tuple of float
+        Cutoff frequency (low/high) or (low, high) band edges, in cycles per day
+    order : int, default 4
+        Filter order
+    fs : float, default 1.0
+        Sampling frequency in samples per day
+
+    Returns
+    -------
+    np.ndarray
+        Second-order sections for `scipy.signal.sosfiltfilt`
+    """
+    if kind not in ("low", "high", "band"):
+        raise ValueError("kind must be 'low', 'high', or 'band'")
+    if kind == "band" and np.ndim(cutoff) != 1:
+        raise ValueError("A band-pass filter needs cutoff=(low, high)")
+    if kind != "band" and np.ndim(cutoff) != 0:
+        raise ValueError(f"A {kind}-pass filter needs a single cutoff frequency")
+    btype = {"low": "lowpass", "high": "highpass", "band": "bandpass"}[kind]
+    sos = signal.butter(order, cutoff, btype=btype, fs=fs, output="sos")
+    sos.setflags(write=False)
+    return sos
+
+
+def sampling_frequency(time: pd.DatetimeIndex, rtol: float = 0.01) -> float:
+    """
+    Samples per day of a regular time axis.
+
+    Raises
+    ------
+    ValueError
+        If the time steps are irregular (e.g. monthly data, or gaps in the record);
+        resample the data to a regular step first.
+    """
+    # In days, independent of the datetime64 unit of the index
+    steps = np.asarray(pd.DatetimeIndex(time)[1:] - pd.DatetimeIndex(time)[:-1]) / np.timedelta64(1, "D")
+    if len(steps) == 0:
+        raise ValueError("Need at least two time steps to infer the sampling frequency")
+    step = np.median(steps)
+    if np.any(np.abs(steps - step) > rtol * step):
+        raise ValueError("Time steps are irregular; resample to a regular step (e.g. resample_to='D') before filtering")
+    return 1.0 / step
+
+
+def _fill_gaps(x: np.ndarray) -> np.ndarray:
+    """
+    Linearly interpolate NaNs along the last axis, holding the edge values beyond
+    the first/last valid sample (pandas' `interpolate(limit_direction="both")`).
+    """
+    missing = np.isnan(x)
+    gappy = missing.any(axis=-1) & ~missing.all(axis=-1)
+    if not gappy.any():
+        return x
+    x = x.copy()
+    steps = np.arange(x.shape[-1])
+    for idx in zip(*np.nonzero(gappy)):
+        row, gaps = x[idx], missing[idx]
+        row[gaps] = np.interp(steps[gaps], steps[~gaps], row[~gaps])
+    return x
+
+
+def _sosfiltfilt(x: np.ndarray, sos: np.ndarray, padlen: int, fill_gaps: bool) -> np.ndarray:
+    if fill_gaps:
+        x = _fill_gaps(x)
+    # The cached design is read-only, which scipy's filter kernel does not accept
+    return signal.sosfiltfilt(sos.copy(), x, axis=-1, padlen=padlen)
+
+
+def butter_filter(
+    da: xr.DataArray,
+    kind: FilterKind,
+    cutoff: Union[float, Tuple[float, float]],
+    order: int = 4,
+    dim: str = "time",
+    fs: Optional[float] = None,
+    fill_gaps: bool = True,
+) -> xr.DataArray:
+    """
+    Zero-phase Butterworth filter along time, for every grid cell at once.
+
+    The gridded counterpart of `butter_filter` in `txt_docs/filters.txt`. The
+    filter is designed once (see `design_filter`) and `sosfiltfilt` runs through
+    `xr.apply_ufunc`, in parallel over the spatial chunks of dask-backed data
+    (the time axis is put in a single chunk).
+
+    Parameters
+    ----------
+    da : xr.DataArray
+        Data with a time dimension, e.g. opened from the `load_climate_data` output
+    kind : {"low", "high", "band"}
+        Filter type
+    cutoff : float or tuple of float
+        Cutoff frequency (low/high) or (low, high) band edges, in cycles per day
+        (e.g. 1/30 for a ~30 day low-pass)
+    order : int, default 4
+        Filter order
+    dim : str, default "time"
+        Name of the time dimension
+    fs : float, optional
+        Samples per day. If None, inferred from the time coordinate
+    fill_gaps : bool, default True
+        Linearly interpolate gaps (and extend the edges) before filtering, as the
+        series version does. Cells without any valid value stay NaN.
+
+    Returns
+    -------
+    xr.DataArray
+        Filtered data with the dims of `da`
+    """
+    if fs is None:
+        fs = sampling_frequency(da.indexes[dim])
+    if np.ndim(cutoff):
+        cutoff = tuple(float(c) for c in cutoff)
+    else:
+        cutoff = float(cutoff)
+    sos = design_filter(kind, cutoff, order, fs)
+
+    if da.chunks:
+        da = da.chunk({dim: -1})
+    # Same default padding as filtfilt, capped for short records
+    padlen = min(3 * (2 * len(sos) + 1), da.sizes[dim] - 1)
+
+    filtered = xr.apply_ufunc(
+        _sosfiltfilt,
+        da,
+        kwargs={"sos": sos, "padlen": padlen, "fill_gaps": fill_gaps},
+        input_core_dims=[[dim]],
+        output_core_dims=[[dim]],
+        dask="parallelized",
+        output_dtypes=[np.result_type(da.dtype, np.float32)],
+        keep_attrs=True,
+    )
+    return filtered.transpose(*da.dims)
+
+
+### agent tool
+
+def filter_climate_data(
+    file_path: str,
+    kind: FilterKind,
+    period_days: List[float],
+    variable: Optional[str] = None,
+    order: int = 4,
+    output_dir: str = DEFAULT_FILTER_DIR,
+) -> str:
+    """
+    Butterworth-filter a subset written by `load_climate_data` and save the result.
+
+    Parameters
+    ----------
+    file_path : str
+        Path returned by `load_climate_data` (.nc or .zarr)
+    kind : {"low", "high", "band"}
+        Filter type
+    period_days : list of float
+        Cutoff period in days for low/high-pass (e.g. [30]), or the
+        [shortest, longest] periods kept by a band-pass (e.g. [10, 90])
+    variable : str, optional
+        Variable to filter. If None, the file must contain a single variable
+    order : int, default 4
+        Filter order
+    output_dir : str, default "temp/filtered"
+        Where the result is written; kept out of the subset cache directory,
+        which the cache may clear
+
+    Returns
+    -------
+    str
+        Path to the NetCDF file with the filtered variable, named by the
+        filter kind, periods and order
+    """
+    ds = xr.open_dataset(file_path, chunks={})
+    if variable is None:
+        if len(ds.data_vars) != 1:
+            raise ValueError(f"Pass `variable`, the file holds several: {list(ds.data_vars)}")
+        variable = next(iter(ds.data_vars))
+
+    if kind == "band":
+        if len(period_days) != 2:
+            raise ValueError("A band-pass filter needs period_days=[shortest, longest]")
+        cutoff = (1 / max(period_days), 1 / min(period_days))
+    else:
+        if len(period_days) != 1:
+            raise ValueError(f"A {kind}-pass filter needs a single period, e.g. period_days=[30]")
+        cutoff = 1 / period_days[0]
+    filtered = butter_filter(ds[variable], kind, cutoff, order=order)
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(file_path.rstrip("/")))[0]
+    periods = "-".join(f"{p:g}" for p in period_days)
+    name = f"{stem}_{variable}_{kind}pass_{periods}d_order{order}"
+    path = os.path.join(output_dir, f"{name}.nc")
+    # Written next to the final path and moved into place, so a concurrent
+    # reader never opens a partly written file
+    tmp_path = os.path.join(output_dir, f"{name}.{uuid.uuid4().hex[:8]}.tmp.nc")
+    try:
+        filtered.to_dataset(name=variable).to_netcdf(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class FilterParams(BaseModel):
+    """
+    Parameters for Butterworth-filtering a downloaded subset along time.
+    """
+    file_path: str = Field(..., description="Path returned by load_climate_data")
+    kind: FilterKind = Field(..., description="'low' (keep slow variability), 'high' (keep fast variability) or 'band'")
+    period_days: List[float] = Field(
+        ..., description="Cutoff period in days, e.g. [30] for low/high-pass, or [10, 90] to keep 10-90 day variability with a band-pass"
+    )
+    variable: Optional[str] = Field(None, description="Variable to filter; may be omitted if the file holds one variable")
+    order: int = Field(4, description="Butterworth filter order")
+
+
+def create_filter_tool():
+    return StructuredTool.from_function(
+        func=filter_climate_data,
+        coroutine=make_async(filter_climate_data),
+        name="filter_climate_data",
+        description="Apply a zero-phase low-, high- or band-pass Butterworth filter along time to every grid cell of a file downloaded by load_climate_data. Returns the path of a NetCDF file with the filtered data, to map or plot with python_repl.",
+        args_schema=FilterParams
+    )
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+DAYS_PER_YEAR = 365.25
+
+
+def harmonic_design_matrix(
+    time: pd.DatetimeIndex,
+    period: float = DAYS_PER_YEAR,
+    n_harmonics: int = 2,
+) -> np.ndarray:
+    """
+    Design matrix of the trend + harmonics model: [1, t, sin(k w t), cos(k w t), ...].
+
+    `t` is in days since the first time step, taken from the timestamps, so
+    gaps in the record keep the seasonal phase. With the default two harmonics
+    these are the annual and semiannual cycles of `anomaly_calculation.txt`.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (n_time, 2 + 2 * n_harmonics)
+    """
+    time = pd.DatetimeIndex(time)
+    t = np.asarray((time - time[0]) / pd.Timedelta(days=1), dtype=float)
+    omega = 2 * np.pi / period
+    columns = [np.ones_like(t), t]
+    for k in range(1, n_harmonics + 1):
+        columns.extend([np.sin(k * omega * t), np.cos(k * omega * t)])
+    return np.column_stack(columns)
+
+
+def _solve_batched(y: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """
+    Least-squares coefficients for every series along the last axis of `y` at once.
+
+    Missing values are left out of each series' normal equations, so cells with
+    gaps get the same answer as `np.linalg.lstsq` on their valid samples, and
+    cells with fewer valid samples than coefficients come out as NaN.
+    """
+    valid = np.isfinite(y)
+    y = np.where(valid, y, 0.0)
+    w = valid.astype(X.dtype)
+    # Normal equations (X^T W X) beta = X^T W y, one small system per series
+    lhs = np.einsum("...t,tp,tq->...pq", w, X, X)
+    rhs = y @ X
+    n_coef = X.shape[1]
+    solvable = w.sum(axis=-1) >= n_coef
+    lhs[~solvable] = np.eye(n_coef)
+    try:
+        beta = np.linalg.solve(lhs, rhs[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        beta = (np.linalg.pinv(lhs) @ rhs[..., None])[..., 0]
+    beta[~solvable] = np.nan
+    return beta
+
+
+def fit_harmonics(
+    da: xr.DataArray,
+    period: float = DAYS_PER_YEAR,
+    n_harmonics: int = 2,
+    dim: str = "time",
+) -> xr.Dataset:
+    """
+    Fit trend + annual/semiannual harmonics to every grid cell and return anomalies.
+
+    The gridded counterpart of `txt_docs/anomaly_calculation.txt`: one design
+    matrix is built for the shared time axis, and the fit for all cells is a
+    single batched solve run by `xr.apply_ufunc`, chunk by chunk for dask-backed
+    data (the time axis is put in a single chunk; spatial chunks are kept).
+
+    Parameters
+    ----------
+    da : xr.DataArray
+        Data with a time dimension, e.g. opened from the `load_climate_data` output
+    period : float, default 365.25
+        Period of the fundamental harmonic, in days
+    n_harmonics : int, default 2
+        Number of harmonics (1: annual, 2: annual and semiannual, ...)
+    dim : str, default "time"
+        Name of the time dimension
+
+    Returns
+    -------
+    xr.Dataset
+        anomaly : data minus the fitted trend and seasonal cycle (same dims as `da`)
+        fit : the fitted trend and seasonal cycle
+        trend : linear trend per year (units of `da` per year)
+        amplitude : amplitude of each harmonic, along a `harmonic` dim
+        phase : days after the first time step at which each harmonic first peaks
+    """
+    X = harmonic_design_matrix(da.indexes[dim], period, n_harmonics)
+    n_coef = X.shape[1]
+    if da.chunks:
+        da = da.chunk({dim: -1})
+
+    beta = xr.apply_ufunc(
+        _solve_batched,
+        da.astype(float),
+        kwargs={"X": X},
+        input_core_dims=[[dim]],
+        output_core_dims=[["coef"]],
+        dask="parallelized",
+        output_dtypes=[float],
+        dask_gufunc_kwargs={"output_sizes": {"coef": n_coef}},
+    )
+
+    design = xr.DataArray(X, dims=(dim, "coef"), coords={dim: da[dim]})
+    fit = xr.dot(beta, design, dim="coef").transpose(*da.dims)
+
+    sin = beta.isel(coef=slice(2, None, 2)).rename(coef="harmonic")
+    cos = beta.isel(coef=slice(3, None, 2)).rename(coef="harmonic")
+    harmonic = np.arange(1, n_harmonics + 1)
+    sin = sin.assign_coords(harmonic=harmonic)
+    cos = cos.assign_coords(harmonic=harmonic)
+    harmonic_period = xr.DataArray(period / harmonic, dims="harmonic", coords={"harmonic": harmonic})
+    # a sin(wt) + b cos(wt) = A cos(wt - phi), peaking at t = phi / w
+    phase = (np.arctan2(sin, cos) % (2 * np.pi)) / (2 * np.pi) * harmonic_period
+
+    units = da.attrs.get("units", "")
+    result = xr.Dataset({
+        "anomaly": (da - fit).assign_attrs(units=units, long_name="anomaly (trend and seasonal cycle removed)"),
+        "fit": fit.assign_attrs(units=units, long_name="trend and seasonal cycle"),
+        "trend": (beta.isel(coef=1, drop=True) * DAYS_PER_YEAR).assign_attrs(
+            units=f"{units} per year".strip(), long_name="linear trend"
+        ),
+        "amplitude": np.hypot(sin, cos).assign_attrs(units=units, long_name="harmonic amplitude"),
+        "phase": phase.assign_attrs(units="days", long_name="days after the first time step to the harmonic's first maximum"),
+    })
+    return result.assign_coords(period=harmonic_period)
@@ -1,6 +1,12 @@
 # config.py
 HF_TOKEN = None  # Default is None, set it from Jupyter or script
 
+# Embedding backend for the code-example index, see functions/embeddings.py
+EMBEDDING_BACKEND = "hf-endpoint"  # "hf-endpoint", "sentence-transformers" or "tfidf"
+EMBEDDING_MODEL = None  # None: the backend's default model
+EMBEDDING_BATCH_SIZE = 32
+EXAMPLE_STORE = "numpy"  # vector store of the code examples: "numpy" or "chroma"
+
 def set_hf_token(token: str):
     """
     Set HuggingFace token globally.
@@ -14,4 +20,26 @@ def get_hf_token() -> str:
     """
     if HF_TOKEN is None:
         raise ValueError("HF_TOKEN is not set. Please run config.set_hf_token('<your_token>').")
-    return HF_TOKEN
\ No newline at end of file
+    return HF_TOKEN
+
+def set_embedding_backend(backend: str, model: str = None, batch_size: int = 32):
+    """
+    Select the embedding backend (and optionally its model) globally.
+    """
+    global EMBEDDING_BACKEND, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE
+    EMBEDDING_BACKEND = backend
+    EMBEDDING_MODEL = model
+    EMBEDDING_BATCH_SIZE = batch_size
+
+def set_example_store(store: str):
+    """
+    Select the vector store of the code examples globally ("numpy" or "chroma").
+    """
+    global EXAMPLE_STORE
+    EXAMPLE_STORE = store
+
+def get_embedding_config() -> dict:
+    """
+    Get the embedding backend and example store settings.
+    """
+    return {"backend": EMBEDDING_BACKEND, "model": EMBEDDING_MODEL, "batch_size": EMBEDDING_BATCH_SIZE, "store": EXAMPLE_STORE}
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, Union, Tuple, Dict, Any, Literal
+from typing import Optional, Union, Tuple, Dict, Any, List, Literal, Callable, Iterator
 import xarray as xr
 import s3fs
 import fsspec
@@ -7,11 +7,23 @@ import numpy as np
 import pathlib
 import zarr
 from datetime import datetime
+import contextlib
+import functools
+import json
 import shutil
 import os
+import threading
+import time
+import uuid
 import pandas as pd
 from pydantic import BaseModel, Field, confloat
 from langchain.tools import Tool, StructuredTool
+from langchain_core.callbacks import dispatch_custom_event
+from langchain_core.runnables import ensure_config
+from .cache import SubsetCache, _remove_path, get_subset_cache, normalize_request, request_key
+from .reductions import ReductionSpec, apply_reduction, as_reduction
+from .store_pool import open_store_dataset
+from .workers import make_async
 
 ### helper functions to normalize coords
 
@@ -72,10 +84,94 @@ def _infer_target_lon_frame(lon_min: float, lon_max: float) -> str:
     return "0-360" if (lon_min >= 0 and lon_max <= 360) else "-180-180"
 
 
+def _lon_frame_of(lon: np.ndarray) -> str:
+    """
+    Frame ('0-360' or '-180-180') of an array of longitudes.
+    """
+    return "0-360" if (np.nanmin(lon) >= 0 and np.nanmax(lon) <= 360) else "-180-180"
+
+
+def _to_lon_frame(lon: Union[float, np.ndarray], frame: str) -> Union[float, np.ndarray]:
+    """
+    Express longitudes in `frame`. Values already inside the frame are left unchanged,
+    so 360 stays 360 in '0-360' and 180 stays 180 in '-180-180'.
+    """
+    lon = np.asarray(lon, dtype=float)
+    if frame == "0-360":
+        out = np.where((lon >= 0) & (lon <= 360), lon, np.mod(lon, 360.0))
+    else:
+        out = np.where((lon >= -180) & (lon <= 180), lon, ((lon + 180) % 360) - 180)
+    return out if out.ndim else float(out)
+
+
+def _normalize_lon_range(lon_range: Tuple[float, float]) -> Tuple[str, Tuple[float, float]]:
+    """
+    Pick the frame in which a longitude range is increasing and express it there.
+
+    (350, 10) and (-10, 10) both become ('-180-180', (-10, 10)); (170, -170)
+    becomes ('0-360', (170, 190)). The returned frame is the one
+    `_infer_target_lon_frame` gives for the normalized range.
+    """
+    frame = _infer_target_lon_frame(*lon_range)
+    lo, hi = (_to_lon_frame(v, frame) for v in lon_range)
+    if lo > hi:
+        other = "-180-180" if frame == "0-360" else "0-360"
+        other_lo, other_hi = (_to_lon_frame(v, other) for v in lon_range)
+        if other_lo <= other_hi:
+            lo, hi = other_lo, other_hi
+    # Re-infer from the normalized range, so equal ranges always get the same frame
+    return _infer_target_lon_frame(lo, hi), (lo, hi)
+
+
+def _lon_index_slices(lon: pd.Index, bounds: Tuple[float, float]) -> Optional[List[slice]]:
+    """
+    Integer slices of an increasing native longitude axis covering `bounds`
+    (given in any frame). Two slices are returned when the range crosses the
+    seam of the native frame (the antimeridian or the prime meridian).
+    Returns None if the axis is not increasing.
+    """
+    if not lon.is_monotonic_increasing:
+        return None
+    native = _lon_frame_of(lon.values)
+    if bounds[1] - bounds[0] >= 360:
+        # Whole globe, starting from the western bound
+        k = int(lon.searchsorted(_to_lon_frame(bounds[0], native)))
+        slices = [slice(k, len(lon)), slice(0, k)]
+    else:
+        lo, hi = (_to_lon_frame(v, native) for v in bounds)
+        if lo <= hi:
+            slices = [_index_slice(lon, (lo, hi))]
+        else:
+            slices = [_index_slice(lon, (lo, None)), _index_slice(lon, (None, hi))]
+    return [sl for sl in slices if sl.stop > sl.start] or slices[:1]
+
+
+def _select_lon(ds: xr.Dataset, lon_name: str, bounds: Tuple[float, float], target_frame: str) -> xr.Dataset:
+    """
+    Select a longitude range and express it in `target_frame`.
+
+    The range is cut from the native axis (one slice, or two slices joined when
+    it crosses the native seam), so no sort of the dataset is needed. Falls back
+    to reframing the whole axis and selecting for non-increasing axes.
+    """
+    slices = _lon_index_slices(ds.indexes[lon_name], bounds)
+    if slices is None:
+        return _coerce_longitudes(ds, target_frame).sel({lon_name: slice(*bounds)})
+    if len(slices) == 1:
+        ds = ds.isel({lon_name: slices[0]})
+    else:
+        ds = xr.concat([ds.isel({lon_name: sl}) for sl in slices], dim=lon_name)
+    return ds.assign_coords({lon_name: _to_lon_frame(ds[lon_name].values, target_frame)})
+
+
 def _coerce_longitudes(ds: xr.Dataset, target_frame: str, assume_frame: Optional[str] = None) -> xr.Dataset:
     """
     Coerce dataset longitudes to a target frame ('0-360' or '-180-180').
     Works with either 'longitude' or 'lon' coordinate names.
+
+    An increasing axis (e.g. a regular grid) stays increasing after the frame
+    change except for one wrap point, so it is rolled to that point instead of
+    sorted; other axes fall back to `sortby`.
     """
     lon_name, _ = _get_coord_names(ds)
     
@@ -83,7 +179,7 @@ def _coerce_longitudes(ds: xr.Dataset, target_frame: str, assume_frame: Optional
     if assume_frame:
         current = assume_frame
     else:
-        current = "0-360" if (np.nanmin(lon) >= 0 and np.nanmax(lon) <= 360) else "-180-180"
+        current = _lon_frame_of(lon)
 
     if current == target_frame:
         return ds
@@ -94,6 +190,10 @@ def _coerce_longitudes(ds: xr.Dataset, target_frame: str, assume_frame: Optional
         lon_new = ((lon + 180) % 360) - 180
     
     ds = ds.assign_coords({lon_name: lon_new})
+    if lon.ndim == 1 and lon.size > 1 and np.all(np.diff(lon) > 0):
+        rolled = ds.roll({lon_name: -int(np.argmin(lon_new))}, roll_coords=True)
+        if np.all(np.diff(rolled[lon_name].values) > 0):
+            return rolled
     return ds.sortby(lon_name)
 
 
@@ -108,12 +208,486 @@ def _ensure_lat_monotonic(ds: xr.Dataset) -> xr.Dataset:
         return ds.sortby(lat_name)
     return ds
 
+def _index_slice(index: pd.Index, bounds: Tuple[Any, Any]) -> slice:
+    """
+    Integer positions selected by label-based `slice(*bounds)` on a monotonic index.
+    """
+    start, stop, _ = index.slice_indexer(*bounds).indices(len(index))
+    return slice(start, max(start, stop))
+
+
+def _native_chunks(da: xr.DataArray) -> Optional[Dict[str, int]]:
+    """
+    Chunk shape of the variable in its Zarr store, or None if unknown.
+    """
+    chunks = da.encoding.get("chunks")
+    if not chunks:
+        return None
+    return dict(zip(da.dims, chunks))
+
+
+def _chunk_multiples(
+    native: Dict[str, int],
+    lengths: Dict[str, int],
+    itemsize: int,
+    target_bytes: int,
+    fixed: Optional[Dict[str, int]] = None,
+) -> Dict[str, int]:
+    """
+    Grow native chunk sizes by integer factors until a chunk reaches `target_bytes`.
+
+    Dimensions are doubled in turn, never beyond the selected length. Sizes in
+    `fixed` are used as given (e.g. the whole time axis for time series).
+    """
+    fixed = fixed or {}
+    sizes = {dim: fixed.get(dim, native[dim]) for dim in native}
+    growing = [dim for dim in native if dim not in fixed]
+    while growing:
+        for dim in list(growing):
+            nbytes = int(np.prod([min(sizes[d], lengths[d]) for d in sizes])) * itemsize
+            if nbytes * 2 > target_bytes or sizes[dim] * 2 > lengths[dim]:
+                growing.remove(dim)
+                continue
+            sizes[dim] *= 2
+    return sizes
+
+
+def _aligned_chunks(selection: slice, block: int) -> Tuple[int, ...]:
+    """
+    Chunk sizes for a selection so that chunk edges fall on multiples of `block`
+    in the original array, e.g. selection 10:400 with block 120 -> (110, 120, 120, 40).
+    """
+    start, stop = selection.start, selection.stop
+    if stop <= start:
+        return (0,)
+    edges = [start] + list(range((start // block + 1) * block, stop, block)) + [stop]
+    return tuple(b - a for a, b in zip(edges[:-1], edges[1:]))
+
+
+def auto_chunks(
+    da: xr.DataArray,
+    selection: Optional[Dict[str, slice]] = None,
+    *,
+    target_chunk_mb: float = 128.0,
+    time_contiguous: bool = False,
+) -> Optional[Dict[str, Tuple[int, ...]]]:
+    """
+    Pick dask chunks for a selection of `da` that line up with its native Zarr chunks.
+
+    Every dask chunk covers whole native chunks (apart from the edges of the
+    selection), so no remote object is fetched by more than one dask task.
+    Chunk sizes are integer multiples of the native ones, grown up to
+    `target_chunk_mb`. With `time_contiguous`, each chunk spans the whole
+    selected time axis, which suits per-point time series analysis.
+
+    Parameters
+    ----------
+    da : xr.DataArray
+        Variable opened from a Zarr store (its encoding holds the native chunks)
+    selection : dict of slice or list of slice, optional
+        Integer selection per dimension; a list of slices is joined in order
+        (longitudes crossing the seam). Missing dimensions are taken whole
+    target_chunk_mb : float, default 128
+        Approximate size of a dask chunk
+    time_contiguous : bool, default False
+        Use a single chunk along time
+
+    Returns
+    -------
+    dict or None
+        Explicit chunk sizes per dimension, or None if the native chunking is unknown
+    """
+    native = _native_chunks(da)
+    if native is None:
+        return None
+    selection = {
+        dim: (selection or {}).get(dim, slice(0, size)) for dim, size in zip(da.dims, da.shape)
+    }
+    selection = {dim: sel if isinstance(sel, list) else [sel] for dim, sel in selection.items()}
+    lengths = {dim: sum(sl.stop - sl.start for sl in sels) for dim, sels in selection.items()}
+    fixed = {"time": max(lengths["time"], 1)} if time_contiguous and "time" in lengths else None
+    blocks = _chunk_multiples(
+        native, lengths, np.dtype(da.dtype).itemsize, int(target_chunk_mb * 1024**2), fixed
+    )
+    chunks = {}
+    for dim, sels in selection.items():
+        if fixed and dim in fixed:
+            chunks[dim] = (lengths[dim],)
+        else:
+            chunks[dim] = sum((_aligned_chunks(sl, blocks[dim]) for sl in sels if sl.stop > sl.start), ()) or (0,)
+    return chunks
+
+
+def _check_size(ds: Union[xr.Dataset, xr.DataArray], max_size_gb: float) -> float:
+    """
+    Estimate the in-memory size of `ds` in gigabytes and raise if it exceeds `max_size_gb`.
+
+    Uses each data variable's real dtype; coordinates are not counted.
+    Use `sizing.estimate_climate_data_size` to estimate a request before opening it.
+    """
+    if isinstance(ds, xr.DataArray):
+        n_bytes = ds.size * ds.dtype.itemsize
+    else:
+        n_bytes = sum(var.size * var.dtype.itemsize for var in ds.data_vars.values())
+    
+    estimated_gb = n_bytes / (1024**3)
+    
+    if estimated_gb > max_size_gb:
+        raise ValueError(
+            f"Dataset too large to download safely. "
+            f"Estimated size: {estimated_gb:.2f} GB, "
+            f"Maximum allowed: {max_size_gb:.2f} GB"
+        )
+    return estimated_gb
+
+
+def _default_filename(ds: Union[xr.Dataset, xr.DataArray], suffix: str) -> str:
+    """
+    Build a unique, timestamped file name for `ds`.
+
+    The random suffix keeps names of calls made within the same second
+    (e.g. concurrent batch loads) apart.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if isinstance(ds, xr.DataArray):
+        prefix = ds.name or "data"
+    else:
+        prefix = "dataset"
+    return f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}"
+
+
+def _strip_time_zone(ds: xr.Dataset) -> xr.Dataset:
+    """
+    Convert a timezone-aware (UTC) time coordinate to naive UTC so it can be serialized.
+
+    Works on the in-memory time index, so no data variable is loaded.
+    """
+    if "time" not in ds.coords:
+        return ds
+    index = ds.indexes.get("time")
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        ds = ds.assign_coords(time=index.tz_convert(None))
+    return ds
+
+
+def _zarr_compressor(codec: str, clevel: int):
+    """
+    Build a Zarr v3 compressor from a short codec name.
+    """
+    from zarr.codecs import BloscCodec, ZstdCodec
+
+    if codec == "zstd":
+        return ZstdCodec(level=clevel)
+    if codec in ("lz4", "lz4hc", "blosclz", "zlib"):
+        return BloscCodec(cname=codec, clevel=clevel, shuffle="shuffle")
+    raise ValueError(f"Unknown codec '{codec}'. Use 'zstd', 'lz4', 'lz4hc', 'blosclz' or 'zlib'.")
+
+
+def _uniform_chunks(ds: xr.Dataset) -> xr.Dataset:
+    """
+    Make dask chunks uniform along each dimension, as required by Zarr.
+
+    Data that is not dask-backed yet is chunked lazily with dask's automatic
+    chunk sizes, so nothing is read until the write happens.
+    """
+    if not ds.chunks:
+        return ds.chunk("auto")
+    return ds.chunk({dim: max(sizes) for dim, sizes in ds.chunks.items()})
+
+
+def _prepare_for_zarr(
+    ds: Union[xr.Dataset, xr.DataArray],
+    codec: str,
+    clevel: int,
+) -> Tuple[xr.Dataset, Dict[str, Dict[str, Any]]]:
+    """
+    Turn a subset into a uniformly chunked Dataset and build its Zarr encoding.
+    """
+    if isinstance(ds, xr.DataArray):
+        ds_to_save = ds.to_dataset(name=ds.name or 'data')
+    else:
+        ds_to_save = ds
+
+    ds_to_save = _uniform_chunks(_strip_time_zone(ds_to_save))
+    # Encodings inherited from the remote store (chunks, compressors) would clash
+    # with the new chunking and codec
+    for var in ds_to_save.variables.values():
+        var.encoding = {}
+    compressor = _zarr_compressor(codec, clevel)
+    encoding = {var: {"compressors": [compressor]} for var in ds_to_save.data_vars}
+    return ds_to_save, encoding
+
+
+def download_to_zarr(
+    ds: Union[xr.Dataset, xr.DataArray],
+    *,
+    max_size_gb: float = 10.0,
+    temp_dir: Optional[str] = "temp",
+    filename: Optional[str] = None,
+    codec: str = "zstd",
+    clevel: int = 3,
+    num_workers: Optional[int] = None,
+    group: Optional[str] = None,
+    mode: str = "w",
+) -> str:
+    """
+    Stream a dataset/array to a local Zarr store, chunk by chunk.
+
+    Unlike `download_to_temp`, the subset is never materialized as a whole:
+    dask computes and compresses each chunk independently and writes them in
+    parallel, so peak memory is bounded by the chunk size rather than the
+    subset size. This allows a larger `max_size_gb` than the NetCDF path.
+    
+    Parameters
+    ----------
+    ds : xr.Dataset or xr.DataArray
+        The dataset or array to save
+    max_size_gb : float, default 10.0
+        Maximum allowed size in gigabytes
+    temp_dir : str, optional
+        Directory to save to
+    filename : str, optional
+        Name for the saved store. If None, generates a unique name
+    codec : str, default "zstd"
+        Compression codec: "zstd", or a Blosc compressor ("lz4", "lz4hc", "blosclz", "zlib")
+    clevel : int, default 3
+        Compression level
+    num_workers : int, optional
+        Number of threads writing chunks concurrently. If None, uses dask's default
+    group : str, optional
+        Zarr group to write to, e.g. to store several regions in one store
+    mode : str, default "w"
+        "w" to overwrite the store, "a" to add a group to an existing one
+        
+    Returns
+    -------
+    str
+        Path to the saved Zarr store
+        
+    Raises
+    ------
+    ValueError
+        If estimated size exceeds max_size_gb or the codec is unknown
+    """
+    estimated_gb = _check_size(ds, max_size_gb)
+
+    if temp_dir is None:
+        temp_dir = os.path.join('..', '..', 'temp')
+    os.makedirs(temp_dir, exist_ok=True)
+
+    if filename is None:
+        filename = _default_filename(ds, ".zarr")
+    if not filename.endswith('.zarr'):
+        filename += '.zarr'
+    save_path = os.path.join(temp_dir, filename)
+
+    ds_to_save, encoding = _prepare_for_zarr(ds, codec, clevel)
+
+    print(f"Streaming to {save_path} (estimated size: {estimated_gb:.2f} GB)")
+    delayed = ds_to_save.to_zarr(save_path, mode=mode, group=group, encoding=encoding, compute=False)
+    delayed.compute(num_workers=num_workers)
+
+    return save_path
+
+
+class CancelToken:
+    """
+    Flag shared with a running `download_resumable` to stop it between blocks.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class DownloadCancelled(RuntimeError):
+    """
+    Raised when a resumable download is cancelled; completed blocks are kept.
+    """
+
+
+class DownloadProgress(BaseModel):
+    """
+    Progress of a resumable download, passed to the progress callback after each block.
+
+    Prefetching reports the same after each object, with `bytes_total` unknown (None).
+    """
+    path: str
+    blocks_done: int
+    blocks_total: int
+    bytes_done: int
+    bytes_total: Optional[int] = None
+    elapsed_s: float
+    eta_s: Optional[float] = None
+
+
+def _resume_fingerprint(ds: xr.Dataset, block_size: int) -> str:
+    """
+    Identify the layout of a staged download, so a changed request is not resumed.
+    """
+    layout = {
+        "sizes": dict(ds.sizes),
+        "vars": {name: str(var.dtype) for name, var in ds.data_vars.items()},
+        "time": [str(ds.indexes["time"][0]), str(ds.indexes["time"][-1])] if ds.sizes.get("time") else None,
+        "block_size": block_size,
+    }
+    return request_key(layout)
+
+
+def _write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def download_resumable(
+    ds: Union[xr.Dataset, xr.DataArray],
+    *,
+    max_size_gb: float = 10.0,
+    temp_dir: Optional[str] = "temp",
+    filename: Optional[str] = None,
+    block_size: Optional[int] = None,
+    codec: str = "zstd",
+    clevel: int = 3,
+    progress_callback: Optional[Callable[[DownloadProgress], None]] = None,
+    cancel_token: Optional[CancelToken] = None,
+) -> str:
+    """
+    Write a subset to a local Zarr store block by block along time, resuming after failures.
+
+    The store's metadata and coordinates are written first; then each block of
+    `block_size` time steps is written into its region of the store and recorded
+    in a JSON manifest next to it. Calling again with the same `filename` (e.g.
+    after the process died or the download was cancelled) skips the blocks the
+    manifest lists as done. A manifest from a differently shaped request is
+    discarded and the download starts over. The manifest is removed once every
+    block is written; completed stores are looked up through the subset cache.
+    
+    Parameters
+    ----------
+    ds : xr.Dataset or xr.DataArray
+        The dataset or array to save; must have a time dimension
+    max_size_gb : float, default 10.0
+        Maximum allowed size in gigabytes
+    temp_dir : str, optional
+        Directory to save to
+    filename : str, optional
+        Name for the saved store. Use a stable name to be able to resume
+    block_size : int, optional
+        Time steps per block. If None, uses the time chunk size of `ds`
+    codec, clevel
+        Compression, as in `download_to_zarr`
+    progress_callback : callable, optional
+        Called with a `DownloadProgress` after each block
+    cancel_token : CancelToken, optional
+        Checked before each block; if cancelled, raises `DownloadCancelled`
+        
+    Returns
+    -------
+    str
+        Path to the saved Zarr store
+        
+    Raises
+    ------
+    ValueError
+        If estimated size exceeds max_size_gb or `ds` has no time dimension
+    DownloadCancelled
+        If `cancel_token` was cancelled before the download completed
+    """
+    estimated_gb = _check_size(ds, max_size_gb)
+
+    if temp_dir is None:
+        temp_dir = os.path.join('..', '..', 'temp')
+    os.makedirs(temp_dir, exist_ok=True)
+
+    if filename is None:
+        filename = _default_filename(ds, ".zarr")
+    if not filename.endswith('.zarr'):
+        filename += '.zarr'
+    save_path = os.path.join(temp_dir, filename)
+    manifest_path = save_path + ".manifest.json"
+
+    ds_to_save, encoding = _prepare_for_zarr(ds, codec, clevel)
+    if "time" not in ds_to_save.dims:
+        raise ValueError("Resumable downloads are split along time, but the data has no time dimension.")
+    n_time = ds_to_save.sizes["time"]
+    if block_size is None:
+        block_size = ds_to_save.chunks["time"][0] if ds_to_save.chunks else n_time
+    blocks = [(start, min(start + block_size, n_time)) for start in range(0, n_time, block_size)]
+    fingerprint = _resume_fingerprint(ds_to_save, block_size)
+
+    manifest = None
+    if os.path.exists(manifest_path) and os.path.exists(save_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("fingerprint") != fingerprint:
+            manifest = None
+    if manifest is None:
+        print(f"Staging to {save_path} (estimated size: {estimated_gb:.2f} GB)")
+        shutil.rmtree(save_path, ignore_errors=True)
+        ds_to_save.to_zarr(save_path, mode="w", encoding=encoding, compute=False)
+        manifest = {"fingerprint": fingerprint, "blocks": blocks, "done": []}
+        _write_manifest(manifest_path, manifest)
+    else:
+        print(f"Resuming {save_path}: {len(manifest['done'])}/{len(blocks)} blocks already done")
+
+    # Variables without a time dimension were written with the metadata
+    timeless = [name for name, var in ds_to_save.variables.items() if "time" not in var.dims]
+    bytes_per_step = sum(
+        var.size * var.dtype.itemsize // n_time for var in ds_to_save.data_vars.values() if "time" in var.dims
+    )
+    bytes_total = bytes_per_step * n_time
+    done = set(manifest["done"])
+    started = time.monotonic()
+    bytes_this_run = 0
+    for i, (start, stop) in enumerate(blocks):
+        if i in done:
+            continue
+        if cancel_token is not None and cancel_token.cancelled:
+            raise DownloadCancelled(
+                f"Download to {save_path} cancelled after {len(done)}/{len(blocks)} blocks; call again to resume."
+            )
+        block = ds_to_save.isel(time=slice(start, stop)).drop_vars(timeless)
+        block.to_zarr(save_path, region={"time": slice(start, stop)})
+
+        done.add(i)
+        manifest["done"] = sorted(done)
+        _write_manifest(manifest_path, manifest)
+
+        bytes_this_run += bytes_per_step * (stop - start)
+        if progress_callback is not None:
+            bytes_done = sum(bytes_per_step * (blocks[j][1] - blocks[j][0]) for j in done)
+            elapsed = time.monotonic() - started
+            rate = bytes_this_run / elapsed if elapsed > 0 else None
+            progress_callback(DownloadProgress(
+                path=save_path,
+                blocks_done=len(done),
+                blocks_total=len(blocks),
+                bytes_done=bytes_done,
+                bytes_total=bytes_total,
+                elapsed_s=elapsed,
+                eta_s=(bytes_total - bytes_done) / rate if rate else None,
+            ))
+
+    os.remove(manifest_path)
+    return save_path
+
+
 def download_to_temp(
     ds: Union[xr.Dataset, xr.DataArray],
     *,
     max_size_gb: float = 1.0,
     temp_dir: Optional[str] = "temp",
     filename: Optional[str] = None,
+    group: Optional[str] = None,
+    mode: str = "w",
 ) -> str:
     """
     Download a dataset/array to a temporary directory with size checks.
@@ -128,6 +702,10 @@ def download_to_temp(
         Directory to save to. If None, uses system temp directory
     filename : str, optional
         Name for the saved file. If None, generates a unique name
+    group : str, optional
+        NetCDF group to write to, e.g. to store several regions in one file
+    mode : str, default "w"
+        "w" to overwrite the file, "a" to add a group to an existing one
         
     Returns
     -------
@@ -140,21 +718,7 @@ def download_to_temp(
         If estimated size exceeds max_size_gb
     """
     
-    # Estimate size in bytes (assuming float32)
-    bytes_per_value = 4  # float32
-    if isinstance(ds, xr.DataArray):
-        n_values = ds.size
-    else:
-        n_values = sum(var.size for var in ds.values())
-    
-    estimated_gb = (n_values * bytes_per_value) / (1024**3)
-    
-    if estimated_gb > max_size_gb:
-        raise ValueError(
-            f"Dataset too large to download safely. "
-            f"Estimated size: {estimated_gb:.2f} GB, "
-            f"Maximum allowed: {max_size_gb:.2f} GB"
-        )
+    estimated_gb = _check_size(ds, max_size_gb)
     
     # Set up temporary directory
     if temp_dir is None:
@@ -163,12 +727,7 @@ def download_to_temp(
     
     # Create filename if not provided
     if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if isinstance(ds, xr.DataArray):
-            prefix = ds.name or "data"
-        else:
-            prefix = "dataset"
-        filename = f"{prefix}_{timestamp}.nc"
+        filename = _default_filename(ds, ".nc")
     
     # Ensure .nc extension
     if not filename.endswith('.nc'):
@@ -203,12 +762,198 @@ def download_to_temp(
     #        f"allowed size ({max_size_gb:.2f} GB). File was deleted."
     #    )
     
-    ds_to_save["time"] = pd.to_datetime(ds_to_save["time"].values).tz_localize("UTC").tz_convert(None)
-    ds_to_save.to_netcdf(save_path, encoding=encoding)
+    ds_to_save = _strip_time_zone(ds_to_save)
+    ds_to_save.to_netcdf(save_path, mode=mode, group=group, encoding=encoding)
     
     
     return save_path
 
+def _slice_cached_subset(
+    path: str,
+    variable: Optional[Union[str, Dict[str, str]]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    time_range: Optional[Tuple[str, str]] = None,
+) -> Union[xr.Dataset, xr.DataArray]:
+    """
+    Cut a narrower request out of a subset previously written by `load_climate_data`.
+
+    The cached file is already in the requested longitude frame, so only the
+    selection is repeated here.
+    """
+    ds = xr.open_dataset(path, chunks={})
+    region = {}
+    if lon_range is not None and lat_range is not None:
+        lon_name, lat_name = _get_coord_names(ds)
+        region.update({
+            lon_name: slice(*lon_range),
+            lat_name: slice(*lat_range)
+        })
+    if time_range is not None:
+        region["time"] = slice(*time_range)
+    if region:
+        ds = ds.sel(**region)
+    if variable:
+        return ds[_select_variable(ds, variable)]
+    return ds
+
+def _coarsen_factor(ds: xr.Dataset, resolution: float) -> int:
+    """
+    Largest block size whose averaged cells are at most `resolution` degrees wide.
+    """
+    lon_name, lat_name = _get_coord_names(ds)
+    step = max(
+        float(np.median(np.abs(np.diff(ds.indexes[name].to_numpy(dtype=float)))))
+        for name in (lat_name, lon_name)
+    )
+    return max(int(resolution / step + 1e-9), 1)
+
+
+class LoadStep(BaseModel):
+    """
+    One lazy operation of a load plan, e.g. `sel` with its label slices.
+    """
+    op: Literal["select_variable", "utc_time", "sel", "sel_lon", "chunk", "coarsen", "reframe_lon", "resample", "transpose", "to_array", "reduce"]
+    args: Dict[str, Any] = Field(default_factory=dict)
+
+
+def build_load_plan(
+    ds: xr.Dataset,
+    variable: Optional[Union[str, Dict[str, str]]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    time_range: Optional[Tuple[str, str]] = None,
+    resample_to: Optional[str] = None,
+    *,
+    auto_chunk: bool = False,
+    time_contiguous: bool = False,
+    reduction: Optional[Union[ReductionSpec, Dict[str, Any]]] = None,
+    resolution: Optional[float] = None,
+) -> List[LoadStep]:
+    """
+    Build the ordered list of lazy operations `load_climate_data` applies to an opened store.
+
+    The variable is selected first, so every later step (and the final write)
+    only ever touches that variable's chunks; the region is selected before
+    resampling, so it runs on the subset. Longitude ranges may cross the
+    antimeridian or prime meridian, e.g. (170, -170) or (350, 10).
+    With `auto_chunk`, the selection is re-chunked along native chunk
+    boundaries (see `auto_chunks`); `ds` must then be opened with native chunks.
+    With `resolution` (degrees) coarser than the grid, cells are block-averaged
+    to the largest integer multiple of the grid spacing not exceeding it.
+    A `reduction` (see `reductions.ReductionSpec`) is applied last.
+    """
+    reduction = as_reduction(reduction)
+    plan = []
+    name = None
+    if variable:
+        name = _select_variable(ds, variable)
+        plan.append(LoadStep(op="select_variable", args={"name": name}))
+    if "time" in ds.coords:
+        plan.append(LoadStep(op="utc_time"))
+
+    lon_name, lat_name = _get_coord_names(ds)
+    region = {}
+    if lat_range is not None and lon_range is not None:
+        region[lat_name] = tuple(lat_range)
+    if time_range is not None:
+        region["time"] = tuple(time_range)
+    if region:
+        plan.append(LoadStep(op="sel", args=region))
+
+    selection = {dim: _index_slice(ds.indexes[dim], bounds) for dim, bounds in region.items()}
+    if lon_range is not None:
+        target_frame, lon_bounds = _normalize_lon_range(lon_range)
+        if lat_range is not None:
+            plan.append(LoadStep(op="sel_lon", args={
+                "name": lon_name, "bounds": lon_bounds, "target_frame": target_frame
+            }))
+            lon_slices = _lon_index_slices(ds.indexes[lon_name], lon_bounds)
+            if lon_slices is not None:
+                selection[lon_name] = lon_slices
+
+    if auto_chunk and name:
+        chunks = auto_chunks(ds[name], selection, time_contiguous=time_contiguous)
+        if chunks:
+            plan.append(LoadStep(op="chunk", args=chunks))
+
+    if resolution is not None:
+        factor = _coarsen_factor(ds, resolution)
+        if factor > 1:
+            plan.append(LoadStep(op="coarsen", args={lat_name: factor, lon_name: factor}))
+
+    if lon_range is not None and lat_range is None:
+        plan.append(LoadStep(op="reframe_lon", args={"target_frame": target_frame}))
+    if resample_to:
+        plan.append(LoadStep(op="resample", args={"time": resample_to}))
+
+    # Core dims first (if they exist), then any remaining dims
+    dims = list(ds[name].dims) if name else list(ds.dims)
+    core_dims = [d for d in ["time", "latitude", "longitude"] if d in dims]
+    other_dims = [d for d in dims if d not in core_dims]
+    plan.append(LoadStep(op="transpose", args={"dims": core_dims + other_dims}))
+
+    if name:
+        plan.append(LoadStep(op="to_array", args={"name": name}))
+    if reduction is not None:
+        plan.append(LoadStep(op="reduce", args={
+            "reduction": reduction.model_dump(), "lon_name": lon_name, "lat_name": lat_name
+        }))
+    return plan
+
+
+def apply_load_plan(ds: xr.Dataset, plan: List[LoadStep]) -> Union[xr.Dataset, xr.DataArray]:
+    """
+    Apply a plan from `build_load_plan`. Every step is lazy for dask-backed data.
+    """
+    for step in plan:
+        if step.op == "select_variable":
+            ds = ds[[step.args["name"]]]
+        elif step.op == "utc_time":
+            ds = ds.assign_coords(time=pd.to_datetime(ds.indexes["time"]).tz_localize("UTC"))
+        elif step.op == "sel":
+            ds = ds.sel(**{dim: slice(*bounds) for dim, bounds in step.args.items()})
+        elif step.op == "sel_lon":
+            ds = _select_lon(ds, step.args["name"], tuple(step.args["bounds"]), step.args["target_frame"])
+        elif step.op == "chunk":
+            ds = ds.chunk(step.args)
+        elif step.op == "coarsen":
+            ds = ds.coarsen(step.args, boundary="trim").mean()
+        elif step.op == "reframe_lon":
+            ds = _coerce_longitudes(ds, step.args["target_frame"])
+        elif step.op == "resample":
+            ds = ds.resample(**step.args).mean()
+        elif step.op == "transpose":
+            ds = ds.transpose(*step.args["dims"])
+        elif step.op == "to_array":
+            ds = ds[step.args["name"]]
+        elif step.op == "reduce":
+            ds = apply_reduction(ds, **step.args)
+    return ds
+
+
+def _save_subset(
+    ds: Union[xr.Dataset, xr.DataArray],
+    output_format: str,
+    path: Optional[str] = None,
+    **resumable_options: Any,
+) -> str:
+    """
+    Write a subset with the writer matching `output_format`, optionally to a fixed path.
+
+    Any `resumable_options` (`progress_callback`, `cancel_token`, ...) select
+    `download_resumable`, which writes Zarr.
+    """
+    if resumable_options:
+        writer = functools.partial(download_resumable, **resumable_options)
+    elif output_format == "zarr":
+        writer = download_to_zarr
+    else:
+        writer = download_to_temp
+    if path is None:
+        return writer(ds)
+    return writer(ds, temp_dir=os.path.dirname(path), filename=os.path.basename(path))
+
 def load_climate_data(
     store: Union[str, s3fs.S3Map, fsspec.mapping.FSMap],
     variable: Optional[Union[str, Dict[str, str]]],
@@ -219,9 +964,31 @@ def load_climate_data(
     resample_to: Optional[str] = None,
     chunks: Optional[Dict[str, int]] = None,
     storage_options: Optional[Dict[str, Any]] = None,
+    output_format: Literal["netcdf", "zarr"] = "netcdf",
+    time_contiguous: bool = False,
+    use_cache: bool = True,
+    prefetch: bool = False,
+    max_concurrency: int = 32,
+    resumable: bool = False,
+    progress_callback: Optional[Callable[[DownloadProgress], None]] = None,
+    cancel_token: Optional[CancelToken] = None,
+    reduction: Optional[Union[ReductionSpec, Dict[str, Any]]] = None,
+    resolution: Optional[float] = None,
+    use_pyramid: bool = True,
 ):
     """
     Load climate data from cloud storage (S3 or GCS) with consistent processing.
+
+    Subsets are cached on disk keyed by the normalized request, so asking for the
+    same store/variable/region/time range/resampling again returns the existing
+    file without touching the remote store. A request nested inside a cached
+    subset (narrower bbox and/or time window) is sliced from that local file.
+    Identical requests made concurrently (e.g. by two dashboard sessions)
+    download once; the later ones wait and reuse the file.
+
+    On a miss, the store is processed as a lazy plan (see `build_load_plan`):
+    select variable, select region, reframe longitudes, resample, reorder dims.
+    Use `sizing.explain_climate_data_plan` to inspect the plan and its cost.
     
     Parameters
     ----------
@@ -230,7 +997,9 @@ def load_climate_data(
     variable : str or dict
         Variable name or CF-style selector (e.g., {"standard_name": "air_temperature"})
     lon_range : tuple of float, optional
-        (min_longitude, max_longitude) in dataset's native frame. If None, keeps all longitudes.
+        (min_longitude, max_longitude) in either the 0-360 or the -180-180 frame; the
+        result uses the frame of the range. Ranges crossing the antimeridian or prime
+        meridian, e.g. (170, -170) or (350, 10), are supported. If None, keeps all longitudes.
     lat_range : tuple of float, optional
         (min_latitude, max_latitude). If None, keeps all latitudes.
     time_range : tuple of str, optional
@@ -238,179 +1007,377 @@ def load_climate_data(
     resample_to : str, optional
         If provided, resample time dimension (e.g., "MS" for month start)
     chunks : dict, optional
-        Dask chunks specification (e.g., {"time": 1024})
+        Dask chunks specification (e.g., {"time": 1024}). If None, chunks are picked
+        automatically as multiples of the store's native Zarr chunks.
     storage_options : dict, optional
         Only used if store is a string URL. Additional storage options for cloud access.
+    output_format : {"netcdf", "zarr"}, default "netcdf"
+        "netcdf" writes a single compressed .nc file. "zarr" streams the subset
+        chunk by chunk to a local .zarr store, for subsets too large to hold in memory.
+    time_contiguous : bool, default False
+        With automatic chunks, keep the whole time axis in one chunk (for time series analysis).
+    use_cache : bool, default True
+        If True, look the request up in the subset cache and store the result there.
+    prefetch : bool, default False
+        If True (URL stores only), first download all chunks the selection needs with
+        concurrent async requests (see `prefetch.prefetch_subset`), then subset and
+        write from the local copy. Worth it for multi-year pulls with many chunks.
+    max_concurrency : int, default 32
+        Maximum number of concurrent requests when prefetching.
+    resumable : bool, default False
+        If True, write a Zarr store block by block along time with a manifest (see
+        `download_resumable`). A failed or cancelled call resumes where it stopped
+        when called again with the same arguments. Implies output_format="zarr".
+    progress_callback : callable, optional
+        With `resumable`, called with a `DownloadProgress` after each block; with
+        `prefetch`, after each object fetched.
+    cancel_token : CancelToken, optional
+        With `resumable`, cancel the download between blocks.
+    reduction : ReductionSpec or dict, optional
+        Reduce the subset before writing it, e.g. {"kind": "spatial_mean"} for a
+        regional mean time series or {"kind": "point", "point": (lon, lat)} for the
+        series at the nearest grid cell. Only the reduced result is saved.
+    resolution : float, optional
+        Coarsest acceptable grid spacing in degrees, e.g. 1.0 for an overview map.
+        Cells are block-averaged to at most this spacing. If None, keeps the store's grid.
+    use_pyramid : bool, default True
+        If a pyramid was built for the store (see `pyramid.build_pyramid`) and
+        `resample_to` matches one of its time aggregations, read the coarsest
+        pyramid level satisfying `resolution` instead of the remote store.
         
     Returns
     -------
-    xr.Dataset
-        Processed dataset with consistent dimensions
+    str
+        Path to the saved subset
     """
-    
-    # Open dataset
-    if isinstance(store, str):
-        # If store is a URL string, use storage_options
-        ds = xr.open_dataset(
-            store,
-            engine="zarr",
-            chunks=chunks,
-            backend_kwargs={"storage_options": storage_options},
-        )
-    else:
-        # If store is already an FSMap object, use it directly
-        ds = xr.open_zarr(store, chunks=chunks)
-    
-    # Get coordinate names
-    lon_name, lat_name = _get_coord_names(ds)
-    
-    # Subset space and time
-    region = {}
-    if lon_range is not None and lat_range is not None:
-        region.update({
-            lon_name: slice(*lon_range),
-            lat_name: slice(*lat_range)
-        })
 
-    if "time" in ds.coords:
-        ds["time"] = pd.to_datetime(ds["time"].values).tz_localize("UTC")
-    
-    if time_range is not None:
-        region["time"] = slice(*time_range)
-    
-    # Only apply selection if we have regions to subset
-    if region:
-        ds = ds.sel(**region)
-    
-    # Handle longitude frame and monotonic latitude
     if lon_range is not None:
-        target_frame = _infer_target_lon_frame(*lon_range)
-        ds = _coerce_longitudes(ds, target_frame)
-    #ds = _ensure_lat_monotonic(ds)
-    
-    # Optional time resampling
-    if resample_to:
-        ds = ds.resample(time=resample_to).mean()
-    
-    # Ensure consistent dimension order
-    # Get available dimensions
-    dims = list(ds.dims)
-    # Core dims we want first (if they exist)
-    core_dims = ["time", "latitude", "longitude"]
-    # Filter out core dims that actually exist
-    core_dims = [d for d in core_dims if d in dims]
-    # Add any remaining dims at the end
-    other_dims = [d for d in dims if d not in core_dims]
-    # Combine for final ordering
-    final_dims = core_dims + other_dims
-    
-    ds = ds.transpose(*final_dims)
+        # e.g. (350, 10) -> (-10, 10), so equivalent requests share cache entries
+        lon_range = _normalize_lon_range(lon_range)[1]
 
-    if variable:
-        var = _select_variable(ds, variable)
-        ds = ds[var]
+    reduction = as_reduction(reduction)
+    resumable_options = {}
+    if resumable:
+        output_format = "zarr"
+        resumable_options = {"progress_callback": progress_callback, "cancel_token": cancel_token}
 
-    path = download_to_temp(
-        ds
+    request = None
+    if use_cache:
+        request = normalize_request(
+            store, variable, lon_range, lat_range, time_range, resample_to, output_format,
+            reduction=reduction.model_dump() if reduction is not None else None,
+            resolution=resolution,
+        )
+    planned_subset = functools.partial(
+        _planned_subset, store, variable, lon_range, lat_range, time_range, resample_to,
+        chunks=chunks, storage_options=storage_options, time_contiguous=time_contiguous,
+        prefetch=prefetch, max_concurrency=max_concurrency, progress_callback=progress_callback,
+        reduction=reduction, resolution=resolution, use_pyramid=use_pyramid,
     )
+
+    if request is None:
+        with planned_subset() as ds:
+            if not resumable:
+                return _save_subset(ds, output_format)
+            # A stable name lets a retry find the staged blocks
+            staging_key = request_key([
+                str(store), str(variable), lon_range, lat_range, time_range, resample_to,
+                reduction.model_dump() if reduction is not None else None, resolution,
+            ])
+            return _save_subset(ds, output_format, os.path.join("temp", f"{staging_key}.zarr"), **resumable_options)
+
+    cache = get_subset_cache()
+    key = request_key(request)
+    # Concurrent identical requests wait for the first one, then find its file
+    with cache.key_lock(key):
+        cached_path = cache.get(key)
+        if cached_path is not None:
+            print(f"Using cached subset {cached_path}")
+            return cached_path
+        superset_path = cache.find_containing(request)
+        if superset_path is not None:
+            print(f"Slicing cached subset {superset_path}")
+            ds = _slice_cached_subset(superset_path, variable, lon_range, lat_range, time_range)
+            if reduction is not None:
+                ds = apply_reduction(ds, reduction, *_get_coord_names(ds))
+            return _save_cached(ds, output_format, cache, key, request, **resumable_options)
+        with planned_subset() as ds:
+            return _save_cached(ds, output_format, cache, key, request, **resumable_options)
+
+
+@contextlib.contextmanager
+def _planned_subset(
+    store: Union[str, s3fs.S3Map, fsspec.mapping.FSMap],
+    variable: Optional[Union[str, Dict[str, str]]],
+    lon_range: Optional[Tuple[float, float]],
+    lat_range: Optional[Tuple[float, float]],
+    time_range: Optional[Tuple[str, str]],
+    resample_to: Optional[str],
+    *,
+    chunks: Optional[Dict[str, int]],
+    storage_options: Optional[Dict[str, Any]],
+    time_contiguous: bool,
+    prefetch: bool,
+    max_concurrency: int,
+    progress_callback: Optional[Callable[[DownloadProgress], None]],
+    reduction: Optional[ReductionSpec],
+    resolution: Optional[float],
+    use_pyramid: bool,
+) -> Iterator[xr.Dataset]:
+    """
+    The lazy subset of a `load_climate_data` call that missed the cache, read
+    from a pyramid level, a prefetched mirror or the store itself.
+
+    The prefetch mirror is only needed until the subset is written, so it is
+    removed when the block exits, also on failure.
+    """
+    # Open dataset (reusing metadata and filesystem from earlier calls)
+    auto_chunk = chunks is None
+    mirror = None
+    level = None
+    if use_pyramid:
+        # Imported here since the pyramid module builds on the helpers above
+        from .pyramid import find_pyramid_level, open_pyramid_level
+        level = find_pyramid_level(store, variable, resample_to, resolution, time_range, reduction=reduction)
+    try:
+        if level is not None:
+            print(f"Reading pyramid level {level[1]['group']} of {level[0]}")
+            ds = open_pyramid_level(*level)
+            if not auto_chunk:
+                ds = ds.chunk(chunks)
+        elif prefetch and isinstance(store, str):
+            # Imported here since the prefetch module builds on the helpers above
+            from .prefetch import prefetch_subset
+            mirror = os.path.join("temp", "prefetch", uuid.uuid4().hex)
+            prefetch_subset(
+                store, variable, lon_range, lat_range, time_range=time_range, local_dir=mirror,
+                storage_options=storage_options, max_concurrency=max_concurrency,
+                progress_callback=progress_callback,
+            )
+            ds = xr.open_zarr(mirror, chunks={} if auto_chunk else chunks)
+        else:
+            ds = open_store_dataset(store, storage_options=storage_options, chunks={} if auto_chunk else chunks)
+
+        plan = build_load_plan(
+            ds, variable, lon_range, lat_range, time_range,
+            # pyramid levels are already aggregated in time
+            resample_to if level is None else None,
+            auto_chunk=auto_chunk, time_contiguous=time_contiguous,
+            # climatology levels are already reduced
+            reduction=None if level is not None and level[1].get("climatology") else reduction,
+            resolution=resolution,
+        )
+        subset = apply_load_plan(ds, plan)
+        if level is not None and level[1].get("climatology"):
+            # calendar month first, as after the climatology reduction
+            subset = subset.transpose("month", ...)
+        yield subset
+    finally:
+        if mirror is not None:
+            shutil.rmtree(mirror, ignore_errors=True)
+
+
+def _save_cached(
+    ds: Union[xr.Dataset, xr.DataArray],
+    output_format: str,
+    cache: SubsetCache,
+    key: str,
+    request: Dict[str, Any],
+    **resumable_options: Any,
+) -> str:
+    """
+    Write `ds` as the cache entry of `key` and register it.
+
+    The file is written under a unique temporary name and moved into place
+    only when complete, so no reader sees it half written. Resumable
+    downloads are staged at the entry's path instead, where a retry finds
+    their blocks (the caller holds the key's lock, so no one else writes there).
+    """
+    path = cache.path_for(key, ".zarr" if output_format == "zarr" else ".nc")
+    if resumable_options:
+        return cache.put(key, _save_subset(ds, output_format, path, **resumable_options), request)
+    tmp_path = cache.path_for(f"{key}.{uuid.uuid4().hex[:8]}.tmp", os.path.splitext(path)[1])
+    try:
+        _save_subset(ds, output_format, tmp_path)
+        if os.path.isdir(path):
+            # A store left over from an earlier process, not in the index
+            _remove_path(path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return cache.put(key, path, request)
+
+
+def load_climate_data_batch(
+    store: Union[str, s3fs.S3Map, fsspec.mapping.FSMap],
+    variables: List[Union[str, Dict[str, str]]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    *,
+    regions: Optional[List[Dict[str, Any]]] = None,
+    time_range: Optional[Tuple[str, str]] = None,
+    resample_to: Optional[str] = None,
+    chunks: Optional[Dict[str, int]] = None,
+    storage_options: Optional[Dict[str, Any]] = None,
+    output_format: Literal["netcdf", "zarr"] = "netcdf",
+    time_contiguous: bool = False,
+):
+    """
+    Load several variables (and optionally several regions) from one store into one file.
+
+    The store is opened once and every variable goes through the same lazy plan
+    as `load_climate_data`. All variables of a region are written by a single
+    dask computation, so their chunks are read concurrently. Batch results are
+    not put in the subset cache.
     
+    Parameters
+    ----------
+    store : str or s3fs.S3Map or fsspec.mapping.FSMap
+        Either a URL string (e.g., "s3://..." or "gs://...") or an existing store object
+    variables : list of str or dict
+        Variable names or CF-style selectors, e.g. ["u_wind", "v_wind"]
+    lon_range, lat_range : tuple of float, optional
+        Region to load when `regions` is not given (see `load_climate_data`)
+    regions : list of dict, optional
+        Several regions, each a dict with "name", "lon_range" and "lat_range".
+        Each region is written to its own group named after the region
+    time_range, resample_to, chunks, storage_options, output_format, time_contiguous
+        As in `load_climate_data`, shared by all variables and regions
+        
+    Returns
+    -------
+    str
+        Path to the saved file. With `regions`, open each region with
+        `xr.open_dataset(path, group=name)`
+    """
+    auto_chunk = chunks is None
+    ds = open_store_dataset(store, storage_options=storage_options, chunks={} if auto_chunk else chunks)
+
+    if regions is None:
+        regions = [{"name": None, "lon_range": lon_range, "lat_range": lat_range}]
+
+    groups = {}
+    for region in regions:
+        arrays = []
+        for variable in variables:
+            plan = build_load_plan(
+                ds, variable, region.get("lon_range"), region.get("lat_range"), time_range, resample_to,
+                auto_chunk=auto_chunk, time_contiguous=time_contiguous,
+            )
+            arrays.append(apply_load_plan(ds, plan))
+        groups[region.get("name")] = xr.merge(arrays)
+
+    writer = download_to_zarr if output_format == "zarr" else download_to_temp
+    filename = _default_filename(next(iter(groups.values())), ".zarr" if output_format == "zarr" else ".nc")
+    path = None
+    for i, (name, subset) in enumerate(groups.items()):
+        path = writer(subset, filename=filename, group=name, mode="w" if i == 0 else "a")
     return path
 
 
+# Stores and variables the agent may request
+StoreName = Literal[
+    "gs://weatherbench2/datasets/era5/1959-2023_01_10-6h-240x121_equiangular_with_poles_conservative.zarr",
+    "gcs://nmfs_odp_nwfsc/CB/mind_the_chl_gap/IO.zarr"
+]
+
+VariableName = Literal[
+    # Variables from ERA5 Atmospheric Surface Analysis
+    "10m_u_component_of_wind",
+    "10m_v_component_of_wind",
+    "2m_dewpoint_temperature",
+    "2m_temperature",
+    "angle_of_sub_gridscale_orography",
+    "anisotropy_of_sub_gridscale_orography",
+    "boundary_layer_height",
+    "geopotential",
+    "geopotential_at_surface",
+    "high_vegetation_cover",
+    "lake_cover",
+    "land_sea_mask",
+    "leaf_area_index_high_vegetation",
+    "leaf_area_index_low_vegetation",
+    "low_vegetation_cover",
+    "mean_sea_level_pressure",
+    "mean_surface_latent_heat_flux",
+    "mean_surface_net_long_wave_radiation_flux",
+    "mean_surface_net_short_wave_radiation_flux",
+    "mean_surface_sensible_heat_flux",
+    "mean_top_downward_short_wave_radiation_flux",
+    "mean_top_net_long_wave_radiation_flux",
+    "mean_top_net_short_wave_radiation_flux",
+    "mean_vertically_integrated_moisture_divergence",
+    "potential_vorticity",
+    "sea_ice_cover",
+    "sea_surface_temperature",
+    "slope_of_sub_gridscale_orography",
+    "snow_depth",
+    "soil_type",
+    "specific_humidity",
+    "standard_deviation_of_filtered_subgrid_orography",
+    "standard_deviation_of_orography",
+    "surface_pressure",
+    "temperature",
+    "total_cloud_cover",
+    "total_column_water",
+    "total_column_water_vapour",
+    "total_precipitation_6hr",
+    "type_of_high_vegetation",
+    "type_of_low_vegetation",
+    "u_component_of_wind",
+    "v_component_of_wind",
+    "vertical_velocity",
+    "volumetric_soil_water_layer_1",
+    "volumetric_soil_water_layer_2",
+    "volumetric_soil_water_layer_3",
+    "volumetric_soil_water_layer_4",
+
+    # Variables from Indian Ocean grid
+    "adt",
+    "air_temp",
+    "mlotst",
+    "sla",
+    "so",
+    "sst",
+    "topo",
+    "u_curr",
+    "v_curr",
+    "ug_curr",
+    "vg_curr",
+    "u_wind",
+    "v_wind",
+    "curr_speed",
+    "curr_dir",
+    "wind_speed",
+    "wind_dir",
+    "CHL_cmes-level3",
+    "CHL_cmes_flags-level3",
+    "CHL_cmes_uncertainty-level3",
+    "CHL_cmes-gapfree",
+    "CHL_cmes_flags-gapfree",
+    "CHL_cmes_uncertainty-gapfree",
+    "CHL_cci",
+    "CHL_cci_uncertainty",
+    "CHL_dinoef",
+    "CHL_dinoef_uncertainty",
+    "CHL_dinoef_flag"
+]
+
+
 class ClimateDataParams(BaseModel):
     """
     A Pydantic model to define and validate parameters for accessing climate data.
     It specifies the data store and the exact variable to be retrieved.
     """
-    store: Literal[
-        "gs://weatherbench2/datasets/era5/1959-2023_01_10-6h-240x121_equiangular_with_poles_conservative.zarr",
-        "gcs://nmfs_odp_nwfsc/CB/mind_the_chl_gap/IO.zarr"
-    ] = Field(
+    store: StoreName = Field(
         ...,
         description="The specific cloud storage path (store) where the dataset is located."
     )
 
-    variable: Literal[
-        # Variables from ERA5 Atmospheric Surface Analysis
-        "10m_u_component_of_wind",
-        "10m_v_component_of_wind",
-        "2m_dewpoint_temperature",
-        "2m_temperature",
-        "angle_of_sub_gridscale_orography",
-        "anisotropy_of_sub_gridscale_orography",
-        "boundary_layer_height",
-        "geopotential",
-        "geopotential_at_surface",
-        "high_vegetation_cover",
-        "lake_cover",
-        "land_sea_mask",
-        "leaf_area_index_high_vegetation",
-        "leaf_area_index_low_vegetation",
-        "low_vegetation_cover",
-        "mean_sea_level_pressure",
-        "mean_surface_latent_heat_flux",
-        "mean_surface_net_long_wave_radiation_flux",
-        "mean_surface_net_short_wave_radiation_flux",
-        "mean_surface_sensible_heat_flux",
-        "mean_top_downward_short_wave_radiation_flux",
-        "mean_top_net_long_wave_radiation_flux",
-        "mean_top_net_short_wave_radiation_flux",
-        "mean_vertically_integrated_moisture_divergence",
-        "potential_vorticity",
-        "sea_ice_cover",
-        "sea_surface_temperature",
-        "slope_of_sub_gridscale_orography",
-        "snow_depth",
-        "soil_type",
-        "specific_humidity",
-        "standard_deviation_of_filtered_subgrid_orography",
-        "standard_deviation_of_orography",
-        "surface_pressure",
-        "temperature",
-        "total_cloud_cover",
-        "total_column_water",
-        "total_column_water_vapour",
-        "total_precipitation_6hr",
-        "type_of_high_vegetation",
-        "type_of_low_vegetation",
-        "u_component_of_wind",
-        "v_component_of_wind",
-        "vertical_velocity",
-        "volumetric_soil_water_layer_1",
-        "volumetric_soil_water_layer_2",
-        "volumetric_soil_water_layer_3",
-        "volumetric_soil_water_layer_4",
-
-        # Variables from Indian Ocean grid
-        "adt",
-        "air_temp",
-        "mlotst",
-        "sla",
-        "so",
-        "sst",
-        "topo",
-        "u_curr",
-        "v_curr",
-        "ug_curr",
-        "vg_curr",
-        "u_wind",
-        "v_wind",
-        "curr_speed",
-        "curr_dir",
-        "wind_speed",
-        "wind_dir",
-        "CHL_cmes-level3",
-        "CHL_cmes_flags-level3",
-        "CHL_cmes_uncertainty-level3",
-        "CHL_cmes-gapfree",
-        "CHL_cmes_flags-gapfree",
-        "CHL_cmes_uncertainty-gapfree",
-        "CHL_cci",
-        "CHL_cci_uncertainty",
-        "CHL_dinoef",
-        "CHL_dinoef_uncertainty",
-        "CHL_dinoef_flag"
-    ] = Field(
+    variable: VariableName = Field(
         ...,
         description="The specific variable name to be selected from the chosen data store."
     )
@@ -427,17 +1394,138 @@ class ClimateDataParams(BaseModel):
         None, description="Resample frequency string for time dimension, e.g., 'MS' for month start"
     )
     chunks: Optional[Dict[str, int]] = Field(
-        None, description="Dask chunks specification, e.g., {'time': 1024}"
+        None, description="Dask chunks specification, e.g., {'time': 1024}. Leave empty to align chunks with the store automatically."
+    )
+    time_contiguous: bool = Field(
+        False, description="Set to True when the analysis is a time series (e.g. at a point or small region) to read the whole time axis per chunk."
     )
     storage_options: Optional[Dict[str, Any]] = Field(
         None, description="Extra options for cloud storage access if 'store' is a URL string"
     )
+    output_format: Literal["netcdf", "zarr"] = Field(
+        "netcdf",
+        description="'netcdf' for a single .nc file, 'zarr' to stream large subsets (e.g. multi-decade pulls) to a local .zarr store. Both open with xarray.open_dataset."
+    )
+    resolution: Optional[float] = Field(
+        None, description="Coarsest acceptable grid spacing in degrees, e.g. 1.0 for overview maps or basin-wide long-term trends. Much smaller downloads; leave empty for full resolution."
+    )
+    reduction: Optional[ReductionSpec] = Field(
+        None,
+        description="Reduce the data before saving when the analysis only needs e.g. a regional mean time series ({'kind': 'spatial_mean'}), the series at one location ({'kind': 'point', 'point': [lon, lat]}), a monthly climatology ({'kind': 'climatology'}) or min/max. Much smaller and faster than loading the full cube."
+    )
+    prefetch: bool = Field(
+        False, description="Set to True for multi-year pulls with many chunks: download them concurrently first, then subset locally."
+    )
+    resumable: bool = Field(
+        False, description="Set to True for very large downloads: write block by block so a failed call resumes when repeated with the same arguments."
+    )
+
+
+def _progress_reporter(min_interval: float = 1.0) -> Callable[[DownloadProgress], None]:
+    """
+    A progress callback that shows download progress in the chat: each update
+    is dispatched as a custom "download_progress" event with a "message"
+    field (see `chat_agent.render_agent_events`), at most every `min_interval`
+    seconds and once at the end.
+
+    Must be created in the tool's run, whose callbacks it reports to; it can
+    then be called from any thread (e.g. the prefetch event loop). Outside an
+    agent run, updates are dropped.
+    """
+    config = ensure_config()
+    last = {"time": 0.0}
+
+    def report(progress: DownloadProgress):
+        now = time.monotonic()
+        if progress.blocks_done < progress.blocks_total and now - last["time"] < min_interval:
+            return
+        last["time"] = now
+        size = f"{progress.bytes_done / 1024**2:.1f}"
+        if progress.bytes_total is not None:
+            size += f"/{progress.bytes_total / 1024**2:.1f}"
+        message = f"Downloaded {progress.blocks_done}/{progress.blocks_total} blocks ({size} MB)"
+        if progress.eta_s is not None and progress.blocks_done < progress.blocks_total:
+            message += f", about {progress.eta_s:.0f} s left"
+        try:
+            dispatch_custom_event("download_progress", {"message": message, **progress.model_dump()}, config=config)
+        except RuntimeError:
+            # Not called from an agent run
+            pass
+    return report
+
+
+def _load_climate_data_tool(**kwargs):
+    return load_climate_data(progress_callback=_progress_reporter(), **kwargs)
 
 
 def create_loader_tool():
     return StructuredTool.from_function(
-        func=load_climate_data,
+        func=_load_climate_data_tool,
+        coroutine=make_async(_load_climate_data_tool),
         name="load_climate_data",
         description="A general use function for downloading datasets from various sources on the internet.",
         args_schema=ClimateDataParams
-    )
\ No newline at end of file
+    )
+
+
+class RegionParams(BaseModel):
+    """
+    A named lon/lat box, used to load several regions in one batch call.
+    """
+    name: str = Field(..., description="Short name of the region, used as group name in the output file")
+    lon_range: Tuple[float, float] = Field(..., description="Longitude range (min_lon, max_lon) in degrees")
+    lat_range: Tuple[confloat(ge=-90, le=90), confloat(ge=-90, le=90)] = Field(
+        ..., description="Latitude range (min_lat, max_lat) in degrees"
+    )
+
+
+class BatchClimateDataParams(BaseModel):
+    """
+    Parameters for loading several variables (and optionally regions) from one data store.
+    """
+    store: StoreName = Field(
+        ...,
+        description="The specific cloud storage path (store) where the dataset is located."
+    )
+    variables: List[VariableName] = Field(
+        ...,
+        description="Variable names to load together from the chosen data store, e.g. ['u_wind', 'v_wind']."
+    )
+    lon_range: Optional[Tuple[float, float]] = Field(
+        None, description="Longitude range (min_lon, max_lon) in degrees"
+    )
+    lat_range: Optional[Tuple[confloat(ge=-90, le=90), confloat(ge=-90, le=90)]] = Field(
+        None, description="Latitude range (min_lat, max_lat) in degrees"
+    )
+    regions: Optional[List[RegionParams]] = Field(
+        None, description="Several named regions instead of lon_range/lat_range. Each is saved as a group: xarray.open_dataset(path, group=name)"
+    )
+    time_range: Optional[Tuple[str, str]] = Field(
+        None, description="Time range as tuple of ISO strings, e.g., ('2000-01-01', '2000-01-31')"
+    )
+    resample_to: Optional[str] = Field(
+        None, description="Resample frequency string for time dimension, e.g., 'MS' for month start"
+    )
+    time_contiguous: bool = Field(
+        False, description="Set to True when the analysis is a time series (e.g. at a point or small region) to read the whole time axis per chunk."
+    )
+    output_format: Literal["netcdf", "zarr"] = Field(
+        "netcdf",
+        description="'netcdf' for a single .nc file, 'zarr' to stream large subsets to a local .zarr store. Both open with xarray.open_dataset."
+    )
+
+
+def _load_climate_data_batch_tool(regions: Optional[List[Any]] = None, **kwargs):
+    if regions is not None:
+        regions = [r.model_dump() if isinstance(r, BaseModel) else dict(r) for r in regions]
+    return load_climate_data_batch(regions=regions, **kwargs)
+
+
+def create_batch_loader_tool():
+    return StructuredTool.from_function(
+        func=_load_climate_data_batch_tool,
+        coroutine=make_async(_load_climate_data_batch_tool),
+        name="load_climate_data_batch",
+        description="Download several variables (e.g. u and v wind components) and optionally several regions from one dataset in a single call, into a single file.",
+        args_schema=BatchClimateDataParams
+    )
@@ -0,0 +1,251 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, Dict, Any, List, Callable
+import asyncio
+import itertools
+import os
+import time
+import fsspec
+from fsspec.asyn import get_loop, sync
+import zarr
+from .loader import (
+    DownloadProgress,
+    _get_coord_names,
+    _index_slice,
+    _lon_index_slices,
+    _normalize_lon_range,
+    _select_variable,
+)
+from .store_pool import get_filesystem, get_mapper, open_store_dataset
+
+# Metadata objects of Zarr v2 and v3 groups/arrays; missing ones are skipped
+_GROUP_METADATA = ["zarr.json", ".zgroup", ".zattrs", ".zmetadata"]
+_ARRAY_METADATA = ["zarr.json", ".zarray", ".zattrs"]
+
+
+def _chunk_indices(selection: List[slice], chunk_size: int) -> List[int]:
+    """
+    Indices of the chunks intersected by a list of contiguous integer selections.
+    """
+    indices = []
+    for sl in selection:
+        if sl.stop > sl.start:
+            indices.extend(range(sl.start // chunk_size, (sl.stop - 1) // chunk_size + 1))
+    return sorted(set(indices))
+
+
+def _selection_chunk_keys(
+    ds,
+    arr: zarr.Array,
+    name: str,
+    lon_range: Optional[Tuple[float, float]],
+    lat_range: Optional[Tuple[float, float]],
+    time_range: Optional[Tuple[str, str]],
+) -> List[str]:
+    """
+    Store keys of the chunks of `name` that a `load_climate_data` selection reads.
+    """
+    da = ds[name]
+    lon_name, lat_name = _get_coord_names(ds)
+    selection = {dim: [slice(0, size)] for dim, size in zip(da.dims, da.shape)}
+    if lon_range is not None and lat_range is not None:
+        selection[lat_name] = [_index_slice(ds.indexes[lat_name], lat_range)]
+        lon_bounds = _normalize_lon_range(lon_range)[1]
+        selection[lon_name] = _lon_index_slices(ds.indexes[lon_name], lon_bounds) or selection[lon_name]
+    if time_range is not None and "time" in selection:
+        selection["time"] = [_index_slice(ds.indexes["time"], time_range)]
+
+    per_dim = [_chunk_indices(selection[dim], size) for dim, size in zip(da.dims, arr.chunks)]
+    return [
+        f"{arr.path}/{arr.metadata.encode_chunk_key(coords)}"
+        for coords in itertools.product(*per_dim)
+    ]
+
+
+async def _fetch(
+    fs: fsspec.AbstractFileSystem,
+    path: str,
+    semaphore: asyncio.Semaphore,
+    retries: int,
+    backoff: float,
+) -> Optional[bytes]:
+    """
+    Read one object with bounded concurrency, retrying with exponential backoff.
+    Returns None for objects that do not exist (e.g. chunks never written).
+    """
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                if fs.async_impl:
+                    return await fs._cat_file(path)
+                return await asyncio.to_thread(fs.cat_file, path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * 2**attempt)
+
+
+async def _prefetch_keys(
+    fs: fsspec.AbstractFileSystem,
+    root: str,
+    keys: List[str],
+    local_dir: str,
+    max_concurrency: int,
+    retries: int,
+    backoff: float,
+    on_chunk: Optional[Callable[[str, int], None]],
+) -> int:
+    """
+    Copy `keys` from `root` on `fs` to `local_dir`, writing each object as it arrives.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _one(key: str) -> int:
+        data = await _fetch(fs, f"{root}/{key}", semaphore, retries, backoff)
+        if data is None:
+            return 0
+        target = os.path.join(local_dir, *key.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        if on_chunk is not None:
+            on_chunk(key, len(data))
+        return len(data)
+
+    sizes = await asyncio.gather(*(_one(key) for key in keys))
+    return sum(sizes)
+
+
+def _progress_on_chunk(
+    local_dir: str,
+    n_objects: int,
+    started: float,
+    progress_callback: Callable[[DownloadProgress], None],
+    on_chunk: Optional[Callable[[str, int], None]],
+) -> Callable[[str, int], None]:
+    """
+    An `on_chunk` callback that also reports a `DownloadProgress` per object written.
+    Objects count as blocks; the total size is not known before they are fetched.
+    """
+    done = {"objects": 0, "bytes": 0}
+
+    def _on_chunk(key: str, n_bytes: int):
+        if on_chunk is not None:
+            on_chunk(key, n_bytes)
+        done["objects"] += 1
+        done["bytes"] += n_bytes
+        elapsed = time.monotonic() - started
+        progress_callback(DownloadProgress(
+            path=local_dir,
+            blocks_done=done["objects"],
+            blocks_total=n_objects,
+            bytes_done=done["bytes"],
+            elapsed_s=elapsed,
+            eta_s=elapsed / done["objects"] * max(n_objects - done["objects"], 0),
+        ))
+    return _on_chunk
+
+
+def prefetch_subset(
+    store: str,
+    variable: Union[str, Dict[str, str]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    *,
+    time_range: Optional[Tuple[str, str]] = None,
+    local_dir: str = os.path.join("temp", "prefetch"),
+    storage_options: Optional[Dict[str, Any]] = None,
+    filesystem: Optional[fsspec.AbstractFileSystem] = None,
+    max_concurrency: int = 32,
+    retries: int = 3,
+    backoff: float = 0.5,
+    on_chunk: Optional[Callable[[str, int], None]] = None,
+    progress_callback: Optional[Callable[[DownloadProgress], None]] = None,
+) -> str:
+    """
+    Download the chunks a `load_climate_data` selection needs into a local Zarr mirror.
+
+    All chunk objects of the variable intersecting the selection, plus the
+    store/array metadata and the coordinate arrays, are fetched with up to
+    `max_concurrency` concurrent requests (native async range requests on
+    gcsfs/s3fs, a thread per request on synchronous filesystems), with
+    exponential backoff on transient errors. The mirror can then be opened
+    and subset like the remote store, without further network access.
+
+    Parameters
+    ----------
+    store : str
+        URL of the remote Zarr store
+    variable : str or dict
+        Variable name or CF-style selector
+    lon_range, lat_range, time_range : tuple, optional
+        Same selection as `load_climate_data`
+    local_dir : str
+        Directory of the local mirror
+    storage_options : dict, optional
+        Options for the remote filesystem
+    filesystem : fsspec.AbstractFileSystem, optional
+        Filesystem to read from instead of the pooled one for `store`
+        (e.g. a memory filesystem with injected latency in tests)
+    max_concurrency : int, default 32
+        Maximum number of requests in flight
+    retries : int, default 3
+        Retries per object before giving up
+    backoff : float, default 0.5
+        Initial backoff in seconds, doubled on every retry
+    on_chunk : callable, optional
+        Called as `on_chunk(key, n_bytes)` whenever an object has been written
+    progress_callback : callable, optional
+        Called with a `DownloadProgress` whenever an object has been written
+
+    Returns
+    -------
+    str
+        Path to the local mirror
+    """
+    if filesystem is None:
+        fs, root = get_filesystem(store, storage_options)
+        mapper = get_mapper(store, storage_options)
+    else:
+        fs, root = filesystem, filesystem._strip_protocol(store)
+        mapper = filesystem.get_mapper(root)
+    root = root.rstrip("/")
+
+    ds = open_store_dataset(mapper if filesystem is not None else store, storage_options=storage_options, chunks={})
+    name = _select_variable(ds, variable)
+    group = zarr.open_group(mapper, mode="r")
+
+    keys = list(_GROUP_METADATA)
+    for array_name in [name, *ds[name].dims]:
+        if array_name not in group:
+            continue
+        keys.extend(f"{array_name}/{meta}" for meta in _ARRAY_METADATA)
+    keys.extend(_selection_chunk_keys(ds, group[name], name, lon_range, lat_range, time_range))
+    for dim in ds[name].dims:
+        if dim not in group:
+            continue
+        coord = group[dim]
+        keys.extend(
+            f"{coord.path}/{coord.metadata.encode_chunk_key(coords)}"
+            for coords in itertools.product(*(range(n) for n in coord.cdata_shape))
+        )
+
+    started = time.monotonic()
+    if progress_callback is not None:
+        on_chunk = _progress_on_chunk(local_dir, len(keys), started, progress_callback, on_chunk)
+    os.makedirs(local_dir, exist_ok=True)
+    loop = fs.loop if fs.async_impl else get_loop()
+    n_bytes = sync(
+        loop,
+        _prefetch_keys,
+        fs, root, keys, local_dir, max_concurrency, retries, backoff, on_chunk,
+    )
+    if progress_callback is not None:
+        # Objects missing from the store are never written, so report completion explicitly
+        progress_callback(DownloadProgress(
+            path=local_dir, blocks_done=len(keys), blocks_total=len(keys), bytes_done=n_bytes,
+            bytes_total=n_bytes, elapsed_s=time.monotonic() - started, eta_s=0.0,
+        ))
+    print(f"Prefetched {len(keys)} objects ({n_bytes / 1024**2:.1f} MB) to {local_dir}")
+    return local_dir
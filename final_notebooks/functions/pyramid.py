@@ -0,0 +1,286 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, Dict, Any, List
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import xarray as xr
+from pandas.tseries.frequencies import to_offset
+from .cache import _store_id, request_key
+from .loader import _get_coord_names, _select_variable, _strip_time_zone, _uniform_chunks, _zarr_compressor
+from .reductions import ReductionSpec, as_reduction, time_groups
+from .store_pool import open_store_dataset
+
+DEFAULT_PYRAMID_DIR = os.path.join("temp", "pyramids")
+MANIFEST_NAME = "pyramid.json"
+
+# Monthly and meteorological-season (DJF, MAM, JJA, SON) means
+DEFAULT_TIME_AGGREGATIONS = ("MS", "QS-DEC")
+DEFAULT_FACTORS = (1, 2, 4, 8)
+
+
+def pyramid_path(store: str, pyramid_dir: str = DEFAULT_PYRAMID_DIR) -> str:
+    """
+    Local directory of the pyramid built for `store`.
+    """
+    return os.path.join(pyramid_dir, f"{request_key({'store': _store_id(store)})}.zarr")
+
+
+def _grid_step(index: pd.Index) -> float:
+    return float(np.median(np.abs(np.diff(np.asarray(index, dtype=float)))))
+
+
+def _level_group(freq: str, factor: int) -> str:
+    return f"{freq}/{factor}x"
+
+
+def _same_frequency(a: str, b: str) -> bool:
+    try:
+        return to_offset(a) == to_offset(b)
+    except ValueError:
+        return False
+
+
+def _write_level(ds: xr.Dataset, root: str, group: str, codec: str, clevel: int) -> None:
+    # Resampling leaves one chunk per period; store a decade of months per chunk instead
+    for dim in ("time", "month"):
+        if dim in ds.dims:
+            ds = ds.chunk({dim: min(ds.sizes[dim], 120)})
+    ds = _uniform_chunks(_strip_time_zone(ds))
+    for var in ds.variables.values():
+        var.encoding = {}
+    compressor = _zarr_compressor(codec, clevel)
+    encoding = {var: {"compressors": [compressor]} for var in ds.data_vars}
+    ds.to_zarr(root, group=group, mode="w", encoding=encoding, consolidated=False)
+
+
+def build_pyramid(
+    store: str,
+    variables: Optional[List[Union[str, Dict[str, str]]]] = None,
+    *,
+    time_range: Optional[Tuple[str, str]] = None,
+    time_aggregations: Tuple[str, ...] = DEFAULT_TIME_AGGREGATIONS,
+    factors: Tuple[int, ...] = DEFAULT_FACTORS,
+    pyramid_dir: str = DEFAULT_PYRAMID_DIR,
+    storage_options: Optional[Dict[str, Any]] = None,
+    codec: str = "zstd",
+    clevel: int = 3,
+) -> str:
+    """
+    Materialize time aggregates and coarsened spatial levels of a store into a local Zarr pyramid.
+
+    For every frequency in `time_aggregations` the daily data is resampled once
+    (full resolution, level "1x"); each coarser level is then block-averaged
+    from the previous one on disk (2x from 1x, 4x from 2x, ...), so the remote
+    store is read once per frequency. A monthly climatology (mean of the daily
+    data per calendar month, as `load_climate_data` computes it for
+    `reduction={"kind": "climatology"}`) is stored for every level under
+    "clim-month/<factor>x". The levels and their grid spacing are listed in
+    `pyramid.json` at the pyramid root, which `find_pyramid_level` reads.
+
+    This is an offline job, e.g. `python -m functions.pyramid <store> --variables sst`.
+
+    Parameters
+    ----------
+    store : str
+        URL of the source Zarr store
+    variables : list, optional
+        Variables to include (names or CF-style selectors). If None, every
+        variable with time, latitude and longitude dimensions
+    time_range : tuple of str, optional
+        Restrict the pyramid to this period
+    time_aggregations : tuple of str
+        Pandas frequencies to aggregate to, e.g. "MS" (monthly), "QS-DEC" (seasonal)
+    factors : tuple of int
+        Spatial coarsening factors, each a multiple of the previous one
+    pyramid_dir : str
+        Directory holding the pyramids of all stores
+    storage_options : dict, optional
+        Options for the remote filesystem
+    codec, clevel
+        Compression, as in `loader.download_to_zarr`
+
+    Returns
+    -------
+    str
+        Path to the pyramid
+    """
+    ds = open_store_dataset(store, storage_options=storage_options, chunks={})
+    lon_name, lat_name = _get_coord_names(ds)
+    if variables is None:
+        names = [
+            name for name, da in ds.data_vars.items()
+            if {"time", lat_name, lon_name} <= set(da.dims)
+        ]
+    else:
+        names = [_select_variable(ds, var) for var in variables]
+    ds = ds[names]
+    if time_range is not None:
+        ds = ds.sel(time=slice(*time_range))
+    factors = sorted(set(factors) | {1})
+
+    root = pyramid_path(store, pyramid_dir)
+    shutil.rmtree(root, ignore_errors=True)
+    lat_step = _grid_step(ds.indexes[lat_name])
+    lon_step = _grid_step(ds.indexes[lon_name])
+
+    aggregations = [*time_aggregations, "clim-month"]
+
+    levels = []
+    for freq in aggregations:
+        previous = 1
+        for factor in factors:
+            group = _level_group(freq, factor)
+            if factor == 1:
+                if freq == "clim-month":
+                    # From the daily data, not the monthly level: a mean of monthly
+                    # means weights the days of leap-year Februaries differently
+                    level = ds.groupby(time_groups(ds, "month")).mean()
+                else:
+                    level = ds.resample(time=freq).mean()
+            else:
+                if factor % previous:
+                    raise ValueError(f"Coarsening factors must be multiples of each other, got {factors}")
+                finer = xr.open_zarr(root, group=_level_group(freq, previous), consolidated=False)
+                step = factor // previous
+                level = finer.coarsen({lat_name: step, lon_name: step}, boundary="trim").mean()
+            print(f"Writing pyramid level {group}")
+            _write_level(level, root, group, codec, clevel)
+            levels.append({
+                "group": group,
+                "resample_to": None if freq == "clim-month" else freq,
+                "climatology": freq == "clim-month",
+                "factor": factor,
+                "resolution": max(lat_step, lon_step) * factor,
+            })
+            previous = factor
+
+    manifest = {
+        "store": _store_id(store),
+        "variables": names,
+        "time_range": [str(ds.indexes["time"][0]), str(ds.indexes["time"][-1])],
+        # Built from the whole record, so it can also answer requests without time_range
+        "complete": time_range is None,
+        "resolution": max(lat_step, lon_step),
+        "levels": levels,
+        "built": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(root, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return root
+
+
+def read_pyramid_manifest(store: str, pyramid_dir: str = DEFAULT_PYRAMID_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Manifest of the pyramid built for `store`, or None if there is none.
+    """
+    try:
+        with open(os.path.join(pyramid_path(store, pyramid_dir), MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _covers_whole_periods(time_range: Optional[Tuple[str, str]], freq: str, built_range: List[str]) -> bool:
+    """
+    Whether a time range starts and ends on period boundaries of `freq` within the pyramid.
+
+    Otherwise the edge periods of the request are partial and their means
+    differ from the pre-aggregated ones.
+    """
+    if time_range is None:
+        return True
+    offset = to_offset(freq)
+    start, end = pd.Timestamp(time_range[0]), pd.Timestamp(time_range[1])
+    if start < pd.Timestamp(built_range[0]).floor("D") or end > pd.Timestamp(built_range[1]):
+        return False
+    return offset.is_on_offset(start) and offset.is_on_offset(end + pd.Timedelta(days=1))
+
+
+def find_pyramid_level(
+    store: str,
+    variable: Union[str, Dict[str, str]],
+    resample_to: Optional[str],
+    resolution: Optional[float] = None,
+    time_range: Optional[Tuple[str, str]] = None,
+    pyramid_dir: str = DEFAULT_PYRAMID_DIR,
+    reduction: Optional[Union[ReductionSpec, Dict[str, Any]]] = None,
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Pick the coarsest pyramid level that can answer a request.
+
+    A level qualifies if it holds the variable and either was aggregated to
+    `resample_to` with the request covering whole periods, or is a
+    climatology level and the request is a monthly climatology
+    (`reduction={"kind": "climatology"}`, no `resample_to`) of the whole record.
+
+    With `resolution`, the loader block-averages the source grid by
+    `int(resolution / source spacing)`; only levels whose factor divides it
+    qualify, so the loader can coarsen the rest of the way to the same grid
+    spacing (e.g. 1.5 degrees on a 0.25 degree source is the 2x level,
+    coarsened 3x). Without it only the full-resolution level qualifies.
+
+    Returns
+    -------
+    tuple or None
+        (pyramid path, level entry of the manifest), or None if no level qualifies
+    """
+    if not isinstance(store, str):
+        return None
+    reduction = as_reduction(reduction)
+    climatology = reduction is not None and reduction.kind == "climatology"
+    if climatology:
+        # The climatology levels average the whole record by calendar month
+        if resample_to or reduction.groupby != "month" or time_range is not None:
+            return None
+    elif not resample_to:
+        return None
+    manifest = read_pyramid_manifest(store, pyramid_dir)
+    if manifest is None:
+        return None
+    if isinstance(variable, str) and variable not in manifest["variables"]:
+        return None
+    if time_range is None and not manifest.get("complete"):
+        return None
+
+    factor = 1
+    if resolution is not None:
+        # Same factor as loader._coarsen_factor on the source grid
+        factor = max(int(resolution / manifest["resolution"] + 1e-9), 1)
+    candidates = [
+        level for level in manifest["levels"]
+        if (
+            level.get("climatology") if climatology
+            else level["resample_to"] and _same_frequency(level["resample_to"], resample_to)
+        )
+        and factor % level["factor"] == 0
+    ]
+    if not candidates:
+        return None
+    if not climatology and not _covers_whole_periods(time_range, candidates[0]["resample_to"], manifest["time_range"]):
+        return None
+    return pyramid_path(store, pyramid_dir), max(candidates, key=lambda level: level["factor"])
+
+
+def open_pyramid_level(path: str, level: Dict[str, Any]) -> xr.Dataset:
+    """
+    Open one level of a pyramid lazily, with its stored chunks.
+    """
+    return xr.open_zarr(path, group=level["group"], consolidated=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a local Zarr pyramid of time aggregates and coarsened levels.")
+    parser.add_argument("store", help="URL of the source Zarr store")
+    parser.add_argument("--variables", nargs="*", default=None, help="Variables to include (default: all gridded ones)")
+    parser.add_argument("--time-range", nargs=2, default=None, metavar=("START", "END"))
+    parser.add_argument("--factors", nargs="*", type=int, default=list(DEFAULT_FACTORS))
+    parser.add_argument("--pyramid-dir", default=DEFAULT_PYRAMID_DIR)
+    args = parser.parse_args()
+    print(build_pyramid(
+        args.store, args.variables, time_range=args.time_range,
+        factors=tuple(args.factors), pyramid_dir=args.pyramid_dir,
+    ))
@@ -1,13 +1,76 @@
 from langchain_experimental.utilities import PythonREPL
 from langchain.tools import Tool
+import contextlib
+import io
+import sys
+import threading
+from .workers import make_async
+
+
+class _ThreadStdout:
+    """
+    `sys.stdout` replacement that sends what a thread prints to the buffer the
+    thread registered (see `_captured_stdout`), and everything else to the
+    original stream. Output of threads started by the REPL code itself is not
+    captured.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, "buffer", None) or self.fallback
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+_INSTALL_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _captured_stdout():
+    """
+    Collect what the current thread prints, while other threads (e.g. other
+    sessions' REPL runs on the worker pool) keep printing to their own buffers.
+    """
+    with _INSTALL_LOCK:
+        if not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+        stdout = sys.stdout
+    buffer = io.StringIO()
+    stdout.local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        stdout.local.buffer = None
+
 
 def create_python_repl():
     python_repl = PythonREPL()
-    
+
+    def run(command: str) -> str:
+        # Like PythonREPL.run, but capturing stdout per thread instead of swapping
+        # the process-wide sys.stdout, so concurrent sessions' runs do not wait for each other
+        with _captured_stdout() as output:
+            try:
+                exec(PythonREPL.sanitize_input(command), python_repl.globals, python_repl.locals)
+            except Exception as e:
+                return repr(e)
+        return output.getvalue()
+
     
     python_repl_tool = Tool(
         name="python_repl",
-        func=python_repl.run,
+        func=run,
+        coroutine=make_async(run),
         description="""
             You receive:
                 - A file path to the downloaded dataset. This path comes from the load_climate_data tool. Do not use any other path.
@@ -0,0 +1,109 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, Dict, Any, Literal
+import numpy as np
+import xarray as xr
+from pydantic import BaseModel, Field, confloat, model_validator
+
+
+class ReductionSpec(BaseModel):
+    """
+    A reduction `load_climate_data` applies before writing, so only the reduced result is saved.
+    """
+    kind: Literal["spatial_mean", "point", "climatology", "min", "max"] = Field(
+        ...,
+        description=(
+            "'spatial_mean': area-weighted mean over the region, one value per time step. "
+            "'point': time series at the grid cell nearest to `point`. "
+            "'climatology': mean per month/season/day of year over the time range. "
+            "'min'/'max': minimum/maximum over space (per time step) or over time (per grid cell), see `over`."
+        )
+    )
+    point: Optional[Tuple[float, confloat(ge=-90, le=90)]] = Field(
+        None, description="(lon, lat) of the point to extract, required for kind='point'"
+    )
+    groupby: Literal["month", "season", "dayofyear"] = Field(
+        "month", description="Grouping of the climatology"
+    )
+    over: Literal["space", "time"] = Field(
+        "space", description="Dimension(s) reduced by 'min'/'max'"
+    )
+
+    @model_validator(mode="after")
+    def _check_point(self) -> "ReductionSpec":
+        if self.kind == "point" and self.point is None:
+            raise ValueError("kind='point' requires `point=(lon, lat)`")
+        return self
+
+
+def as_reduction(reduction: Optional[Union[ReductionSpec, Dict[str, Any]]]) -> Optional[ReductionSpec]:
+    """
+    Accept a ReductionSpec, its dict form (e.g. from a tool call) or None.
+    """
+    if reduction is None:
+        return None
+    return ReductionSpec.model_validate(reduction)
+
+
+def _point_lon(lon: float, grid_lon: xr.DataArray) -> float:
+    """
+    Express a longitude in the frame (0-360 or -180-180) of the grid.
+    """
+    if float(grid_lon.max()) > 180:
+        return lon % 360
+    return ((lon + 180) % 360) - 180
+
+
+def area_weights(lat: xr.DataArray) -> xr.DataArray:
+    """
+    Weights proportional to grid cell area on a regular lat/lon grid.
+    """
+    return np.cos(np.deg2rad(lat)).clip(min=0)
+
+
+_SEASONS = np.array(["DJF", "DJF", "MAM", "MAM", "MAM", "JJA", "JJA", "JJA", "SON", "SON", "SON", "DJF"])
+
+
+def time_groups(obj: Union[xr.Dataset, xr.DataArray], groupby: str) -> xr.DataArray:
+    """
+    Month, season or day-of-year labels of the time axis.
+
+    Computed from the pandas index rather than `obj["time.month"]`, which does
+    not support the UTC-aware times the loader produces.
+    """
+    times = obj.indexes["time"]
+    if groupby == "season":
+        labels = _SEASONS[times.month - 1]
+    else:
+        labels = np.asarray(getattr(times, groupby))
+    return xr.DataArray(labels, dims="time", coords={"time": obj["time"]}, name=groupby)
+
+
+def apply_reduction(
+    obj: Union[xr.Dataset, xr.DataArray],
+    reduction: Union[ReductionSpec, Dict[str, Any]],
+    lon_name: str,
+    lat_name: str,
+) -> Union[xr.Dataset, xr.DataArray]:
+    """
+    Reduce a lazily loaded subset according to `reduction`.
+
+    Everything stays lazy for dask-backed data, so only the chunks the reduction
+    needs are read when the result is written. Climatologies use xarray's
+    groupby, which dispatches to flox when it is installed.
+    """
+    spec = as_reduction(reduction)
+    space = [lat_name, lon_name]
+    if spec.kind == "spatial_mean":
+        return obj.weighted(area_weights(obj[lat_name])).mean(space, keep_attrs=True)
+    if spec.kind == "point":
+        lon, lat = spec.point
+        return obj.sel(
+            {lon_name: _point_lon(lon, obj[lon_name]), lat_name: lat},
+            method="nearest",
+        )
+    if spec.kind == "climatology":
+        return obj.groupby(time_groups(obj, spec.groupby)).mean(keep_attrs=True)
+    dims = space if spec.over == "space" else ["time"]
+    if spec.kind == "min":
+        return obj.min(dims, keep_attrs=True)
+    return obj.max(dims, keep_attrs=True)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from typing import Optional, Dict, List, Tuple
+import json
+import os
+import numpy as np
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the `k` largest scores along the last axis, best first.
+    """
+    k = min(k, scores.shape[-1])
+    if k < scores.shape[-1]:
+        idx = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        idx = np.broadcast_to(np.arange(k), scores.shape[:-1] + (k,))
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(idx, order, axis=-1)
+
+
+class NumpyVectorStore:
+    """
+    Brute-force vector store for small corpora such as the code examples.
+
+    The normalized embeddings are rows of one contiguous float32 matrix, so a
+    query is a single matrix-vector product (a batch of queries, one
+    matrix-matrix product) and scores are cosine similarities, higher is
+    better. Saved as `<path>.npy`, memory-mapped on load, plus a
+    `<path>.json` sidecar with the ids, documents and fingerprint.
+    Implements the `similarity_search*` methods the adviser uses on Chroma.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        documents: List[Document],
+        embedding_function: Embeddings,
+        fingerprint: Optional[str] = None,
+    ):
+        if len(vectors) != len(ids) or len(ids) != len(documents):
+            raise ValueError("vectors, ids and documents must have the same length")
+        self.vectors = vectors
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.embedding_function = embedding_function
+        self.fingerprint = fingerprint
+        self.model = getattr(embedding_function, "model_id", None)
+        # Documents embedded when this store was built (see `from_documents`)
+        self.n_embedded = 0
+
+    @classmethod
+    def from_documents(
+        cls,
+        docs: Dict[str, Document],
+        embedding_function: Embeddings,
+        fingerprint: Optional[str] = None,
+        reuse: Optional["NumpyVectorStore"] = None,
+    ) -> "NumpyVectorStore":
+        """
+        Embed `docs` ({id: Document}). Vectors of ids already in `reuse`
+        (a store built with the same embeddings) are copied, not re-embedded.
+        """
+        ids = list(docs)
+        known = {doc_id: i for i, doc_id in enumerate(reuse.ids)} if reuse is not None else {}
+        new_ids = [doc_id for doc_id in ids if doc_id not in known]
+        embedded = {}
+        if new_ids:
+            vectors = embedding_function.embed_documents([docs[doc_id].page_content for doc_id in new_ids])
+            embedded = dict(zip(new_ids, _normalize(np.asarray(vectors))))
+        dim = len(next(iter(embedded.values()))) if embedded else (reuse.vectors.shape[1] if ids else 0)
+        matrix = np.empty((len(ids), dim), dtype=np.float32)
+        for row, doc_id in enumerate(ids):
+            matrix[row] = embedded[doc_id] if doc_id in embedded else reuse.vectors[known[doc_id]]
+        store = cls(matrix, ids, [docs[doc_id] for doc_id in ids], embedding_function, fingerprint)
+        store.n_embedded = len(new_ids)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    ### persistence
+
+    def save(self, path: str):
+        """
+        Write `<path>.npy` and `<path>.json` (each replaced atomically).
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp.npy", "wb") as f:
+            np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        os.replace(path + ".tmp.npy", path + ".npy")
+        sidecar = {
+            "model": getattr(self.embedding_function, "model_id", None),
+            "fingerprint": self.fingerprint,
+            "ids": self.ids,
+            "documents": [{"page_content": d.page_content, "metadata": d.metadata} for d in self.documents],
+        }
+        with open(path + ".tmp.json", "w", encoding="utf-8") as f:
+            json.dump(sidecar, f)
+        os.replace(path + ".tmp.json", path + ".json")
+
+    @classmethod
+    def load(cls, path: str, embedding_function: Embeddings, mmap: bool = True) -> Optional["NumpyVectorStore"]:
+        """
+        Open a saved store, or None if there is none (or it is incomplete).
+        """
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+            vectors = np.load(path + ".npy", mmap_mode="r" if mmap else None)
+        except (OSError, ValueError):
+            return None
+        documents = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in sidecar["documents"]]
+        if len(vectors) != len(documents):
+            return None
+        store = cls(vectors, sidecar["ids"], documents, embedding_function, sidecar.get("fingerprint"))
+        # Vectors can only be reused with the embeddings they were made with
+        store.model = sidecar.get("model")
+        return store
+
+    ### search
+
+    def search_by_vectors(self, queries: np.ndarray, k: int = 4) -> List[List[Tuple[Document, float]]]:
+        """
+        Top-`k` documents and cosine similarities for each row of `queries`.
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        if not len(self):
+            return [[] for _ in queries]
+        scores = queries @ self.vectors.T
+        best = _top_k(scores, k)
+        return [
+            [(self.documents[j], float(scores[i, j])) for j in row]
+            for i, row in enumerate(best)
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        return self.search_by_vectors(np.asarray(self.embedding_function.embed_query(query)), k)[0]
+
+    # Scores already are similarities, higher is better
+    similarity_search_with_relevance_scores = similarity_search_with_score
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def batch_similarity_search_with_score(self, queries: List[str], k: int = 4) -> List[List[Tuple[Document, float]]]:
+        """
+        Search several queries at once: one embedding batch and one matrix product.
+        """
+        return self.search_by_vectors(np.asarray(self.embedding_function.embed_documents(queries)), k)
@@ -0,0 +1,301 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, Dict, Any
+import math
+import numpy as np
+import pandas as pd
+import xarray as xr
+import zarr
+from langchain.tools import StructuredTool
+from .loader import (
+    ClimateDataParams,
+    build_load_plan,
+    _coarsen_factor,
+    _get_coord_names,
+    _index_slice,
+    _lon_index_slices,
+    _normalize_lon_range,
+    _select_variable,
+)
+from .reductions import ReductionSpec, as_reduction, time_groups
+from .store_pool import get_mapper, open_store_dataset
+from .workers import make_async
+
+
+def _chunks_touched(selection: slice, chunk_size: int) -> int:
+    """
+    Number of chunks of size `chunk_size` intersected by a contiguous integer selection.
+    """
+    if selection.stop <= selection.start:
+        return 0
+    return (selection.stop - 1) // chunk_size - selection.start // chunk_size + 1
+
+
+# Chunk objects whose stored size is sampled for the compression ratio
+COMPRESSION_SAMPLE_CHUNKS = 8
+
+
+def _stored_compression_ratio(
+    store: Any,
+    name: str,
+    storage_options: Optional[Dict[str, Any]],
+    n_samples: int = COMPRESSION_SAMPLE_CHUNKS,
+) -> Optional[float]:
+    """
+    Ratio of uncompressed to stored bytes of an array, from a sample of its chunks.
+
+    Reads the sizes of up to `n_samples` chunk objects spread evenly over the
+    chunk grid (one small request each on cloud stores), instead of listing
+    every chunk of the array. Chunks that were never written are skipped.
+    Returns None if no sampled chunk exists or the store cannot be read.
+    """
+    try:
+        if isinstance(store, str):
+            store = get_mapper(store, storage_options)
+        arr = zarr.open_group(store, mode="r")[name]
+        grid = [math.ceil(size / chunk) for size, chunk in zip(arr.shape, arr.chunks)]
+        n_chunks = math.prod(grid)
+        sampled = np.unique(np.linspace(0, n_chunks - 1, min(n_samples, n_chunks)).astype(int))
+        stored = []
+        for index in sampled:
+            key = arr.metadata.encode_chunk_key(tuple(int(i) for i in np.unravel_index(index, grid)))
+            try:
+                stored.append(store.fs.size(f"{store.root}/{name}/{key}"))
+            except FileNotFoundError:
+                continue
+    except Exception:
+        return None
+    if not stored or not sum(stored):
+        return None
+    chunk_bytes = math.prod(arr.chunks) * arr.dtype.itemsize
+    return len(stored) * chunk_bytes / sum(stored)
+
+
+def _output_shape(
+    ds: xr.Dataset,
+    da: xr.DataArray,
+    shape: Dict[str, int],
+    selection: Dict[str, list],
+    resample_to: Optional[str],
+    reduction: Optional[ReductionSpec],
+    resolution: Optional[float],
+) -> Dict[str, int]:
+    """
+    Shape of the written output: the selection after resampling, coarsening and reduction.
+    """
+    lon_name, lat_name = _get_coord_names(ds)
+    output = dict(shape)
+    times = None
+    if "time" in da.dims and shape["time"]:
+        times = ds.indexes["time"][selection["time"][0]]
+    if resample_to and times is not None:
+        times = pd.Series(0, index=times).resample(resample_to).size().index
+        output["time"] = len(times)
+    if resolution is not None:
+        factor = _coarsen_factor(ds, resolution)
+        for dim in (lat_name, lon_name):
+            if dim in output:
+                output[dim] //= factor
+    if reduction is None:
+        return output
+
+    space = [lat_name, lon_name]
+    if reduction.kind in ("spatial_mean", "point") or (reduction.kind in ("min", "max") and reduction.over == "space"):
+        return {dim: n for dim, n in output.items() if dim not in space}
+    if reduction.kind in ("min", "max"):
+        return {dim: n for dim, n in output.items() if dim != "time"}
+    # climatology: one value per month/season/day of year present in the selection
+    n_groups = 0
+    if times is not None:
+        labels = time_groups(xr.DataArray(times, dims="time", coords={"time": times}), reduction.groupby)
+        n_groups = len(np.unique(labels.values))
+    return {
+        (reduction.groupby if dim == "time" else dim): (n_groups if dim == "time" else n)
+        for dim, n in output.items()
+    }
+
+
+def estimate_subset_size(
+    ds: xr.Dataset,
+    variable: Union[str, Dict[str, str]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    time_range: Optional[Tuple[str, str]] = None,
+    resample_to: Optional[str] = None,
+    compression_ratio: Optional[float] = None,
+    reduction: Optional[Union[ReductionSpec, Dict[str, Any]]] = None,
+    resolution: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Estimate the cost of a `load_climate_data` selection on a lazily opened dataset.
+
+    Uses the variable's real dtype and the native Zarr chunk layout from its
+    encoding, counting only the chunks intersected by the selection.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Dataset opened lazily from the Zarr store (nothing is loaded)
+    variable : str or dict
+        Variable name or CF-style selector
+    lon_range, lat_range, time_range : tuple, optional
+        Same selection as `load_climate_data`
+    resample_to : str, optional
+        Resampling frequency, only used to size the output
+    compression_ratio : float, optional
+        Uncompressed/stored ratio of the variable's chunks. If None, transfer
+        size is reported uncompressed
+    reduction : ReductionSpec or dict, optional
+        Reduction applied before writing, only used to size the output
+    resolution : float, optional
+        Target grid spacing in degrees, only used to size the output
+
+    Returns
+    -------
+    dict
+        Selected shape, dtype, chunk counts and byte estimates
+    """
+    name = _select_variable(ds, variable)
+    da = ds[name]
+    lon_name, lat_name = _get_coord_names(ds)
+
+    bounds = {}
+    if lon_range is not None and lat_range is not None:
+        bounds[lat_name] = lat_range
+    if time_range is not None:
+        bounds["time"] = time_range
+
+    selection = {
+        dim: [_index_slice(ds.indexes[dim], bounds[dim])] if dim in bounds else [slice(0, size)]
+        for dim, size in zip(da.dims, da.shape)
+    }
+    if lon_range is not None and lat_range is not None and lon_name in selection:
+        lon_bounds = _normalize_lon_range(lon_range)[1]
+        selection[lon_name] = _lon_index_slices(ds.indexes[lon_name], lon_bounds) or selection[lon_name]
+    shape = {dim: sum(sl.stop - sl.start for sl in sels) for dim, sels in selection.items()}
+
+    native_chunks = da.encoding.get("chunks") or da.shape
+    chunk_shape = dict(zip(da.dims, native_chunks))
+    n_chunks = math.prod(
+        sum(_chunks_touched(sl, chunk_shape[dim]) for sl in selection[dim]) for dim in da.dims
+    )
+
+    itemsize = np.dtype(da.dtype).itemsize
+    bytes_in_memory = math.prod(shape.values()) * itemsize
+    chunk_bytes = math.prod(native_chunks) * itemsize
+    bytes_uncompressed_chunks = n_chunks * chunk_bytes
+    bytes_to_transfer = bytes_uncompressed_chunks / (compression_ratio or 1.0)
+
+    reduction = as_reduction(reduction)
+    output_shape = _output_shape(ds, da, shape, selection, resample_to, reduction, resolution)
+    output_itemsize = itemsize
+    if reduction is not None and reduction.kind == "spatial_mean":
+        # The area weights are float64, and so is the weighted mean
+        output_itemsize = np.result_type(da.dtype, np.float64).itemsize
+    bytes_output = math.prod(output_shape.values()) * output_itemsize
+
+    return {
+        "variable": name,
+        "dtype": str(da.dtype),
+        "shape": shape,
+        "output_shape": output_shape,
+        "native_chunks": chunk_shape,
+        "chunks_touched": n_chunks,
+        "compression_ratio": compression_ratio,
+        "bytes_to_transfer": int(bytes_to_transfer),
+        "bytes_in_memory": int(bytes_in_memory),
+        "bytes_output": int(bytes_output),
+        "gb_to_transfer": round(bytes_to_transfer / 1024**3, 4),
+        "gb_in_memory": round(bytes_in_memory / 1024**3, 4),
+        "gb_output": round(bytes_output / 1024**3, 4),
+    }
+
+
+def estimate_climate_data_size(
+    store: str,
+    variable: Union[str, Dict[str, str]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    *,
+    time_range: Optional[Tuple[str, str]] = None,
+    resample_to: Optional[str] = None,
+    storage_options: Optional[Dict[str, Any]] = None,
+    measure_compression: bool = True,
+    reduction: Optional[Union[ReductionSpec, Dict[str, Any]]] = None,
+    resolution: Optional[float] = None,
+    **_loader_options: Any,
+) -> Dict[str, Any]:
+    """
+    Pre-flight size estimate for a `load_climate_data` request, without downloading data.
+
+    Opens only the store's metadata and, if `measure_compression` is True, reads
+    the sizes of a few of the variable's chunk objects to derive the stored
+    compression ratio.
+    `reduction` and `resolution` size the output as the loader would write it.
+    Accepts (and ignores) loader-only options such as `chunks` or `output_format`,
+    so it can be called with the same arguments as `load_climate_data`.
+
+    Returns
+    -------
+    dict
+        See `estimate_subset_size`
+    """
+    ds = open_store_dataset(store, storage_options=storage_options)
+    ratio = None
+    if measure_compression:
+        ratio = _stored_compression_ratio(store, _select_variable(ds, variable), storage_options)
+    return estimate_subset_size(
+        ds, variable, lon_range, lat_range, time_range, resample_to, compression_ratio=ratio,
+        reduction=reduction, resolution=resolution,
+    )
+
+
+def explain_climate_data_plan(
+    store: str,
+    variable: Union[str, Dict[str, str]],
+    lon_range: Optional[Tuple[float, float]] = None,
+    lat_range: Optional[Tuple[float, float]] = None,
+    *,
+    time_range: Optional[Tuple[str, str]] = None,
+    resample_to: Optional[str] = None,
+    chunks: Optional[Dict[str, int]] = None,
+    storage_options: Optional[Dict[str, Any]] = None,
+    time_contiguous: bool = False,
+    measure_compression: bool = False,
+    reduction: Optional[Union[ReductionSpec, Dict[str, Any]]] = None,
+    resolution: Optional[float] = None,
+    **_loader_options: Any,
+) -> Dict[str, Any]:
+    """
+    Show the lazy plan `load_climate_data` would run for a request, and what it would read.
+
+    Returns
+    -------
+    dict
+        `steps`: the ordered plan operations, plus the keys of `estimate_subset_size`
+        (notably `chunks_touched`, the number of chunks of the selected variable read)
+    """
+    auto_chunk = chunks is None
+    ds = open_store_dataset(store, storage_options=storage_options, chunks={} if auto_chunk else chunks)
+    plan = build_load_plan(
+        ds, variable, lon_range, lat_range, time_range, resample_to,
+        auto_chunk=auto_chunk, time_contiguous=time_contiguous,
+        reduction=reduction, resolution=resolution,
+    )
+    ratio = None
+    if measure_compression:
+        ratio = _stored_compression_ratio(store, _select_variable(ds, variable), storage_options)
+    estimate = estimate_subset_size(
+        ds, variable, lon_range, lat_range, time_range, resample_to, compression_ratio=ratio,
+        reduction=reduction, resolution=resolution,
+    )
+    return {"steps": [step.model_dump() for step in plan], **estimate}
+
+
+def create_size_estimator_tool():
+    return StructuredTool.from_function(
+        func=estimate_climate_data_size,
+        coroutine=make_async(estimate_climate_data_size),
+        name="estimate_climate_data_size",
+        description="Estimate how many bytes a load_climate_data request would transfer and hold in memory, without downloading it. Takes the same arguments as load_climate_data.",
+        args_schema=ClimateDataParams
+    )
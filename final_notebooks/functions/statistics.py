@@ -0,0 +1,235 @@
+from __future__ import annotations
+from typing import Optional, Union, Tuple, Dict, Any, List, Literal
+import os
+import uuid
+import numpy as np
+import xarray as xr
+from flox.xarray import xarray_reduce
+from pydantic import BaseModel, Field
+from langchain.tools import StructuredTool
+from .reductions import area_weights, time_groups
+from .workers import make_async
+
+# Outside the subset cache directory (temp/cache), which the cache may clear
+DEFAULT_STATS_DIR = os.path.join("temp", "stats")
+
+
+def _space_dims(obj: Union[xr.Dataset, xr.DataArray]) -> Tuple[str, str]:
+    """
+    Latitude and longitude dimension names of a subset written by the loader.
+    """
+    lat_name = next((name for name in ["latitude", "lat"] if name in obj.dims), None)
+    lon_name = next((name for name in ["longitude", "lon"] if name in obj.dims), None)
+    if lat_name is None or lon_name is None:
+        raise ValueError(f"Could not find latitude/longitude dimensions. Found: {list(obj.dims)}")
+    return lat_name, lon_name
+
+
+def weighted_mean(da: xr.DataArray, dims: Optional[List[str]] = None) -> xr.DataArray:
+    """
+    Mean over `dims` (default: latitude and longitude), weighting by cos(latitude).
+
+    Missing values (land, clouds) are skipped and do not count towards the weights.
+    """
+    lat_name, lon_name = _space_dims(da)
+    dims = dims or [lat_name, lon_name]
+    if lat_name not in dims:
+        return da.mean(dims, keep_attrs=True)
+    return da.weighted(area_weights(da[lat_name])).mean(dims, keep_attrs=True)
+
+
+def regional_series(da: xr.DataArray) -> xr.DataArray:
+    """
+    Area-weighted mean over the region, one value per time step.
+    """
+    return weighted_mean(da)
+
+
+def climatology(da: xr.DataArray, groupby: Literal["month", "season", "dayofyear"] = "month") -> xr.DataArray:
+    """
+    Mean per month/season/day of year, as a flox groupby reduction.
+
+    flox reduces every dask chunk to partial sums per group and combines them,
+    so the data is never loaded whole and the time axis need not be rechunked.
+    """
+    clim = xarray_reduce(da, time_groups(da, groupby), func="nanmean", keep_attrs=True)
+    clim.name = da.name
+    return clim
+
+
+def anomalies(
+    da: xr.DataArray,
+    groupby: Literal["month", "season", "dayofyear"] = "month",
+    clim: Optional[xr.DataArray] = None,
+) -> xr.DataArray:
+    """
+    Departure of each time step from its month/season/day-of-year climatology.
+
+    If `clim` is None, the climatology of `da` itself is used.
+    """
+    if clim is None:
+        clim = climatology(da, groupby)
+    labels = time_groups(da, groupby)
+    anom = (da.groupby(labels) - clim).drop_vars(groupby, errors="ignore")
+    anom.attrs = dict(da.attrs)
+    anom.name = da.name
+    return anom
+
+
+def percentiles(
+    da: xr.DataArray,
+    q: List[float],
+    dims: List[str],
+    groupby: Optional[Literal["month", "season", "dayofyear"]] = None,
+) -> xr.DataArray:
+    """
+    Percentiles (in [0, 100]) over `dims`, optionally per month/season/day of year.
+
+    Grouped percentiles are computed with flox; ungrouped ones rechunk `dims`
+    into a single chunk, which dask's quantile requires.
+    """
+    quantiles = [v / 100 for v in q]
+    if groupby is not None:
+        if dims != ["time"]:
+            raise ValueError("Grouped percentiles are only computed over time.")
+        result = xarray_reduce(
+            da.chunk({"time": -1}) if da.chunks else da,
+            time_groups(da, groupby),
+            func="nanquantile",
+            q=quantiles,
+        )
+    else:
+        if da.chunks:
+            da = da.chunk({dim: -1 for dim in dims})
+        result = da.quantile(quantiles, dim=dims, skipna=True)
+    result = result.assign_coords(quantile=np.asarray(q, dtype=float)).rename(quantile="percentile")
+    result.name = da.name
+    return result
+
+
+### agent tool
+
+Statistic = Literal["mean", "percentiles", "climatology", "anomalies", "min", "max"]
+
+
+def compute_statistics(
+    file_path: str,
+    variable: Optional[str] = None,
+    statistics: List[Statistic] = ("mean",),
+    over: Literal["space", "time"] = "space",
+    groupby: Literal["month", "season", "dayofyear"] = "month",
+    q: List[float] = (10, 50, 90),
+    output_dir: str = DEFAULT_STATS_DIR,
+) -> Dict[str, Any]:
+    """
+    Compute regional statistics of a subset written by `load_climate_data`.
+
+    The file is opened lazily with its on-disk chunks and every statistic is a
+    dask/flox reduction, so only the (small) results are ever held in memory.
+
+    Parameters
+    ----------
+    file_path : str
+        Path returned by `load_climate_data` (.nc or .zarr)
+    variable : str, optional
+        Variable to analyze. If None, the file must contain a single variable
+    statistics : list of str
+        Any of "mean", "percentiles", "climatology", "anomalies", "min", "max"
+    over : {"space", "time"}, default "space"
+        "space" first reduces the region to its area-weighted mean time series,
+        so "mean" is that series and "climatology"/"anomalies" are of that series;
+        "percentiles"/"min"/"max" are over the grid cells of each time step.
+        "time" computes every statistic per grid cell.
+    groupby : {"month", "season", "dayofyear"}, default "month"
+        Grouping of "climatology" and "anomalies"
+    q : list of float, default (10, 50, 90)
+        Percentiles for "percentiles", in [0, 100]
+    output_dir : str, default "temp/stats"
+        Where results are written; kept out of the subset cache directory,
+        which the cache may clear
+
+    Returns
+    -------
+    dict
+        For every statistic, the path of the NetCDF file holding it and its dims.
+        The file name holds every parameter the statistic depends on, so
+        requests with a different `groupby` or `q` do not overwrite it
+    """
+    ds = xr.open_dataset(file_path, chunks={})
+    if variable is None:
+        if len(ds.data_vars) != 1:
+            raise ValueError(f"Pass `variable`, the file holds several: {list(ds.data_vars)}")
+        variable = next(iter(ds.data_vars))
+    da = ds[variable]
+    lat_name, lon_name = _space_dims(da)
+    space = [lat_name, lon_name]
+    series = regional_series(da) if over == "space" else da
+
+    results = {}
+    for stat in statistics:
+        if stat == "mean":
+            result = series if over == "space" else weighted_mean(da, ["time"])
+        elif stat == "percentiles":
+            result = percentiles(da, list(q), space if over == "space" else ["time"])
+        elif stat == "climatology":
+            result = climatology(series, groupby)
+        elif stat == "anomalies":
+            result = anomalies(series, groupby)
+        elif stat in ("min", "max"):
+            dims = space if over == "space" else ["time"]
+            result = getattr(da, stat)(dims, keep_attrs=True)
+        else:
+            raise ValueError(f"Unknown statistic: {stat}")
+        results[stat] = result
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(file_path.rstrip("/")))[0]
+
+    summary = {}
+    for stat, result in results.items():
+        name = f"{stem}_{variable}_{stat}_{over}"
+        if stat in ("climatology", "anomalies"):
+            name += f"_{groupby}"
+        elif stat == "percentiles":
+            name += "_q" + "-".join(f"{v:g}" for v in q)
+        path = os.path.join(output_dir, f"{name}.nc")
+        # Written next to the final path and moved into place, so a concurrent
+        # reader never opens a partly written file
+        tmp_path = os.path.join(output_dir, f"{name}.{uuid.uuid4().hex[:8]}.tmp.nc")
+        try:
+            result.to_dataset(name=variable).to_netcdf(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        summary[stat] = {"file_path": path, "dims": dict(result.sizes)}
+    return summary
+
+
+class StatisticsParams(BaseModel):
+    """
+    Parameters for computing regional statistics of a downloaded subset.
+    """
+    file_path: str = Field(..., description="Path returned by load_climate_data")
+    variable: Optional[str] = Field(None, description="Variable to analyze; may be omitted if the file holds one variable")
+    statistics: List[Statistic] = Field(
+        ["mean"], description="Statistics to compute: 'mean', 'percentiles', 'climatology', 'anomalies', 'min', 'max'"
+    )
+    over: Literal["space", "time"] = Field(
+        "space",
+        description="'space' for statistics of the regional (area-weighted) mean time series, 'time' for maps of per-grid-cell statistics over time"
+    )
+    groupby: Literal["month", "season", "dayofyear"] = Field(
+        "month", description="Grouping for 'climatology' and 'anomalies'"
+    )
+    q: List[float] = Field([10, 50, 90], description="Percentiles to compute, between 0 and 100")
+
+
+def create_statistics_tool():
+    return StructuredTool.from_function(
+        func=compute_statistics,
+        coroutine=make_async(compute_statistics),
+        name="compute_statistics",
+        description="Compute area-weighted regional means, percentiles, monthly/seasonal climatologies, anomalies or min/max of a file downloaded by load_climate_data, without loading it into memory. Returns the paths of small NetCDF files with the results, to plot with python_repl.",
+        args_schema=StatisticsParams
+    )
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import Optional, Tuple, Dict, Any, Callable
+import json
+import threading
+import time
+import fsspec
+import xarray as xr
+
+# Opened datasets and filesystems are reused for this many seconds before
+# being reopened, so that stores updated in place are eventually picked up.
+DEFAULT_TTL_SECONDS = 15 * 60
+
+_lock = threading.RLock()
+_filesystems: Dict[str, Tuple[float, fsspec.AbstractFileSystem]] = {}
+_datasets: Dict[str, Tuple[float, xr.Dataset]] = {}
+
+
+def _pool_key(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+def _get_or_create(pool: Dict[str, Tuple[float, Any]], key: str, factory: Callable[[], Any], ttl: Optional[float]) -> Any:
+    """
+    Return the pooled value for `key`, creating it if missing or expired.
+
+    The factory runs outside the lock so a slow open does not block requests
+    for other stores; two threads racing on the same key may both open it,
+    and the last one wins.
+    """
+    ttl = DEFAULT_TTL_SECONDS if ttl is None else ttl
+    with _lock:
+        hit = pool.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            return hit[1]
+    value = factory()
+    with _lock:
+        pool[key] = (time.monotonic() + ttl, value)
+    return value
+
+
+def get_filesystem(
+    url: str,
+    storage_options: Optional[Dict[str, Any]] = None,
+    ttl: Optional[float] = None,
+) -> Tuple[fsspec.AbstractFileSystem, str]:
+    """
+    Get a shared fsspec filesystem (and the path inside it) for a store URL.
+
+    Filesystems are keyed by protocol and storage options, so every store on the
+    same bucket shares one instance and its HTTP session/connection pool.
+    """
+    protocol = url.split("://", 1)[0] if "://" in url else "file"
+    key = _pool_key(protocol, storage_options or {})
+
+    def _create():
+        fs, _ = fsspec.core.url_to_fs(url, **(storage_options or {}))
+        return fs
+
+    fs = _get_or_create(_filesystems, key, _create, ttl)
+    return fs, fs._strip_protocol(url)
+
+
+def get_mapper(
+    url: str,
+    storage_options: Optional[Dict[str, Any]] = None,
+    ttl: Optional[float] = None,
+) -> fsspec.mapping.FSMap:
+    """
+    Key/value view of a store URL backed by the shared filesystem.
+    """
+    fs, path = get_filesystem(url, storage_options, ttl)
+    return fs.get_mapper(path)
+
+
+def open_store_dataset(
+    store: Any,
+    storage_options: Optional[Dict[str, Any]] = None,
+    chunks: Optional[Dict[str, int]] = None,
+    ttl: Optional[float] = None,
+) -> xr.Dataset:
+    """
+    Open a Zarr store lazily, reusing an already opened Dataset when possible.
+
+    Datasets are keyed by store URL, storage options and chunks, so consolidated
+    metadata is fetched once per TTL instead of once per request. Store objects
+    (e.g. an existing `FSMap`) are opened directly and not pooled.
+
+    The returned Dataset is a shallow copy: callers may assign coordinates or
+    variables without affecting the pooled instance, while array data (lazy
+    backend arrays) is shared.
+    """
+    if not isinstance(store, str):
+        return xr.open_zarr(store, chunks=chunks)
+
+    key = _pool_key(store.rstrip("/"), storage_options or {}, chunks)
+
+    def _open():
+        return xr.open_dataset(
+            get_mapper(store, storage_options, ttl),
+            engine="zarr",
+            chunks=chunks,
+        )
+
+    return _get_or_create(_datasets, key, _open, ttl).copy(deep=False)
+
+
+def clear_store_pool() -> None:
+    """
+    Forget every pooled dataset and filesystem, forcing the next request to reopen them.
+    """
+    with _lock:
+        _datasets.clear()
+        _filesystems.clear()
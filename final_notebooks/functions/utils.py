@@ -36,10 +36,15 @@ def get_prompt():
             
             **Step 2: Load Data**
             - Use the `loader_tool` with the exact dataset and variable names from Step 1.
+            - If the analysis needs several variables from the same dataset (e.g. `u_wind` and `v_wind` for wind speed), load them all with ONE call to `load_climate_data_batch` instead of calling `loader_tool` once per variable.
+            - For long time ranges or large regions, first call `estimate_climate_data_size` with the same arguments. If the estimate is large, narrow the request, use `resample_to`, or set `output_format` to "zarr".
+            - If the analysis only needs a regional mean time series, the series at one location, a climatology or min/max values, pass a `reduction` to the loader instead of loading the full data cube.
             - This tool will return a local `file_path` (e.g., "temp/data.nc"). This path is critical for the next step.
             
             **Step 3: Analyze Data**
             - Use the `python_repl` tool to write and execute code for the analysis.
+            - For regional means, percentiles, monthly/seasonal climatologies, anomalies or min/max, first call `compute_statistics` on the `file_path` and plot its small result files, instead of computing them with loops in `python_repl`.
+            - For low-, high- or band-pass filtering along time (e.g. keeping 10-90 day variability), call `filter_climate_data` on the `file_path` instead of filtering grid cells one by one in `python_repl`.
             - Follow the critical rule below.
             - After the code generates output (like a plot), provide a brief, clear description of the result.
             
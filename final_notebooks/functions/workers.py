@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Callable, Any, Optional
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Blocking tool calls (downloads, xarray/dask computations, REPL runs) running at
+# once across all sessions of the process; more wait for a free worker
+DEFAULT_MAX_WORKERS = int(os.environ.get("CLIMATE_AGENT_WORKERS", 8))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_max_workers = DEFAULT_MAX_WORKERS
+_lock = threading.Lock()
+
+
+def set_max_workers(max_workers: int):
+    """
+    Resize the worker pool. Calls already running finish on the old pool.
+    """
+    global _pool, _max_workers
+    with _lock:
+        old, _pool, _max_workers = _pool, None, max_workers
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """
+    The process-wide pool that async tools offload blocking work to, created on first use.
+
+    Threads rather than processes: numpy, dask and the network reads release
+    the GIL, and the per-process caches (`store_pool`, the subset cache index,
+    the example store) stay shared by all sessions.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="climate-agent")
+        return _pool
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking call on the worker pool without blocking the event loop.
+
+    The caller's context variables (e.g. langchain's callback configuration)
+    are carried over to the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_pool(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def make_async(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Coroutine version of a blocking function, run on the worker pool (see `run_blocking`).
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The functions package reads its data files relative to final_notebooks
+NOTEBOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, NOTEBOOKS_DIR)
+os.chdir(NOTEBOOKS_DIR)
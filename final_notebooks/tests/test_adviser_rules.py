@@ -0,0 +1,65 @@
+import pytest
+from langchain_core.language_models import FakeListChatModel
+
+from functions.adviser_rules import parse_time_range, resolve_query
+from functions.adviser_tool import ADVISER_STATS, reset_adviser_stats, select_dataset
+from functions.catalog import get_catalog
+
+LLM_ANSWER = "dataset: Indian Ocean grid\nvariable: sst\nlat,lon boundaries: global\ntime range: 2001-01-01 to 2001-12-31"
+
+
+@pytest.fixture
+def catalog():
+    return get_catalog("functions/datasets.json")
+
+
+def test_parse_time_range():
+    assert parse_time_range("sst from 2001-01-01 to 2001-02-01") == ("2001-01-01", "2001-02-01")
+    assert parse_time_range("sst 2003 to 2001") == ("2001-01-01", "2003-12-31")
+    assert parse_time_range("sst in 2001") == ("2001-01-01", "2001-12-31")
+    assert parse_time_range("sst in the north atlantic 2001") is None
+
+
+@pytest.mark.parametrize("query", ["sst in the north atlantic 2001", "sst on 2001-03-01", "sst in 2001 compared with 2005"])
+def test_unparsed_years_are_not_resolved(catalog, query):
+    assert resolve_query(query, catalog) is None
+
+
+@pytest.mark.parametrize("query", [
+    "sla in the Gulf of Mexico",
+    "sst near Sri Lanka in 2001",
+    "2m_temperature over Europe in 2010",
+    "sst between 10N and 20N",
+    "sst off the coast of Somalia",
+    "sst last year",
+    "sst for the past 10 years",
+])
+def test_unknown_places_and_relative_times_are_not_resolved(catalog, query):
+    assert resolve_query(query, catalog) is None
+
+
+@pytest.mark.parametrize("query, lat_range", [
+    ("sst in the arabian sea in 2001", (0.0, 25.0)),
+    ("sst trend in the bay of bengal", (5.0, 23.0)),
+    ("sst lat 10 to 20, lon 60 to 70", (10.0, 20.0)),
+    ("sst 10N-20N, 60E-70E", (10.0, 20.0)),
+    ("2m_temperature over the whole earth in 2010", None),
+])
+def test_known_places_are_resolved(catalog, query, lat_range):
+    assert resolve_query(query, catalog)["lat_range"] == lat_range
+
+
+def test_fast_path_answers_parsed_year():
+    reset_adviser_stats()
+    llm = FakeListChatModel(responses=[LLM_ANSWER])
+    response = select_dataset("sst in the arabian sea in 2001", llm=llm)
+    assert "time range: 2001-01-01 to 2001-12-31" in response
+    assert ADVISER_STATS == {"fast_path": 1, "llm_calls": 0}
+
+
+def test_unparsed_year_escalates_to_llm():
+    reset_adviser_stats()
+    llm = FakeListChatModel(responses=[LLM_ANSWER])
+    response = select_dataset("sst in the north atlantic 2001", llm=llm)
+    assert response == LLM_ANSWER
+    assert ADVISER_STATS == {"fast_path": 0, "llm_calls": 1}
@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+import functions.cache
+import functions.loader
+from functions.cache import SubsetCache, _time_contains, normalize_request, request_contains, request_key
+from functions.loader import load_climate_data
+
+STORE = "gs://bucket/store.zarr"
+
+
+def _request(time_range):
+    return normalize_request(STORE, "sst", (0, 10), (0, 10), time_range)
+
+
+def test_date_only_end_has_its_own_key():
+    whole_day = _request(("2000-01-01", "2000-01-02"))
+    midnight = _request(("2000-01-01", "2000-01-02T00:00"))
+    assert request_key(whole_day) != request_key(midnight)
+    assert request_key(whole_day) == request_key(_request(("2000-1-1", "2000-1-2")))
+
+
+def test_midnight_end_does_not_contain_whole_day():
+    whole_day = _request(("2000-01-01", "2000-01-02"))
+    midnight = _request(("2000-01-01", "2000-01-02T00:00"))
+    assert not request_contains(midnight, whole_day)
+    assert request_contains(whole_day, midnight)
+
+
+def test_time_contains_partial_strings():
+    assert not _time_contains(("2000-01-01", "2000-01-02T00:00"), ("2000-01-01", "2000-01-02"))
+    assert _time_contains(("2000", "2000"), ("2000-03-01", "2000-12-31"))
+    assert not _time_contains(("2000-01", "2000-02"), ("2000-01-01", "2000-03-01"))
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    path = str(tmp_path / "store.zarr")
+    xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), np.random.rand(30, 20, 40).astype("f4"))},
+        coords={
+            "time": pd.date_range("2000-01-01", periods=30),
+            "latitude": np.arange(-9.5, 10),
+            "longitude": np.arange(0.5, 40),
+        },
+    ).chunk({"time": 10}).to_zarr(path, consolidated=False)
+    return path
+
+
+@pytest.mark.parametrize("output_format", ["netcdf", "zarr"])
+def test_concurrent_identical_requests_write_once(local_store, tmp_path, monkeypatch, output_format):
+    cache = SubsetCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(functions.cache, "_SUBSET_CACHE", cache)
+    writes = []
+    save_subset = functions.loader._save_subset
+    monkeypatch.setattr(functions.loader, "_save_subset", lambda *a, **kw: writes.append(a) or save_subset(*a, **kw))
+
+    def load(_):
+        return load_climate_data(
+            local_store, "sst", (5, 25), (-5, 5), time_range=("2000-01-05", "2000-01-25"),
+            output_format=output_format, use_pyramid=False,
+        )
+
+    with ThreadPoolExecutor(4) as pool:
+        paths = set(pool.map(load, range(4)))
+    assert len(writes) == 1
+    assert len(paths) == 1 and len(cache) == 1
+    # Only the entry and the index are left, no temporary files
+    assert sorted(os.listdir(cache.cache_dir)) == sorted([os.path.basename(paths.pop()), cache.index_name])
+
+
+def test_eviction_removes_resume_manifest(tmp_path):
+    cache = SubsetCache(str(tmp_path / "cache"), max_size_gb=1e-9)
+    old = cache.path_for("old", ".zarr")
+    os.makedirs(old)
+    with open(old + ".manifest.json", "w") as f:
+        f.write("{}")
+    cache.put("old", old, _request(("2000-01-01", "2000-01-31")))
+
+    new = cache.path_for("new", ".nc")
+    with open(new, "wb") as f:
+        f.write(b"0" * 16)
+    cache.put("new", new, _request(("2000-02-01", "2000-02-28")))
+    assert not os.path.exists(old) and not os.path.exists(old + ".manifest.json")
@@ -0,0 +1,25 @@
+import asyncio
+
+from chat_agent import render_agent_events
+
+
+async def _events(events):
+    for event in events:
+        yield event
+
+
+def _render(events):
+    async def collect():
+        return [message async for message in render_agent_events(_events(events))]
+    return asyncio.run(collect())
+
+
+def test_progress_events_update_one_line():
+    progress = {"event": "on_custom_event", "name": "download_progress", "run_id": "tool", "parent_ids": []}
+    messages = _render([
+        {"event": "on_tool_start", "name": "load_climate_data", "run_id": "tool", "parent_ids": ["agent"]},
+        {**progress, "data": {"message": "Downloaded 1/2 blocks (1.0/2.0 MB)"}},
+        {**progress, "data": {"message": "Downloaded 2/2 blocks (2.0/2.0 MB)"}},
+        {"event": "on_tool_end", "name": "load_climate_data", "run_id": "tool", "parent_ids": ["agent"]},
+    ])
+    assert messages[-1] == "_✓ Downloading data_  \n_✓ Downloaded 2/2 blocks (2.0/2.0 MB)_"
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from functions.embeddings import MIN_RELEVANCE, HashedTfidfEmbeddings, get_embeddings
+
+
+@pytest.fixture(scope="module")
+def examples():
+    with open("functions/code_descriptions.json", "r", encoding="utf-8") as f:
+        docs = json.load(f)
+    texts = [doc["page_content"] for doc in docs]
+    embeddings = HashedTfidfEmbeddings(texts)
+    return [doc["metadata"]["source"] for doc in docs], np.asarray(embeddings.embed_documents(texts)), embeddings
+
+
+@pytest.mark.parametrize("query, source", [
+    ("harmonic regression anomalies", "anomaly_calculation"),
+    ("butterworth band-pass filter", "filters"),
+    ("plot chlorophyll", "chl_plot"),
+    ("wind speed magnitude", "wind_magnitude_plot"),
+    ("rolling mean", "rolling_mean"),
+])
+def test_queries_rank_their_example_first(examples, query, source):
+    sources, vectors, embeddings = examples
+    scores = vectors @ np.asarray(embeddings.embed_query(query))
+    assert sources[int(np.argmax(scores))] == f"./txt_docs/{source}.txt"
+    assert scores.max() >= MIN_RELEVANCE["tfidf"]
+
+
+@pytest.mark.parametrize("query", ["stock market prices tomorrow", "recipe for chocolate cake"])
+def test_unrelated_queries_score_below_threshold(examples, query):
+    _, vectors, embeddings = examples
+    assert (vectors @ np.asarray(embeddings.embed_query(query))).max() < MIN_RELEVANCE["tfidf"]
+
+
+def test_vectors_are_normalized_and_stable(examples):
+    _, vectors, embeddings = examples
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1)
+    assert embeddings.embed_query("sst anomaly") == embeddings.embed_query("sst anomaly")
+    assert embeddings.embed_query("") == [0.0] * embeddings.dim
+
+
+def test_model_id_follows_corpus():
+    assert HashedTfidfEmbeddings(["a b", "c d"]).model_id == HashedTfidfEmbeddings(["c d", "a b"]).model_id
+    assert HashedTfidfEmbeddings(["a b"]).model_id != HashedTfidfEmbeddings(["a b", "c d"]).model_id
+
+
+def test_get_tfidf_backend():
+    embeddings = get_embeddings("tfidf", "hashed-tfidf-512", corpus=["sea surface temperature"], batch_size=2)
+    assert embeddings.model_id.startswith("hashed-tfidf-512-")
+    assert len(embeddings.embed_documents(["sst", "chl", "wind"])) == 3
+    assert len(embeddings.embed_query("sst")) == 512
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.signal as signal
+import xarray as xr
+
+from functions.filters import butter_filter, filter_climate_data
+
+TIME = pd.date_range("2001-01-01", periods=4 * 365)
+T = np.arange(len(TIME), dtype=float)
+SLOW, MEDIUM, FAST = (np.sin(2 * np.pi * T / period) for period in (365.0, 30.0, 4.0))
+# Away from the edges, where the padding distorts the result
+INTERIOR = slice(200, -200)
+
+
+def _cells(*series):
+    return xr.DataArray(np.stack(series), dims=("cell", "time"), coords={"time": TIME}).chunk({"cell": 1})
+
+
+@pytest.mark.parametrize("kind, cutoff, kept", [
+    ("low", 1 / 100, SLOW),
+    ("high", 1 / 10, FAST),
+    ("band", (1 / 60, 1 / 15), MEDIUM),
+])
+def test_filters_keep_their_band(kind, cutoff, kept):
+    result = butter_filter(_cells(SLOW + MEDIUM + FAST), kind, cutoff).load()
+    np.testing.assert_allclose(result.isel(cell=0)[INTERIOR], kept[INTERIOR], atol=0.05)
+
+
+def test_matches_scipy_sosfiltfilt():
+    x = SLOW + FAST
+    sos = signal.butter(4, 1 / 30, btype="lowpass", fs=1.0, output="sos")
+    result = butter_filter(_cells(x), "low", 1 / 30).load()
+    np.testing.assert_allclose(result.isel(cell=0), signal.sosfiltfilt(sos, x), rtol=1e-10, atol=1e-12)
+
+
+def test_gaps_are_filled_and_empty_cells_stay_missing():
+    gappy = SLOW.copy()
+    gappy[500:510] = np.nan
+    result = butter_filter(_cells(gappy, np.full(len(TIME), np.nan)), "low", 1 / 100).load()
+    assert np.isfinite(result.isel(cell=0)).all()
+    np.testing.assert_allclose(result.isel(cell=0)[INTERIOR], SLOW[INTERIOR], atol=0.05)
+    assert np.isnan(result.isel(cell=1)).all()
+
+
+def test_irregular_time_steps_are_rejected():
+    da = xr.DataArray(SLOW[:10], dims="time", coords={"time": TIME[[0, 1, 2, 3, 5, 6, 7, 8, 9, 10]]})
+    with pytest.raises(ValueError, match="irregular"):
+        butter_filter(da, "low", 1 / 3)
+
+
+def test_filter_climate_data(tmp_path):
+    path = str(tmp_path / "subset.nc")
+    _cells(SLOW + FAST).to_dataset(name="sst").to_netcdf(path)
+    with pytest.raises(ValueError, match="band-pass"):
+        filter_climate_data(path, "band", [30], output_dir=str(tmp_path))
+    output = filter_climate_data(path, "low", [30], order=2, output_dir=str(tmp_path))
+    assert output.endswith("subset_sst_lowpass_30d_order2.nc")
+    np.testing.assert_allclose(xr.open_dataarray(output).isel(cell=0)[INTERIOR], SLOW[INTERIOR], atol=0.05)
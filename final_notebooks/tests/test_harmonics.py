@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from functions.harmonics import DAYS_PER_YEAR, fit_harmonics, harmonic_design_matrix
+
+TIME = pd.date_range("2001-01-01", periods=3 * 365)
+
+
+def _signal(trend, amplitudes, phases):
+    t = np.arange(len(TIME), dtype=float)
+    omega = 2 * np.pi / DAYS_PER_YEAR
+    y = 10 + trend * t / DAYS_PER_YEAR
+    for k, (amplitude, phase) in enumerate(zip(amplitudes, phases), start=1):
+        y = y + amplitude * np.cos(k * omega * (t - phase))
+    return y
+
+
+def test_fit_recovers_trend_and_harmonics():
+    cells = np.stack([_signal(0.5, (3, 1), (40, 20)), _signal(-1.0, (2, 0.5), (200, 100))])
+    da = xr.DataArray(cells, dims=("cell", "time"), coords={"time": TIME}, attrs={"units": "degC"}).chunk({"cell": 1, "time": 100})
+    result = fit_harmonics(da).load()
+    np.testing.assert_allclose(result.trend, [0.5, -1.0], atol=1e-8)
+    np.testing.assert_allclose(result.amplitude, [[3, 1], [2, 0.5]], atol=1e-8)
+    np.testing.assert_allclose(result.phase, [[40, 20], [200, 100]], atol=1e-6)
+    np.testing.assert_allclose(result.anomaly, 0, atol=1e-8)
+    assert result.anomaly.dims == ("cell", "time")
+    assert result.trend.attrs["units"] == "degC per year"
+
+
+def test_gaps_match_lstsq_on_valid_samples():
+    rng = np.random.default_rng(0)
+    y = _signal(0.3, (2, 1), (10, 30)) + rng.normal(0, 0.5, len(TIME))
+    y[rng.choice(len(TIME), 200, replace=False)] = np.nan
+    few = np.full(len(TIME), np.nan)
+    few[:4] = 1.0
+    da = xr.DataArray(np.stack([y, few]), dims=("cell", "time"), coords={"time": TIME})
+    result = fit_harmonics(da)
+
+    X = harmonic_design_matrix(TIME)
+    valid = np.isfinite(y)
+    beta = np.linalg.lstsq(X[valid], y[valid], rcond=None)[0]
+    np.testing.assert_allclose(result.fit.isel(cell=0), X @ beta, rtol=1e-8)
+    assert np.isnan(result.anomaly.isel(cell=0).values[~valid]).all()
+    # Fewer valid samples than coefficients: no fit
+    assert np.isnan(result.trend.isel(cell=1))
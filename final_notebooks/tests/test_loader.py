@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from functions.loader import CancelToken, DownloadCancelled, apply_load_plan, auto_chunks, build_load_plan, download_resumable
+
+
+@pytest.fixture
+def subset():
+    return xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), np.random.rand(50, 8, 12).astype("f4"))},
+        coords={
+            "time": pd.date_range("2000-01-01", periods=50),
+            "latitude": np.arange(-3.5, 4),
+            "longitude": np.arange(0.5, 12),
+        },
+    ).chunk({"time": 10})
+
+
+def test_resume_after_cancel(subset, tmp_path):
+    token = CancelToken()
+    progress = []
+
+    def cancel_after_two(p):
+        progress.append(p.blocks_done)
+        if p.blocks_done == 2:
+            token.cancel()
+
+    with pytest.raises(DownloadCancelled):
+        download_resumable(
+            subset, temp_dir=str(tmp_path), filename="sst", progress_callback=cancel_after_two, cancel_token=token,
+        )
+    assert progress == [1, 2]
+    assert os.path.exists(tmp_path / "sst.zarr.manifest.json")
+
+    progress.clear()
+    path = download_resumable(subset, temp_dir=str(tmp_path), filename="sst", progress_callback=lambda p: progress.append(p.blocks_done))
+    # Only the three remaining blocks are written
+    assert progress == [3, 4, 5]
+    xr.testing.assert_identical(xr.open_zarr(path).load(), subset.load())
+    assert not os.path.exists(tmp_path / "sst.zarr.manifest.json")
+
+
+def test_changed_request_starts_over(subset, tmp_path):
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(DownloadCancelled):
+        download_resumable(subset, temp_dir=str(tmp_path), filename="sst", cancel_token=token)
+
+    progress = []
+    other = subset.isel(time=slice(0, 40))
+    path = download_resumable(other, temp_dir=str(tmp_path), filename="sst", progress_callback=lambda p: progress.append(p.blocks_done))
+    assert progress == [1, 2, 3, 4]
+    xr.testing.assert_identical(xr.open_zarr(path).load(), other.load())
+
+
+@pytest.fixture
+def native(tmp_path):
+    path = str(tmp_path / "native.zarr")
+    xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), np.zeros((365, 90, 180), dtype="f4"))},
+        coords={
+            "time": pd.date_range("2000-01-01", periods=365),
+            "latitude": np.arange(-89, 90, 2.0),
+            "longitude": np.arange(1, 360, 2.0),
+        },
+    ).chunk({"time": 30, "latitude": 20, "longitude": 40}).to_zarr(path, consolidated=False)
+    return xr.open_zarr(path, consolidated=False).sst
+
+
+def _chunk_edges(start, sizes):
+    return list(start + np.cumsum(sizes)[:-1])
+
+
+@pytest.mark.parametrize("target_chunk_mb", [0.01, 1, 128])
+def test_auto_chunks_align_with_native_chunks(native, target_chunk_mb):
+    selection = {"time": slice(17, 300), "latitude": slice(5, 77), "longitude": [slice(150, 180), slice(0, 55)]}
+    chunks = auto_chunks(native, selection, target_chunk_mb=target_chunk_mb)
+    for dim, block in (("time", 30), ("latitude", 20)):
+        assert sum(chunks[dim]) == selection[dim].stop - selection[dim].start
+        # Inner chunk edges fall on native chunk edges, and chunks are whole multiples of them
+        assert all(edge % block == 0 for edge in _chunk_edges(selection[dim].start, chunks[dim]))
+        assert all(size % block == 0 for size in chunks[dim][1:-1])
+    # Across the seam, each piece is aligned on its own
+    assert sum(chunks["longitude"]) == 30 + 55
+    east, west = [], list(chunks["longitude"])
+    while sum(east) < 30:
+        east.append(west.pop(0))
+    assert sum(east) == 30
+    assert all(edge % 40 == 0 for edge in _chunk_edges(150, east) + _chunk_edges(0, west))
+
+
+def test_auto_chunks_time_contiguous(native):
+    chunks = auto_chunks(native, {"time": slice(17, 300)}, target_chunk_mb=1, time_contiguous=True)
+    assert chunks["time"] == (283,)
+    assert all(edge % 20 == 0 for edge in _chunk_edges(0, chunks["latitude"]))
+    assert max(chunks["latitude"]) * max(chunks["longitude"]) * 283 * 4 <= 2 * 1024**2
+
+
+def test_auto_chunks_without_native_chunks():
+    assert auto_chunks(xr.DataArray(np.zeros((3, 4)), dims=("latitude", "longitude"))) is None
+
+
+@pytest.fixture(params=[np.arange(5, 360, 10.0), np.arange(-175, 180, 10.0)], ids=["0-360", "-180-180"])
+def lon_store(request, tmp_path):
+    lon = request.param
+    path = str(tmp_path / "lon.zarr")
+    # Every cell holds its longitude in the 0-360 frame
+    xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), np.broadcast_to(lon % 360, (4, 6, len(lon))).astype("f4"))},
+        coords={"time": pd.date_range("2000-01-01", periods=4), "latitude": np.arange(-25, 30, 10.0), "longitude": lon},
+    ).chunk({"longitude": 9}).to_zarr(path, consolidated=False)
+    return xr.open_zarr(path, consolidated=False)
+
+
+@pytest.mark.parametrize("lon_range, expected", [
+    ((170, -170), [175, 185]),
+    ((350, 10), [-5, 5]),
+    ((-10, 10), [-5, 5]),
+    ((160, 200), [165, 175, 185, 195]),
+])
+def test_longitude_ranges_across_seams(lon_store, lon_range, expected):
+    plan = build_load_plan(lon_store, "sst", lon_range, (-10, 10), auto_chunk=True)
+    da = apply_load_plan(lon_store, plan).load()
+    np.testing.assert_array_equal(da.longitude, expected)
+    np.testing.assert_array_equal(da.isel(time=0, latitude=0), np.asarray(expected) % 360)
+
+
+@pytest.mark.parametrize("lon_range, first", [((170, -170), 5), ((350, 10), -175)])
+def test_longitude_range_without_latitudes_reframes_globe(lon_store, lon_range, first):
+    da = apply_load_plan(lon_store, build_load_plan(lon_store, "sst", lon_range, None)).load()
+    np.testing.assert_array_equal(da.longitude, np.arange(first, first + 360, 10.0))
+    np.testing.assert_array_equal(da.isel(time=0, latitude=0), da.longitude % 360)
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from fsspec.implementations.memory import MemoryFileSystem
+
+from functions.prefetch import prefetch_subset
+
+SELECTION = {"lon_range": (5, 55), "lat_range": (-10, 10), "time_range": ("2000-01-03", "2000-02-05")}
+
+
+class SlowMemoryFileSystem(MemoryFileSystem):
+    """
+    In-memory filesystem where every object read waits `latency` seconds, like a request to a bucket.
+    """
+
+    latency = 0.01
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        time.sleep(self.latency)
+        return super().cat_file(path, start=start, end=end, **kwargs)
+
+
+@pytest.fixture
+def slow_store():
+    fs = SlowMemoryFileSystem()
+    ds = xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), np.random.rand(40, 30, 60).astype("f4"))},
+        coords={
+            "time": pd.date_range("2000-01-01", periods=40),
+            "latitude": np.arange(-14.5, 15),
+            "longitude": np.arange(0.5, 60),
+        },
+    )
+    ds.chunk({"time": 5, "latitude": 10, "longitude": 10}).to_zarr(
+        fs.get_mapper("/slow_store.zarr"), mode="w", consolidated=False
+    )
+    yield fs
+    fs.rm("/slow_store.zarr", recursive=True)
+
+
+def _subset(ds):
+    return ds.sst.sel(
+        longitude=slice(*SELECTION["lon_range"]),
+        latitude=slice(*SELECTION["lat_range"]),
+        time=slice(*SELECTION["time_range"]),
+    ).load()
+
+
+def test_prefetch_reduces_wall_time(slow_store, tmp_path):
+    start = time.perf_counter()
+    direct = _subset(xr.open_zarr(slow_store.get_mapper("/slow_store.zarr"), consolidated=False))
+    direct_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mirror = prefetch_subset(
+        "memory://slow_store.zarr", "sst", **SELECTION, local_dir=str(tmp_path / "mirror"), filesystem=slow_store,
+    )
+    prefetched = _subset(xr.open_zarr(mirror, consolidated=False))
+    prefetch_time = time.perf_counter() - start
+
+    xr.testing.assert_identical(direct, prefetched)
+    assert prefetch_time < direct_time / 2
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from functions.loader import apply_load_plan, build_load_plan
+from functions.pyramid import build_pyramid, find_pyramid_level, open_pyramid_level
+
+CLIMATOLOGY = {"kind": "climatology"}
+
+
+@pytest.fixture(scope="module")
+def pyramid(tmp_path_factory):
+    root = tmp_path_factory.mktemp("pyramid")
+    store = str(root / "store.zarr")
+    time = pd.date_range("2000-01-01", "2001-12-31")
+    ds = xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), np.random.default_rng(0).random((len(time), 12, 24)).astype("f4"))},
+        coords={"time": time, "latitude": np.arange(-5.5, 6), "longitude": np.arange(0.5, 24)},
+    )
+    ds.chunk({"time": 100}).to_zarr(store, mode="w", consolidated=False)
+    build_pyramid(store, ["sst"], time_aggregations=("MS",), factors=(1, 2, 4), pyramid_dir=str(root / "pyramids"))
+    return store, str(root / "pyramids")
+
+
+@pytest.mark.parametrize("resolution, group", [
+    (None, "MS/1x"), (0.5, "MS/1x"), (2, "MS/2x"), (3, "MS/1x"), (4, "MS/4x"), (6, "MS/2x"), (100, "MS/4x"),
+])
+def test_level_factor_divides_requested_coarsening(pyramid, resolution, group):
+    store, pyramid_dir = pyramid
+    level = find_pyramid_level(store, "sst", "MS", resolution, pyramid_dir=pyramid_dir)
+    assert level[1]["group"] == group
+
+
+def test_climatology_uses_climatology_levels(pyramid):
+    store, pyramid_dir = pyramid
+    assert find_pyramid_level(store, "sst", None, pyramid_dir=pyramid_dir, reduction=CLIMATOLOGY)[1]["group"] == "clim-month/1x"
+    assert find_pyramid_level(store, "sst", None, 2, pyramid_dir=pyramid_dir, reduction=CLIMATOLOGY)[1]["group"] == "clim-month/2x"
+    # Only the whole record by calendar month is stored
+    assert find_pyramid_level(store, "sst", None, time_range=("2000-01-01", "2000-12-31"), pyramid_dir=pyramid_dir, reduction=CLIMATOLOGY) is None
+    assert find_pyramid_level(store, "sst", None, pyramid_dir=pyramid_dir, reduction={"kind": "climatology", "groupby": "season"}) is None
+    assert find_pyramid_level(store, "sst", "MS", pyramid_dir=pyramid_dir, reduction=CLIMATOLOGY) is None
+    assert find_pyramid_level(store, "sst", None, pyramid_dir=pyramid_dir) is None
+
+
+@pytest.mark.parametrize("resample_to, resolution, reduction", [
+    ("MS", 3, None), ("MS", 6, None), (None, None, CLIMATOLOGY), (None, 4, CLIMATOLOGY),
+])
+def test_pyramid_matches_raw_load(pyramid, resample_to, resolution, reduction):
+    store, pyramid_dir = pyramid
+    region = ((0, 24), (-6, 6), None)
+    raw = xr.open_zarr(store, consolidated=False)
+    expected = apply_load_plan(raw, build_load_plan(raw, "sst", *region, resample_to, reduction=reduction, resolution=resolution))
+
+    path, level = find_pyramid_level(store, "sst", resample_to, resolution, pyramid_dir=pyramid_dir, reduction=reduction)
+    ds = open_pyramid_level(path, level)
+    actual = apply_load_plan(ds, build_load_plan(ds, "sst", *region, None, resolution=resolution))
+    if level["climatology"]:
+        actual = actual.transpose("month", ...)
+    xr.testing.assert_allclose(expected.load(), actual.load(), rtol=1e-5)
@@ -0,0 +1,20 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from functions.python_repl_tool import create_python_repl
+
+
+def test_concurrent_runs_keep_their_output_and_overlap():
+    tools = [create_python_repl() for _ in range(4)]
+    command = "import time\nfor i in range(3):\n    print({n}, i)\n    time.sleep(0.1)"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(4) as pool:
+        outputs = list(pool.map(lambda n: tools[n].run(command.format(n=n)), range(4)))
+    elapsed = time.perf_counter() - start
+    assert outputs == ["".join(f"{n} {i}\n" for i in range(3)) for n in range(4)]
+    # Four runs of 0.3 s each, not serialized
+    assert elapsed < 0.9
+
+
+def test_errors_are_returned():
+    assert create_python_repl().run("print('x'); 1 / 0") == "ZeroDivisionError('division by zero')"
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from pydantic import ValidationError
+
+from functions.reductions import ReductionSpec, apply_reduction
+
+LAT = np.arange(-60, 61, 30.0)
+LON = np.arange(0, 360, 45.0)
+
+
+@pytest.fixture
+def field():
+    time = pd.date_range("2001-01-01", "2002-12-31")
+    # month + latitude/100 + longitude/1000, so every reduction has a known answer
+    values = (
+        np.asarray(time.month)[:, None, None]
+        + LAT[None, :, None] / 100
+        + LON[None, None, :] / 1000
+    )
+    return xr.DataArray(
+        values, dims=("time", "latitude", "longitude"),
+        coords={"time": time, "latitude": LAT, "longitude": LON}, name="sst",
+    ).chunk({"time": 100})
+
+
+def _reduce(da, **spec):
+    return apply_reduction(da, spec, "longitude", "latitude").load()
+
+
+def test_spatial_mean_weights_by_latitude(field):
+    weights = np.cos(np.deg2rad(LAT))
+    expected = field.time.dt.month + (LAT * weights).sum() / weights.sum() / 100 + LON.mean() / 1000
+    result = _reduce(field, kind="spatial_mean")
+    assert result.dims == ("time",)
+    np.testing.assert_allclose(result, expected)
+
+
+@pytest.mark.parametrize("point, lon", [((90, 30), 90), ((-135, 30), 225), ((-170, 30), 180)])
+def test_point_picks_nearest_cell_in_either_frame(field, point, lon):
+    result = _reduce(field, kind="point", point=point)
+    assert (float(result.longitude), float(result.latitude)) == (lon, 30)
+    np.testing.assert_allclose(result, field.time.dt.month + 0.3 + lon / 1000)
+
+
+@pytest.mark.parametrize("groupby, labels, months", [
+    ("month", list(range(1, 13)), [[m] for m in range(1, 13)]),
+    ("season", ["DJF", "JJA", "MAM", "SON"], [[12, 1, 2], [6, 7, 8], [3, 4, 5], [9, 10, 11]]),
+])
+def test_climatology_groups(field, groupby, labels, months):
+    result = _reduce(field, kind="climatology", groupby=groupby)
+    assert list(result[groupby].values) == labels
+    days = field.time.to_index()
+    for label, group in zip(labels, months):
+        # Mean of the daily month numbers of the group
+        expected = np.asarray(days.month[days.month.isin(group)]).mean()
+        np.testing.assert_allclose(result.sel({groupby: label}).isel(latitude=2, longitude=0), expected)
+
+
+def test_climatology_by_day_of_year(field):
+    result = _reduce(field, kind="climatology", groupby="dayofyear")
+    assert result.sizes["dayofyear"] == 365
+    np.testing.assert_allclose(result.sel(dayofyear=32).isel(latitude=2, longitude=0), 2)
+
+
+@pytest.mark.parametrize("kind, over, dims, value", [
+    ("min", "space", ("time",), -0.6),
+    ("max", "space", ("time",), 0.6 + 0.315),
+    ("min", "time", ("latitude", "longitude"), 1),
+    ("max", "time", ("latitude", "longitude"), 12),
+])
+def test_min_max(field, kind, over, dims, value):
+    result = _reduce(field, kind=kind, over=over)
+    assert result.dims == dims
+    if over == "space":
+        np.testing.assert_allclose(result - field.time.dt.month, value)
+    else:
+        np.testing.assert_allclose(result.sel(latitude=0, longitude=0), value)
+
+
+def test_point_requires_coordinates():
+    with pytest.raises(ValidationError):
+        ReductionSpec(kind="point")
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from langchain.schema import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from functions.retriever import NumpyVectorStore
+
+
+@pytest.fixture
+def store():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 32))
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    documents = [Document(page_content=doc_id, metadata={"source": doc_id}) for doc_id in ids]
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return NumpyVectorStore(vectors.astype(np.float32), ids, documents, DeterministicFakeEmbedding(size=32))
+
+
+def _brute_force(store, query, k):
+    vectors = np.asarray(store.vectors, dtype=float)
+    scores = vectors @ (query / np.linalg.norm(query))
+    return [store.documents[j].page_content for j in np.argsort(-scores, kind="stable")[:k]], np.sort(scores)[::-1][:k]
+
+
+@pytest.mark.parametrize("k", [1, 5, 200, 500])
+def test_top_k_matches_brute_force(store, k):
+    queries = np.random.default_rng(1).normal(size=(8, 32))
+    results = store.search_by_vectors(queries, k)
+    for query, result in zip(queries, results):
+        names, scores = _brute_force(store, query, k)
+        assert [doc.page_content for doc, _ in result] == names
+        np.testing.assert_allclose([score for _, score in result], scores, atol=1e-6)
+
+
+def test_text_queries_and_persistence(store, tmp_path):
+    query = "monthly sst climatology"
+    expected = _brute_force(store, np.asarray(store.embedding_function.embed_query(query)), 3)[0]
+    assert [doc.page_content for doc in store.similarity_search(query, k=3)] == expected
+    assert [[doc.page_content for doc, _ in result] for result in store.batch_similarity_search_with_score([query, query], k=3)] == [expected, expected]
+
+    store.save(str(tmp_path / "index"))
+    loaded = NumpyVectorStore.load(str(tmp_path / "index"), store.embedding_function)
+    assert [doc.page_content for doc in loaded.similarity_search(query, k=3)] == expected
+
+
+def test_empty_store():
+    empty = NumpyVectorStore(np.empty((0, 4), dtype=np.float32), [], [], DeterministicFakeEmbedding(size=4))
+    assert empty.search_by_vectors(np.ones((2, 4)), k=3) == [[], []]
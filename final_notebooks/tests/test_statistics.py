@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from functions.statistics import climatology, compute_statistics, percentiles, weighted_mean
+
+LAT = np.array([0.0, 60.0])
+
+
+@pytest.fixture
+def subset_file(tmp_path):
+    time = pd.date_range("2001-01-01", "2003-12-31")
+    # A seasonal cycle plus a latitude offset, on a 2x3 grid
+    cycle = np.sin(2 * np.pi * time.dayofyear.to_numpy() / 365.25)
+    values = cycle[:, None, None] + LAT[None, :, None] / 60 + np.zeros((1, 1, 3))
+    path = str(tmp_path / "subset.nc")
+    xr.Dataset(
+        {"sst": (("time", "latitude", "longitude"), values)},
+        coords={"time": time, "latitude": LAT, "longitude": [0.0, 1.0, 2.0]},
+    ).to_netcdf(path)
+    return path
+
+
+def test_weighted_mean_skips_missing_cells():
+    da = xr.DataArray([[1.0, np.nan], [3.0, 3.0]], dims=("latitude", "longitude"), coords={"latitude": LAT, "longitude": [0.0, 1.0]})
+    # cos(60°) = 0.5: one cell weighted 1 holding 1, two cells weighted 0.5 holding 3
+    assert float(weighted_mean(da)) == pytest.approx((1 + 3) / 2)
+
+
+def test_climatology_and_percentiles():
+    time = pd.date_range("2001-01-01", periods=24, freq="MS")
+    da = xr.DataArray(np.arange(24.0), dims="time", coords={"time": time}).chunk(5)
+    # Month m holds m-1 in 2001 and m+11 in 2002
+    np.testing.assert_allclose(climatology(da), np.arange(12.0) + 6)
+    result = percentiles(da, [10, 50, 90], ["time"])
+    np.testing.assert_allclose(result, np.percentile(np.arange(24.0), [10, 50, 90]))
+    assert list(result.percentile.values) == [10, 50, 90]
+
+
+def test_compute_statistics_over_space(subset_file, tmp_path):
+    summary = compute_statistics(
+        subset_file, statistics=["mean", "climatology", "anomalies", "percentiles"],
+        groupby="season", q=[50], output_dir=str(tmp_path / "stats"),
+    )
+    ds = xr.open_dataset(subset_file)
+    series = xr.open_dataarray(summary["mean"]["file_path"])
+    # Latitude 0 has weight 1 and offset 0, latitude 60 weight 0.5 and offset 1
+    np.testing.assert_allclose(series, ds.sst.isel(latitude=0, longitude=0) + 1 / 3)
+
+    clim = xr.open_dataarray(summary["climatology"]["file_path"])
+    assert sorted(clim.season.values) == ["DJF", "JJA", "MAM", "SON"]
+    anomalies = xr.open_dataarray(summary["anomalies"]["file_path"])
+    np.testing.assert_allclose(anomalies.groupby(anomalies.time.dt.season).mean(), 0, atol=1e-12)
+
+    median = xr.open_dataarray(summary["percentiles"]["file_path"])
+    np.testing.assert_allclose(median.sel(percentile=50), ds.sst.median(["latitude", "longitude"]))
+    # Every parameter the result depends on is in the file name
+    assert os.path.basename(summary["climatology"]["file_path"]) == "subset_sst_climatology_space_season.nc"
+    assert os.path.basename(summary["percentiles"]["file_path"]) == "subset_sst_percentiles_space_q50.nc"
+
+
+def test_compute_statistics_over_time(subset_file, tmp_path):
+    summary = compute_statistics(subset_file, statistics=["min", "max", "mean"], over="time", output_dir=str(tmp_path))
+    for stat, expected in (("min", -1), ("max", 1), ("mean", 0)):
+        result = xr.open_dataarray(summary[stat]["file_path"])
+        assert summary[stat]["dims"] == {"latitude": 2, "longitude": 3}
+        np.testing.assert_allclose(result.sel(latitude=0), expected, atol=1e-2)
+        np.testing.assert_allclose(result.sel(latitude=60), expected + 1, atol=1e-2)